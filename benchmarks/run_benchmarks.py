@@ -0,0 +1,167 @@
+"""
+Benchmarks of state decoding and polling, runnable without a controller.
+
+Controllers are simulated by a backend producing synthetic packets,
+so results are reproducible on headless machines.
+
+Run and compare against the stored baseline:
+    python benchmarks/run_benchmarks.py
+
+Store new baselines after an intentional change:
+    python benchmarks/run_benchmarks.py --update-baseline
+
+Exits with status 1 if any benchmark is slower than its baseline by more than the threshold.
+Bytes/op is the memory still allocated per operation while results are kept alive.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+# Ensure pyxboxcontroller is discoverable on PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyxboxcontroller import XInput, XboxController, XboxControllerState
+from pyxboxcontroller.backends import SimulatedBackend
+from pyxboxcontroller.hub import ControllerHub
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fail when slower than baseline * threshold
+DEFAULT_THRESHOLD: float = 1.5
+
+
+class SyntheticBackend(SimulatedBackend):
+    """Simulated backend producing a new packet with moving sticks on every get_state call"""
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        source = self._states.get(controller_id)
+        if source is None:
+            return XInput.Codes.NOT_CONNECTED
+        source.packet_number += 1
+        gamepad = source.gamepad
+        gamepad.buttons = source.packet_number & 0xF3FF
+        gamepad.l_thumb_x = (source.packet_number * 97 & 0xFFFF) - 32768
+        gamepad.right_trigger = source.packet_number & 0xFF
+        return super().get_state(controller_id, state)
+
+
+def _setup_benchmarks() -> dict[str, Callable[[], object]]:
+    """Returns name -> operation to time"""
+    raw = XInput.XINPUT_STATE()
+    raw.packet_number = 1
+    raw.gamepad.buttons = 4096 | 256
+    raw.gamepad.l_thumb_x = 12345
+    raw.gamepad.right_trigger = 200
+
+    unchanged_backend = SimulatedBackend()
+    unchanged_backend.connect(0)
+    unchanged = XboxController(0, backend=unchanged_backend)
+    unchanged.state
+
+    synthetic_backend = SyntheticBackend()
+    synthetic_backend.connect(0)
+    changing = XboxController(0, backend=synthetic_backend)
+
+    hub_backend = SyntheticBackend()
+    hub_backend.connect(0)
+    hub_backend.connect(1)
+    hub = ControllerHub(backend=hub_backend)
+    hub.poll()
+
+    return {
+        "state_construction": lambda: XboxControllerState(raw),
+        "state_construction_read_all": lambda: XboxControllerState(raw).buttons,
+        "controller_state_unchanged": lambda: unchanged.state,
+        "controller_state_changed": lambda: changing.state,
+        "controller_poll_raw_changed": changing.poll_raw,
+        "default_state": XboxControllerState.default_state,
+        "battery_info": lambda: unchanged.battery_info,
+        "hub_poll_2_of_4": hub.poll,
+    }
+
+
+def measure(operation: Callable[[], object], iterations: int, repeats: int) -> dict[str, float]:
+    """Returns the best ns/op over repeats, and bytes/op"""
+    best = float("inf")
+    for _ in range(repeats):
+        gc.disable()
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            operation()
+        elapsed = time.perf_counter_ns() - start
+        gc.enable()
+        best = min(best, elapsed / iterations)
+
+    # Keep results alive so their memory is counted
+    results = [None] * iterations
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(iterations):
+        results[i] = operation()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    return {"ns_per_op": round(best, 1), "bytes_per_op": round((after - before) / iterations, 1)}
+
+
+def run(iterations: int = 20_000, repeats: int = 7) -> dict[str, dict[str, float]]:
+    return {
+        name: measure(operation, iterations, repeats)
+        for name, operation in _setup_benchmarks().items()}
+
+
+def compare(
+        results: dict[str, dict[str, float]],
+        baseline: dict[str, dict[str, float]],
+        threshold: float
+        ) -> list[str]:
+    """Returns the names of benchmarks slower than baseline * threshold"""
+    return [
+        name for name, result in results.items()
+        if name in baseline and result["ns_per_op"] > baseline[name]["ns_per_op"] * threshold]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.repeats)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print(f"{'benchmark':<32}{'ns/op':>12}{'baseline':>12}{'bytes/op':>12}")
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("ns_per_op", float("nan"))
+        print(f"{name:<32}{result['ns_per_op']:>12.1f}{base:>12.1f}{result['bytes_per_op']:>12.1f}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=4)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Slower than baseline x{args.threshold}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
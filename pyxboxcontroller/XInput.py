@@ -4,10 +4,30 @@ C_Structs and other objects for communicating with XInput DLL.
 - Dan Forbes - Mid October 2022
 """
 import ctypes
-from enum import IntEnum
+from enum import IntEnum, IntFlag
+from functools import cache
 
-# Get link to XInput library
-XINPUT_DLL = ctypes.windll.xinput1_4
+
+@cache
+def _load_dll():
+    """Get link to XInput library.
+    Loaded on first use so importing this module works off Windows."""
+    try:
+        return ctypes.windll.xinput1_4
+    except AttributeError as exc:
+        raise OSError("XInput is only available on Windows") from exc
+
+
+_KEYSTROKE_ENUMS = frozenset(("KeystrokeFlags", "VirtualKeys", "CapabilityFlags"))
+
+
+def __getattr__(name: str):
+    # XINPUT_DLL and the keystroke enums are lazily resolved module attributes
+    if name == "XINPUT_DLL":
+        return _load_dll()
+    if name in _KEYSTROKE_ENUMS:
+        return _keystroke_enums()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Define ctype structs for accessing XInput functions
@@ -23,8 +43,9 @@ class XINPUT_GAMEPAD(ctypes.Structure):
 
 
 class XINPUT_STATE(ctypes.Structure):
+    # DWORD is 32 bits on Windows, c_ulong is 64 bits on most other platforms
     _fields_ = [
-        ('packet_number', ctypes.c_ulong),
+        ('packet_number', ctypes.c_uint32),
         ('gamepad', XINPUT_GAMEPAD)]
 
 
@@ -34,10 +55,37 @@ class XINPUT_BATTERY_INFORMATION(ctypes.Structure):
         ("battery_level", ctypes.c_ubyte)]
 
 
+class XINPUT_VIBRATION(ctypes.Structure):
+    _fields_ = [
+        ("left_motor_speed", ctypes.c_ushort),
+        ("right_motor_speed", ctypes.c_ushort)]
+
+
+class XINPUT_KEYSTROKE(ctypes.Structure):
+    # WCHAR is 16 bits on Windows, c_wchar is 32 bits on most other platforms
+    _fields_ = [
+        ("virtual_key", ctypes.c_ushort),
+        ("unicode", ctypes.c_ushort),
+        ("flags", ctypes.c_ushort),
+        ("user_index", ctypes.c_ubyte),
+        ("hid_code", ctypes.c_ubyte)]
+
+
+class XINPUT_CAPABILITIES(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_ubyte),
+        ("sub_type", ctypes.c_ubyte),
+        ("flags", ctypes.c_ushort),
+        ("gamepad", XINPUT_GAMEPAD),
+        ("vibration", XINPUT_VIBRATION)]
+
+
 class Codes:
     """XInput Communication codes"""
     NOT_CONNECTED = 1167
     SUCCESS = 0
+    EMPTY = 4306  # No keystrokes queued
+    NOT_SUPPORTED = 50  # The backend or device doesn't support the function
 
 
 class DeviceTypes(IntEnum):
@@ -46,8 +94,75 @@ class DeviceTypes(IntEnum):
     HEADSET = 1
 
 
+@cache
+def _keystroke_enums() -> dict[str, type]:
+    """Enums of keystrokes and capabilities, created on first use to keep importing cheap"""
+
+    class KeystrokeFlags(IntFlag):
+        """XINPUT_KEYSTROKE flags"""
+        KEYDOWN = 1
+        KEYUP = 2
+        REPEAT = 4
+
+    class VirtualKeys(IntEnum):
+        """XINPUT_KEYSTROKE virtual keys, VK_PAD_*"""
+        A = 0x5800
+        B = 0x5801
+        X = 0x5802
+        Y = 0x5803
+        RSHOULDER = 0x5804
+        LSHOULDER = 0x5805
+        LTRIGGER = 0x5806
+        RTRIGGER = 0x5807
+        DPAD_UP = 0x5810
+        DPAD_DOWN = 0x5811
+        DPAD_LEFT = 0x5812
+        DPAD_RIGHT = 0x5813
+        START = 0x5814
+        BACK = 0x5815
+        LTHUMB_PRESS = 0x5816
+        RTHUMB_PRESS = 0x5817
+        LTHUMB_UP = 0x5820
+        LTHUMB_DOWN = 0x5821
+        LTHUMB_RIGHT = 0x5822
+        LTHUMB_LEFT = 0x5823
+        LTHUMB_UPLEFT = 0x5824
+        LTHUMB_UPRIGHT = 0x5825
+        LTHUMB_DOWNRIGHT = 0x5826
+        LTHUMB_DOWNLEFT = 0x5827
+        RTHUMB_UP = 0x5830
+        RTHUMB_DOWN = 0x5831
+        RTHUMB_RIGHT = 0x5832
+        RTHUMB_LEFT = 0x5833
+        RTHUMB_UPLEFT = 0x5834
+        RTHUMB_UPRIGHT = 0x5835
+        RTHUMB_DOWNRIGHT = 0x5836
+        RTHUMB_DOWNLEFT = 0x5837
+
+    class CapabilityFlags(IntFlag):
+        """XINPUT_CAPABILITIES flags, XINPUT_CAPS_*"""
+        FFB_SUPPORTED = 0x0001
+        WIRELESS = 0x0002
+        VOICE_SUPPORTED = 0x0004
+        PMD_SUPPORTED = 0x0008
+        NO_NAVIGATION = 0x0010
+
+    enums = (KeystrokeFlags, VirtualKeys, CapabilityFlags)
+    for enum in enums:
+        # Resolved through the module's __getattr__, e.g. when unpickling
+        enum.__qualname__ = enum.__name__
+    return {enum.__name__: enum for enum in enums}
+
+
+# XInputGetCapabilities flags, only report gamepads
+XINPUT_FLAG_GAMEPAD = 1
+
+# Triggers report keystrokes once past this raw value, XINPUT_GAMEPAD_TRIGGER_THRESHOLD
+TRIGGER_THRESHOLD = 30
+
+
 def GetState(id: int, state: XINPUT_STATE) -> Codes:
-    return XINPUT_DLL.XInputGetState(id, ctypes.byref(state))
+    return _load_dll().XInputGetState(id, ctypes.byref(state))
 
 
 def GetBatteryInformation(
@@ -55,11 +170,20 @@ def GetBatteryInformation(
         device_type: DeviceTypes,
         battery_state: XINPUT_BATTERY_INFORMATION
         ) -> Codes:
-    return XINPUT_DLL.XInputGetBatteryInformation(
+    return _load_dll().XInputGetBatteryInformation(
         id,
         device_type,
         ctypes.byref(battery_state))
 
-# class XINPUT_VIBRATION(ctypes.Structure):
-#     _fields_ = [("wLeftMotorSpeed", ctypes.c_ushort),
-#                 ("wRightMotorSpeed", ctypes.c_ushort)]
+
+def SetState(id: int, vibration: XINPUT_VIBRATION) -> Codes:
+    return _load_dll().XInputSetState(id, ctypes.byref(vibration))
+
+
+def GetKeystroke(id: int, keystroke: XINPUT_KEYSTROKE) -> Codes:
+    # The second argument is reserved
+    return _load_dll().XInputGetKeystroke(id, 0, ctypes.byref(keystroke))
+
+
+def GetCapabilities(id: int, flags: int, capabilities: XINPUT_CAPABILITIES) -> Codes:
+    return _load_dll().XInputGetCapabilities(id, flags, ctypes.byref(capabilities))
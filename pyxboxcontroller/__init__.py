@@ -1,4 +1,37 @@
 from pyxboxcontroller.controller import XboxController, XboxControllerState, XboxBatteryInfo
-import pyxboxcontroller.examples
+from pyxboxcontroller.backends import Backend, SimulatedBackend, get_backend, register_backend
 
-__all__ = ["controller", "examples"]
+__all__ = ["controller", "backends", "examples"]
+
+# Attributes imported on first access, to keep importing the package cheap
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "ControllerPoller": "pyxboxcontroller.poller",
+    "ButtonEvents": "pyxboxcontroller.events",
+    "ControllerHub": "pyxboxcontroller.hub",
+    "SessionRecorder": "pyxboxcontroller.recording",
+    "SessionReplay": "pyxboxcontroller.recording",
+    "Deadzones": "pyxboxcontroller.deadzones",
+    "PollInstrumentation": "pyxboxcontroller.instrumentation",
+    "RumbleEffect": "pyxboxcontroller.rumble",
+    "RawStateBuffer": "pyxboxcontroller.raw",
+    "StateStreamer": "pyxboxcontroller.streaming",
+    "StateReceiver": "pyxboxcontroller.streaming",
+    "SharedStatePublisher": "pyxboxcontroller.shared",
+    "SharedStateReader": "pyxboxcontroller.shared",
+    "Bindings": "pyxboxcontroller.bindings",
+    "ComboRecogniser": "pyxboxcontroller.combos",
+    "FilterPipeline": "pyxboxcontroller.filters",
+    "StateInternCache": "pyxboxcontroller.interning",
+    "FixedStepResampler": "pyxboxcontroller.resampling",
+}
+
+
+def __getattr__(name: str):
+    from importlib import import_module
+
+    # Examples pull in tkinter, so only import them when asked for
+    if name == "examples":
+        return import_module(".examples", __name__)
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
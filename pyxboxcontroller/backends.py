@@ -0,0 +1,333 @@
+"""
+Input backends used by XboxController to read controller data.
+
+A backend fills the same XInput ctypes structs regardless of where the data comes from,
+so XboxController behaves identically on top of any of them.
+
+Backends are looked up by name from a registry and only created when first needed:
+>>> backend = get_backend("simulated")
+
+Register your own with:
+>>> register_backend("my_backend", MyBackend)
+"""
+import ctypes
+import os
+import sys
+from collections import deque
+from collections.abc import Callable
+from functools import cache
+
+from pyxboxcontroller import XInput
+
+# Environment variable which overrides the default backend name
+BACKEND_ENV_VAR = "PYXBOXCONTROLLER_BACKEND"
+
+
+@cache
+def button_keys() -> dict[int, int]:
+    """Virtual key of each button bit of XINPUT_GAMEPAD.buttons"""
+    keys = XInput.VirtualKeys
+    return {
+        1: keys.DPAD_UP,
+        2: keys.DPAD_DOWN,
+        4: keys.DPAD_LEFT,
+        8: keys.DPAD_RIGHT,
+        16: keys.START,
+        32: keys.BACK,
+        64: keys.LTHUMB_PRESS,
+        128: keys.RTHUMB_PRESS,
+        256: keys.LSHOULDER,
+        512: keys.RSHOULDER,
+        4096: keys.A,
+        8192: keys.B,
+        16384: keys.X,
+        32768: keys.Y,
+    }
+
+
+def queue_keystrokes(
+        queue: deque[tuple[int, int]],
+        buttons: int,
+        triggers: tuple[int, int],
+        gamepad: XInput.XINPUT_GAMEPAD
+        ) -> None:
+    """Queue (virtual key, flags) keystrokes for the buttons and triggers which changed
+    from the previous buttons and (left, right) triggers to those of gamepad"""
+    down, up = XInput.KeystrokeFlags.KEYDOWN, XInput.KeystrokeFlags.KEYUP
+    new_buttons = gamepad.buttons
+    changed = buttons ^ new_buttons
+    if changed:
+        for bit, virtual_key in button_keys().items():
+            if changed & bit:
+                queue.append((virtual_key, down if new_buttons & bit else up))
+    threshold = XInput.TRIGGER_THRESHOLD
+    for virtual_key, previous, value in (
+            (XInput.VirtualKeys.LTRIGGER, triggers[0], gamepad.left_trigger),
+            (XInput.VirtualKeys.RTRIGGER, triggers[1], gamepad.right_trigger)):
+        if (previous > threshold) != (value > threshold):
+            queue.append((virtual_key, down if value > threshold else up))
+
+
+class Backend:
+    """
+    Base class for a source of controller data.\n
+    Methods mirror the XInput functions, filling the given struct and returning an XInput.Codes value.
+    Backends must implement get_state and get_battery_information,
+    the other functions return XInput.Codes.NOT_SUPPORTED unless overridden.
+    """
+
+    name: str = ""
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        """Fill state with the current state of the controller"""
+        raise NotImplementedError
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        """Fill battery_info with the battery information of the controller"""
+        raise NotImplementedError
+
+    def set_vibration(self, controller_id: int, vibration: XInput.XINPUT_VIBRATION) -> int:
+        """Set the motor speeds of the controller"""
+        return XInput.Codes.NOT_SUPPORTED
+
+    def get_keystroke(self, controller_id: int, keystroke: XInput.XINPUT_KEYSTROKE) -> int:
+        """Fill keystroke with the oldest queued keystroke of the controller,
+        returns XInput.Codes.EMPTY when there are none"""
+        return XInput.Codes.NOT_SUPPORTED
+
+    def get_capabilities(
+            self,
+            controller_id: int,
+            flags: int,
+            capabilities: XInput.XINPUT_CAPABILITIES
+            ) -> int:
+        """Fill capabilities with the features the controller supports"""
+        return XInput.Codes.NOT_SUPPORTED
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class XInputBackend(Backend):
+    """Reads controllers through Windows' XInput library"""
+
+    name = "xinput"
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        return XInput.GetState(controller_id, state)
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        return XInput.GetBatteryInformation(controller_id, device_type, battery_info)
+
+    def set_vibration(self, controller_id: int, vibration: XInput.XINPUT_VIBRATION) -> int:
+        return XInput.SetState(controller_id, vibration)
+
+    def get_keystroke(self, controller_id: int, keystroke: XInput.XINPUT_KEYSTROKE) -> int:
+        return XInput.GetKeystroke(controller_id, keystroke)
+
+    def get_capabilities(
+            self,
+            controller_id: int,
+            flags: int,
+            capabilities: XInput.XINPUT_CAPABILITIES
+            ) -> int:
+        return XInput.GetCapabilities(controller_id, flags, capabilities)
+
+
+class SimulatedBackend(Backend):
+    """
+    In-memory controllers, useful for tests and machines without a controller.\n
+
+    Plug in a controller and change its state with:
+    >>> backend = SimulatedBackend()
+    >>> backend.connect(0)
+    >>> backend.set_state(0, buttons=4096, l_thumb_x=32767)
+
+    Every call to set_state increments the packet number, like a real device,
+    and queues keystrokes for the buttons and triggers it presses and releases.
+    Motor speeds written to each controller are kept in `vibrations`.
+    """
+
+    name = "simulated"
+
+    _STATE_SIZE = ctypes.sizeof(XInput.XINPUT_STATE)
+
+    def __init__(self) -> None:
+        self._states: dict[int, XInput.XINPUT_STATE] = {}
+        self._batteries: dict[int, XInput.XINPUT_BATTERY_INFORMATION] = {}
+        # (virtual key, flags) of queued keystrokes, per controller
+        self._keystrokes: dict[int, deque[tuple[int, int]]] = {}
+        # (left, right) motor speeds of every vibration written, per controller
+        self.vibrations: dict[int, list[tuple[int, int]]] = {}
+
+    def connect(
+            self,
+            controller_id: int,
+            battery_type: int = 1,
+            battery_level: int = 3
+            ) -> None:
+        """Plug in a controller, by default wired with a full battery"""
+        self._states[controller_id] = XInput.XINPUT_STATE()
+        self._batteries[controller_id] = XInput.XINPUT_BATTERY_INFORMATION(
+            battery_type, battery_level)
+        self._keystrokes[controller_id] = deque()
+
+    def disconnect(self, controller_id: int) -> None:
+        """Unplug a controller"""
+        self._states.pop(controller_id, None)
+        self._batteries.pop(controller_id, None)
+        self._keystrokes.pop(controller_id, None)
+
+    def is_connected(self, controller_id: int) -> bool:
+        return controller_id in self._states
+
+    def set_state(self, controller_id: int, **fields: int) -> int:
+        """Set fields of XINPUT_GAMEPAD (e.g. buttons, l_thumb_x, left_trigger)
+        of a connected controller. Returns the new packet number"""
+        state = self._states[controller_id]
+        gamepad = state.gamepad
+        buttons = gamepad.buttons
+        triggers = (gamepad.left_trigger, gamepad.right_trigger)
+        for field, value in fields.items():
+            if not hasattr(gamepad, field):
+                raise AttributeError(f"XINPUT_GAMEPAD has no field {field!r}")
+            setattr(gamepad, field, value)
+        state.packet_number += 1
+
+        queue_keystrokes(self._keystrokes[controller_id], buttons, triggers, gamepad)
+        return state.packet_number
+
+    def queue_keystroke(self, controller_id: int, virtual_key: int, flags: int) -> None:
+        """Queue a keystroke of a connected controller, e.g. a REPEAT or a thumbstick direction"""
+        self._keystrokes[controller_id].append((virtual_key, flags))
+
+    def set_battery(self, controller_id: int, battery_type: int, battery_level: int) -> None:
+        """Set the battery information reported for a connected controller"""
+        battery = self._batteries[controller_id]
+        battery.battery_type, battery.battery_level = battery_type, battery_level
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        source = self._states.get(controller_id)
+        if source is None:
+            return XInput.Codes.NOT_CONNECTED
+        ctypes.memmove(ctypes.addressof(state), ctypes.addressof(source), self._STATE_SIZE)
+        return XInput.Codes.SUCCESS
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        source = self._batteries.get(controller_id)
+        if source is None:
+            return XInput.Codes.NOT_CONNECTED
+        battery_info.battery_type = source.battery_type
+        battery_info.battery_level = source.battery_level
+        return XInput.Codes.SUCCESS
+
+    def set_vibration(self, controller_id: int, vibration: XInput.XINPUT_VIBRATION) -> int:
+        if controller_id not in self._states:
+            return XInput.Codes.NOT_CONNECTED
+        self.vibrations.setdefault(controller_id, []).append(
+            (vibration.left_motor_speed, vibration.right_motor_speed))
+        return XInput.Codes.SUCCESS
+
+    def get_keystroke(self, controller_id: int, keystroke: XInput.XINPUT_KEYSTROKE) -> int:
+        queue = self._keystrokes.get(controller_id)
+        if queue is None:
+            return XInput.Codes.NOT_CONNECTED
+        if not queue:
+            return XInput.Codes.EMPTY
+        keystroke.virtual_key, keystroke.flags = queue.popleft()
+        keystroke.unicode = keystroke.hid_code = 0
+        keystroke.user_index = controller_id
+        return XInput.Codes.SUCCESS
+
+    def get_capabilities(
+            self,
+            controller_id: int,
+            flags: int,
+            capabilities: XInput.XINPUT_CAPABILITIES
+            ) -> int:
+        if controller_id not in self._states:
+            return XInput.Codes.NOT_CONNECTED
+        # A wired gamepad supporting every button, full resolution axes and both motors
+        capabilities.type = 1  # XINPUT_DEVTYPE_GAMEPAD
+        capabilities.sub_type = 1  # XINPUT_DEVSUBTYPE_GAMEPAD
+        capabilities.flags = 0
+        gamepad = capabilities.gamepad
+        gamepad.buttons = sum(button_keys())
+        gamepad.left_trigger = gamepad.right_trigger = 255
+        gamepad.l_thumb_x = gamepad.l_thumb_y = gamepad.r_thumb_x = gamepad.r_thumb_y = -1
+        capabilities.vibration.left_motor_speed = capabilities.vibration.right_motor_speed = 65535
+        return XInput.Codes.SUCCESS
+
+
+def _evdev_backend() -> Backend:
+    """Imported on first use, only Linux has evdev devices"""
+    from pyxboxcontroller.evdev import EvdevBackend
+    return EvdevBackend()
+
+
+# Registry of backend factories, instances are created on first use
+_BACKEND_FACTORIES: dict[str, Callable[[], Backend]] = {
+    XInputBackend.name: XInputBackend,
+    SimulatedBackend.name: SimulatedBackend,
+    "evdev": _evdev_backend,
+}
+_BACKENDS: dict[str, Backend] = {}
+
+
+def register_backend(name: str, factory: Callable[[], Backend]) -> None:
+    """Register a backend factory under the given name.
+    Replaces (and forgets the instance of) any backend already using that name."""
+    _BACKEND_FACTORIES[name] = factory
+    _BACKENDS.pop(name, None)
+
+
+def available_backends() -> list[str]:
+    """Names of all registered backends"""
+    return list(_BACKEND_FACTORIES)
+
+
+def default_backend_name() -> str:
+    """Name of the backend used when none is given.
+    Can be overridden with the PYXBOXCONTROLLER_BACKEND environment variable."""
+    name = os.environ.get(BACKEND_ENV_VAR)
+    if name:
+        return name
+    if sys.platform.startswith("linux"):
+        return "evdev"
+    return XInputBackend.name
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """Returns the shared instance of the named backend, creating it if needed.
+    Uses the default backend when name is None."""
+    if name is None:
+        name = default_backend_name()
+
+    backend = _BACKENDS.get(name)
+    if backend is not None:
+        return backend
+
+    try:
+        factory = _BACKEND_FACTORIES[name]
+    except KeyError:
+        raise LookupError(
+            f"Unknown backend {name!r} on {sys.platform}, "
+            f"available backends: {available_backends()}") from None
+
+    backend = _BACKENDS[name] = factory()
+    return backend
@@ -0,0 +1,214 @@
+"""
+Mapping buttons, chords and axis thresholds to named actions.
+
+Bindings are declared once, by button name (see XboxControllerState._BUTTON_MAP):
+>>> bindings = Bindings()
+>>> bindings.bind("jump", "a")
+>>> bindings.bind("super", "lb", "rb", "a")
+>>> bindings.bind_axis("accelerate", "r_trigger", 0.5)
+>>> bindings.bind_axis("steer_left", "l_thumb_x", -0.3)
+
+Then every frame:
+>>> if bindings.is_active(state, "jump"):
+...     ...
+>>> actions: frozenset[str] = bindings.active(state)
+
+Each action is given a bit, and bindings are compiled into tables from inputs to masks of actions,
+so resolving a frame is a dict lookup for the buttons and a bisect per bound axis,
+however many bindings there are. Tables are rebuilt on the next frame after any rebinding.
+
+Profiles are saved to and loaded from JSON files:
+>>> bindings.save("profile.json")
+>>> bindings = Bindings.load("profile.json")
+"""
+import json
+import math
+from bisect import bisect_right
+
+from pyxboxcontroller.controller import XboxControllerState
+
+# Axis name -> (XboxControllerState slot of the raw value, raw value of 1.)
+AXES: dict[str, tuple[str, int]] = {
+    "l_thumb_x": ("_l_thumb_x", 32767),
+    "l_thumb_y": ("_l_thumb_y", 32767),
+    "r_thumb_x": ("_r_thumb_x", 32767),
+    "r_thumb_y": ("_r_thumb_y", 32767),
+    "l_trigger": ("_left_trigger", 255),
+    "r_trigger": ("_right_trigger", 255),
+}
+
+
+def _button_mask(buttons: tuple[str, ...]) -> int:
+    mask = 0
+    for button in buttons:
+        try:
+            mask |= XboxControllerState._BUTTON_MAP[button]
+        except KeyError:
+            raise ValueError(
+                f"Unknown button {button!r}, expected one of "
+                f"{list(XboxControllerState._BUTTON_MAP)}") from None
+    return mask
+
+
+class _AxisTable:
+    """Action bits for each interval of an axis' raw value, found by bisecting breakpoints"""
+
+    __slots__ = ("slot", "breakpoints", "bits")
+
+    def __init__(self, slot: str, thresholds: list[tuple[int, int]], minimum: int) -> None:
+        # thresholds are (raw threshold, action bit), active at or beyond a positive threshold,
+        # at or below a negative one
+        self.slot = slot
+        self.breakpoints: list[int] = sorted(
+            {threshold if threshold > 0 else threshold + 1 for threshold, _ in thresholds})
+        self.bits: list[int] = []
+        for value in [minimum] + self.breakpoints:
+            bits = 0
+            for threshold, bit in thresholds:
+                if value >= threshold if threshold > 0 else value <= threshold:
+                    bits |= bit
+            self.bits.append(bits)
+
+
+class Bindings:
+    """
+    Named actions bound to button chords and axis thresholds.\n
+    An action can have any number of bindings, it's active when any of them is.
+    A chord is active when all of its buttons are held, whatever else is held.
+    Axis thresholds are between -1 and 1 (0 and 1 for triggers), an action bound to
+    a positive threshold is active at or above it, a negative threshold at or below it.
+    Thresholds are compared with the raw values, before any deadzones.
+    """
+
+    def __init__(self) -> None:
+        # action -> bound button masks and (axis, threshold)s, in the order bound
+        self._chords: dict[str, list[int]] = {}
+        self._axis_bindings: dict[str, list[tuple[str, float]]] = {}
+        self._compiled = False
+
+    @property
+    def actions(self) -> list[str]:
+        return list({**self._chords, **self._axis_bindings})
+
+    def bind(self, action: str, *buttons: str) -> None:
+        """Activate action while all of buttons are held"""
+        if not buttons:
+            raise ValueError("A chord needs at least one button")
+        self._chords.setdefault(action, []).append(_button_mask(buttons))
+        self._compiled = False
+
+    def bind_axis(self, action: str, axis: str, threshold: float) -> None:
+        """Activate action while axis is at or beyond threshold"""
+        if axis not in AXES:
+            raise ValueError(f"Unknown axis {axis!r}, expected one of {list(AXES)}")
+        if not threshold or not -1. <= threshold <= 1.:
+            raise ValueError(f"Threshold must be non zero and between -1 and 1, got {threshold}")
+        if threshold < 0 and AXES[axis][1] == 255:
+            raise ValueError(f"Trigger thresholds must be positive, got {threshold}")
+        self._axis_bindings.setdefault(action, []).append((axis, threshold))
+        self._compiled = False
+
+    def unbind(self, action: str) -> None:
+        """Remove every binding of action"""
+        self._chords.pop(action, None)
+        self._axis_bindings.pop(action, None)
+        self._compiled = False
+
+    def rebind(self, action: str, *buttons: str) -> None:
+        """Replace every binding of action with a single chord"""
+        self.unbind(action)
+        self.bind(action, *buttons)
+
+    def _compile(self) -> None:
+        self._bits: dict[str, int] = {action: 1 << i for i, action in enumerate(self.actions)}
+        self._chord_bits: list[tuple[int, int]] = [
+            (mask, self._bits[action])
+            for action, masks in self._chords.items() for mask in masks]
+
+        thresholds: dict[str, list[tuple[int, int]]] = {}
+        for action, bindings in self._axis_bindings.items():
+            for axis, threshold in bindings:
+                scale = AXES[axis][1]
+                raw = math.ceil(threshold * scale) if threshold > 0 else math.floor(threshold * scale)
+                thresholds.setdefault(axis, []).append((raw, self._bits[action]))
+        self._axis_tables: list[_AxisTable] = [
+            _AxisTable(AXES[axis][0], axis_thresholds, -32768 if AXES[axis][1] == 32767 else 0)
+            for axis, axis_thresholds in thresholds.items()]
+
+        # Filled in as button masks and action masks are first seen
+        self._button_table: dict[int, int] = {}
+        self._names: dict[int, frozenset[str]] = {}
+        self._compiled = True
+
+    def _chord_mask(self, buttons: int) -> int:
+        bits = 0
+        for mask, bit in self._chord_bits:
+            if buttons & mask == mask:
+                bits |= bit
+        self._button_table[buttons] = bits
+        return bits
+
+    def resolve(self, state: XboxControllerState) -> int:
+        """Mask of the actions active in state, see bit()"""
+        if not self._compiled:
+            self._compile()
+        buttons = state._buttons
+        bits = self._button_table.get(buttons)
+        if bits is None:
+            bits = self._chord_mask(buttons)
+        for table in self._axis_tables:
+            bits |= table.bits[bisect_right(table.breakpoints, getattr(state, table.slot))]
+        return bits
+
+    def bit(self, action: str) -> int:
+        """Bit of action in the masks returned by resolve, 0 if it isn't bound"""
+        if not self._compiled:
+            self._compile()
+        return self._bits.get(action, 0)
+
+    def is_active(self, state: XboxControllerState, action: str) -> bool:
+        return (self.resolve(state) & self.bit(action)) != 0
+
+    def active(self, state: XboxControllerState) -> frozenset[str]:
+        """Names of the actions active in state"""
+        bits = self.resolve(state)
+        names = self._names.get(bits)
+        if names is None:
+            names = self._names[bits] = frozenset(
+                action for action, bit in self._bits.items() if bits & bit)
+        return names
+
+    def to_dict(self) -> dict[str, list]:
+        """Bindings of each action, chords as lists of button names,
+        axis thresholds as {"axis": name, "threshold": value}"""
+        button_names = list(XboxControllerState._BUTTON_MAP.items())
+        profile: dict[str, list] = {}
+        for action, masks in self._chords.items():
+            profile[action] = [[name for name, bit in button_names if mask & bit] for mask in masks]
+        for action, bindings in self._axis_bindings.items():
+            profile.setdefault(action, []).extend(
+                {"axis": axis, "threshold": threshold} for axis, threshold in bindings)
+        return profile
+
+    @classmethod
+    def from_dict(cls, profile: dict[str, list]) -> "Bindings":
+        bindings = cls()
+        for action, entries in profile.items():
+            for entry in entries:
+                if isinstance(entry, dict):
+                    bindings.bind_axis(action, entry["axis"], entry["threshold"])
+                else:
+                    bindings.bind(action, *entry)
+        return bindings
+
+    def save(self, path: str) -> None:
+        """Write the bindings to a JSON profile"""
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+            file.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Bindings":
+        """Read bindings from a JSON profile written by save()"""
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
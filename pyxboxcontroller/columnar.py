@@ -0,0 +1,152 @@
+"""
+Vectorised decoding of many controller states into NumPy columns.
+
+Requires NumPy, install with `pip install pyxboxcontroller[numpy]`.
+
+Decode a buffer of packed XINPUT_STATE records (e.g. from a session recording):
+>>> columns = decode_packets(buffer)
+>>> columns["l_thumb_x"], columns["a"]
+
+Or a list of XboxControllerState objects:
+>>> columns = states_to_columns(states)
+
+Values match those of XboxControllerState exactly, axes are normalised with
+lookup tables built from the same scaling and rounding rules.
+"""
+import os
+from collections.abc import Iterable
+from functools import cache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from pyxboxcontroller.controller import XboxControllerState
+
+# Raw XINPUT_STATE fields, little-endian as stored by XInput and session recordings
+_PACKET_FIELDS = [
+    ("packet_number", "<u4"),
+    ("buttons", "<u2"),
+    ("left_trigger", "u1"),
+    ("right_trigger", "u1"),
+    ("l_thumb_x", "<i2"),
+    ("l_thumb_y", "<i2"),
+    ("r_thumb_x", "<i2"),
+    ("r_thumb_y", "<i2"),
+]
+
+# Columns of normalised values, as named by XboxControllerState
+AXIS_COLUMNS = ("l_thumb_x", "l_thumb_y", "r_thumb_x", "r_thumb_y")
+TRIGGER_COLUMNS = {"l_trigger": "left_trigger", "r_trigger": "right_trigger"}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "NumPy is required for pyxboxcontroller.columnar, "
+            "install it with `pip install pyxboxcontroller[numpy]`")
+
+
+@cache
+def packet_dtype():
+    """Structured dtype of a raw 16 byte XINPUT_STATE"""
+    _require_numpy()
+    return np.dtype(_PACKET_FIELDS)
+
+
+@cache
+def record_dtype():
+    """Structured dtype of a session recording record, see pyxboxcontroller.recording"""
+    _require_numpy()
+    return np.dtype([("timestamp_ns", "<i8"), *_PACKET_FIELDS])
+
+
+@cache
+def _stick_table():
+    """Normalised value of every int16, indexed by raw + 32768"""
+    return np.array([round(raw / 32767., 4) for raw in range(-32768, 32768)], dtype=np.float64)
+
+
+@cache
+def _trigger_table():
+    """Normalised value of every uint8"""
+    return np.array([round(raw / 255., 4) for raw in range(256)], dtype=np.float64)
+
+
+def decode_raw(raw) -> dict[str, "np.ndarray"]:
+    """Decode an array with the fields of packet_dtype() (extra fields are passed through)
+    into a dict of columns"""
+    _require_numpy()
+    columns = {name: raw[name] for name in raw.dtype.names}
+
+    stick_table = _stick_table()
+    for axis in AXIS_COLUMNS:
+        columns[axis] = stick_table[raw[axis].astype(np.int32) + 32768]
+
+    trigger_table = _trigger_table()
+    for column, field in TRIGGER_COLUMNS.items():
+        columns[column] = trigger_table[raw[field]]
+
+    buttons = raw["buttons"]
+    for button, bitmask in XboxControllerState._BUTTON_MAP.items():
+        columns[button] = (buttons & bitmask) != 0
+
+    return columns
+
+
+def decode_packets(buffer) -> dict[str, "np.ndarray"]:
+    """Decode a bytes-like buffer of packed 16 byte XINPUT_STATE records into a dict of columns"""
+    _require_numpy()
+    return decode_raw(np.frombuffer(buffer, dtype=packet_dtype()))
+
+
+def decode_session(path) -> dict[str, "np.ndarray"]:
+    """Decode a session recording into a dict of columns, including timestamp_ns.
+    The file is memory-mapped rather than read into memory.
+    A partially written last record is ignored, like SessionReplay."""
+    from pyxboxcontroller.recording import HEADER, MAGIC, RECORD_SIZE, VERSION
+
+    _require_numpy()
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        file_size = os.fstat(file.fileno()).st_size
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a session recording")
+    magic, version, record_size, _ = HEADER.unpack(header)
+    if magic != MAGIC or record_size != RECORD_SIZE:
+        raise ValueError(f"{path} is not a session recording")
+    if version != VERSION:
+        raise ValueError(f"Unsupported session recording version {version} in {path}")
+
+    count = (file_size - HEADER.size) // RECORD_SIZE
+    if not count:
+        # Empty files can't be memory-mapped
+        return decode_raw(np.empty(0, dtype=record_dtype()))
+    records = np.memmap(path, dtype=record_dtype(), mode="r", offset=HEADER.size, shape=(count,))
+    return decode_raw(records)
+
+
+def states_to_raw(states: Iterable[XboxControllerState]):
+    """Pack XboxControllerState objects into an array of packet_dtype()"""
+    _require_numpy()
+    return np.array(
+        [(state.packet_number & 0xFFFFFFFF, *state.raw) for state in states],
+        dtype=packet_dtype())
+
+
+def states_to_columns(states: Iterable[XboxControllerState]) -> dict[str, "np.ndarray"]:
+    """Decode XboxControllerState objects into a dict of columns"""
+    return decode_raw(states_to_raw(states))
+
+
+def to_structured(columns: dict[str, "np.ndarray"]):
+    """Combine a dict of columns into a single structured array"""
+    _require_numpy()
+    names = list(columns)
+    result = np.empty(
+        len(columns[names[0]]) if names else 0,
+        dtype=[(name, columns[name].dtype) for name in names])
+    for name in names:
+        result[name] = columns[name]
+    return result
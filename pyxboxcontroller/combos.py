@@ -0,0 +1,180 @@
+"""
+Recognising timed sequences of button presses, e.g. fighting game special moves.
+
+Steps are buttons, or several buttons joined with "+" which must be held together:
+>>> combos = ComboRecogniser(controller)
+>>> combos.add("hadouken", ["dpad_down", "dpad_down+dpad_right", "dpad_right+x"], window=0.3)
+>>> combos.on_match(lambda name, state: print(name))
+>>> while True:
+...     combos.update()
+
+A step is matched by the input which presses one of its buttons while all of them are held.
+Changes which only release buttons are ignored, any other press breaks a partial sequence.
+
+Every sequence is compiled into a single automaton, built lazily as inputs are seen,
+so each button change costs one table lookup however many sequences are registered.
+Only the times of the last inputs are kept, as many as the longest sequence has steps.
+"""
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+ComboCallback = Callable[[str, XboxControllerState], None]
+
+# Automaton states kept before the automaton is rebuilt from scratch
+MAX_AUTOMATON_STATES: int = 4096
+
+
+def _step_mask(step: str | Sequence[str]) -> int:
+    buttons = step.split("+") if isinstance(step, str) else step
+    mask = 0
+    for button in buttons:
+        try:
+            mask |= XboxControllerState._BUTTON_MAP[button.strip()]
+        except KeyError:
+            raise ValueError(
+                f"Unknown button {button!r}, expected one of "
+                f"{list(XboxControllerState._BUTTON_MAP)}") from None
+    return mask
+
+
+class ComboRecogniser:
+    """
+    Matches registered sequences against the button changes of a controller.\n
+    Call update() every frame, or feed states you already have with process().
+    Both return the names of the sequences completed by that state.
+    A sequence only matches if all of its steps were input within its window in seconds.
+    """
+
+    def __init__(
+            self,
+            controller: XboxController | None = None,
+            clock: Callable[[], float] = time.monotonic
+            ) -> None:
+        self.controller = controller
+        self._clock = clock
+        self.last_mask: int = 0
+        self._names: list[str] = []
+        self._sequences: list[tuple[int, ...]] = []
+        self._windows: list[float] = []
+        self._callbacks: list[ComboCallback] = []
+        # Buttons in any sequence, presses of any other button are ignored
+        self._relevant: int = 0
+        self._times: deque[float] = deque(maxlen=1)
+        self._reset_automaton()
+
+    def add(self, name: str, steps: Sequence[str | Sequence[str]], window: float = 0.3) -> None:
+        """Register a sequence of steps to complete within window seconds"""
+        if not steps:
+            raise ValueError("A sequence needs at least one step")
+        sequence = tuple(_step_mask(step) for step in steps)
+        self._names.append(name)
+        self._sequences.append(sequence)
+        self._windows.append(window)
+        for mask in sequence:
+            self._relevant |= mask
+        if len(sequence) > self._times.maxlen:
+            self._times = deque(self._times, maxlen=len(sequence))
+        self._reset_automaton()
+
+    def remove(self, name: str) -> None:
+        """Remove every sequence registered as name"""
+        keep = [i for i, registered in enumerate(self._names) if registered != name]
+        self._names = [self._names[i] for i in keep]
+        self._sequences = [self._sequences[i] for i in keep]
+        self._windows = [self._windows[i] for i in keep]
+        self._relevant = 0
+        for sequence in self._sequences:
+            for mask in sequence:
+                self._relevant |= mask
+        self._reset_automaton()
+
+    def on_match(self, callback: ComboCallback) -> None:
+        """Call callback(name, state) when a sequence is completed"""
+        self._callbacks.append(callback)
+
+    def _reset_automaton(self) -> None:
+        # Each automaton state is a set of partial matches (sequence index, steps matched)
+        self._states: list[frozenset[tuple[int, int]]] = [frozenset()]
+        self._state_ids: dict[frozenset[tuple[int, int]], int] = {frozenset(): 0}
+        # state id -> input -> (next state id, indices of completed sequences)
+        self._transitions: list[dict[int, tuple[int, tuple[int, ...]]]] = [{}]
+        self._state: int = 0
+
+    def _build_transition(self, mask: int, pressed: int) -> tuple[int, tuple[int, ...]]:
+        """Add the transition from the current state on an input to the automaton"""
+        if len(self._states) >= MAX_AUTOMATON_STATES:
+            partial = self._states[self._state]
+            self._reset_automaton()
+            self._state = self._state_id(partial)
+
+        sequences = self._sequences
+        next_partial = set()
+        completed = []
+
+        def advance(index: int, matched: int) -> None:
+            step = sequences[index][matched]
+            if mask & step == step and pressed & step:
+                if matched + 1 == len(sequences[index]):
+                    completed.append(index)
+                else:
+                    next_partial.add((index, matched + 1))
+
+        for index, matched in self._states[self._state]:
+            advance(index, matched)
+        for index in range(len(sequences)):
+            advance(index, 0)
+
+        transition = (self._state_id(frozenset(next_partial)), tuple(completed))
+        self._transitions[self._state][mask | pressed << 16] = transition
+        return transition
+
+    def _state_id(self, partial: frozenset[tuple[int, int]]) -> int:
+        state_id = self._state_ids.get(partial)
+        if state_id is None:
+            state_id = self._state_ids[partial] = len(self._states)
+            self._states.append(partial)
+            self._transitions.append({})
+        return state_id
+
+    def update(self) -> tuple[str, ...]:
+        """Get the controller's state and match it, returns the names of completed sequences"""
+        return self.process(self.controller.state)
+
+    def process(self, state: XboxControllerState, now: float | None = None) -> tuple[str, ...]:
+        """Match the button changes between the last processed state and this one.
+        Returns the names of the sequences completed."""
+        mask = state.button_mask
+        changed = mask ^ self.last_mask
+        if not changed:
+            return ()
+        self.last_mask = mask
+
+        relevant = self._relevant
+        pressed = changed & mask & relevant
+        if not pressed:
+            return ()
+        mask &= relevant
+
+        now = self._clock() if now is None else now
+        times = self._times
+        times.append(now)
+
+        transition = self._transitions[self._state].get(mask | pressed << 16)
+        if transition is None:
+            transition = self._build_transition(mask, pressed)
+        self._state, completed = transition
+        if not completed:
+            return ()
+
+        matches = []
+        for index in completed:
+            # The sequence's steps were the last len(sequence) inputs
+            if now - times[-len(self._sequences[index])] <= self._windows[index]:
+                matches.append(self._names[index])
+        for name in matches:
+            for callback in self._callbacks:
+                callback(name, state)
+        return tuple(matches)
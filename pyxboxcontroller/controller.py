@@ -5,10 +5,33 @@ http://msdn.microsoft.com/en-gb/library/windows/desktop/ee417001%28v=vs.85%29.as
 
 - Dan Forbes - Mid October 2022
 """
+import ctypes
+from _thread import allocate_lock  # threading itself is slow to import
+from collections.abc import AsyncIterator, Callable
 from functools import cache
 from enum import IntEnum
+from time import monotonic, perf_counter_ns
 
 from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend, get_backend
+
+_STATE_SIZE = ctypes.sizeof(XInput.XINPUT_STATE)
+
+
+class _ButtonsDescriptor:
+    """
+    `buttons` of XboxControllerState.\n
+    On the class gives the default (all released) buttons dict,
+    on an instance decodes the button mask into a dict on first access.
+    """
+
+    def __get__(self, instance, owner) -> dict[str, bool]:
+        if instance is None:
+            return owner._default_buttons()
+        buttons = instance._buttons_dict
+        if buttons is None:
+            buttons = instance._buttons_dict = instance._get_button_states(instance._buttons)
+        return buttons
 
 
 class XboxControllerState:
@@ -26,8 +49,29 @@ class XboxControllerState:
 
     Check the packet number with:
     >>> state.packet_number
+
+    States are equal, and hash the same, when their raw values are, whatever their packet numbers.
+
+    Only the raw values are stored, individual buttons are a single bit test and
+    the buttons dict and normalised axes are only decoded when first accessed.
+    The raw values are available with:
+    >>> state.button_mask
+    >>> state.raw
     """
 
+    __slots__ = (
+        "packet_number",
+        "_buttons",
+        "_left_trigger",
+        "_right_trigger",
+        "_l_thumb_x",
+        "_l_thumb_y",
+        "_r_thumb_x",
+        "_r_thumb_y",
+        "_buttons_dict",
+        "_axes",
+    )
+
     # Button map represents the bitmasks for accessing each button encoded in gamepad.buttons.
     # See https://learn.microsoft.com/en-us/windows/win32/api/xinput/ns-xinput-xinput_gamepad
     _BUTTON_MAP: dict[str, int] = {
@@ -56,41 +100,63 @@ class XboxControllerState:
         # if buttons not in self.BUTTON_MAP.values():
         #     print(f"Unknown button or combination: {buttons}")
 
-        # Get states of each button
-        self.buttons: dict[str, bool] = self._get_button_states(gamepad.buttons)
+        # Keep the raw values, decoded on first access
+        self._buttons: int = gamepad.buttons
+        self._left_trigger = gamepad.left_trigger
+        self._right_trigger = gamepad.right_trigger
+        self._l_thumb_x = gamepad.l_thumb_x
+        self._l_thumb_y = gamepad.l_thumb_y
+        self._r_thumb_x = gamepad.r_thumb_x
+        self._r_thumb_y = gamepad.r_thumb_y
+        self._buttons_dict: dict[str, bool] | None = None
+        self._axes: tuple[float, ...] | None = None
 
-        # Thumbsticks
-        # TODO add deadzones
-        # round to 4 decimal places
-        # rounding ignores the error with converting signed 32-bit int to float
-        # (-32768 to 32767) to (-1.0 to 1.0)
-        self.l_thumb_x: float = round(gamepad.l_thumb_x / 32767., 4)
-        self.l_thumb_y: float = round(gamepad.l_thumb_y / 32767., 4)
-        self.r_thumb_x: float = round(gamepad.r_thumb_x / 32767., 4)
-        self.r_thumb_y: float = round(gamepad.r_thumb_y / 32767., 4)
+    @classmethod
+    def from_raw(
+            cls,
+            packet_number: int,
+            buttons: int,
+            left_trigger: int,
+            right_trigger: int,
+            l_thumb_x: int,
+            l_thumb_y: int,
+            r_thumb_x: int,
+            r_thumb_y: int
+            ) -> "XboxControllerState":
+        """Create a state from raw XINPUT_GAMEPAD values, without an XInput struct"""
+        self = cls.__new__(cls)
+        self.packet_number = packet_number
+        self._buttons = buttons
+        self._left_trigger = left_trigger
+        self._right_trigger = right_trigger
+        self._l_thumb_x = l_thumb_x
+        self._l_thumb_y = l_thumb_y
+        self._r_thumb_x = r_thumb_x
+        self._r_thumb_y = r_thumb_y
+        self._buttons_dict = None
+        self._axes = None
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        """States are equal when their raw payloads are, whatever their packet numbers"""
+        if not isinstance(other, XboxControllerState):
+            return NotImplemented
+        return (
+            self._buttons == other._buttons
+            and self._l_thumb_x == other._l_thumb_x
+            and self._l_thumb_y == other._l_thumb_y
+            and self._r_thumb_x == other._r_thumb_x
+            and self._r_thumb_y == other._r_thumb_y
+            and self._left_trigger == other._left_trigger
+            and self._right_trigger == other._right_trigger)
 
-        # Triggers
-        self.l_trigger: float = round(gamepad.left_trigger / 255., 4)
-        self.r_trigger: float = round(gamepad.right_trigger / 255., 4)
+    def __hash__(self) -> int:
+        return hash(self.raw)
 
     @classmethod
     def default_state(cls):
         """Returns a default state of XboxControllerState"""
-        class XInputSpoofState:
-            """Spoof an XInput state packet"""
-            packet_number: int = -1
-
-            class gamepad:
-                buttons: int = 0
-                l_thumb: float = 0.
-                l_thumb_x: float = 0.
-                l_thumb_y: float = 0.
-                r_thumb: float = 0.
-                r_thumb_x: float = 0.
-                r_thumb_y: float = 0.
-                left_trigger: float = 0.
-                right_trigger: float = 0.
-        return cls(XInputSpoofState())
+        return cls.from_raw(-1, 0, 0, 0, 0, 0, 0, 0)
 
     def __repr__(self) -> str:
         return (
@@ -116,6 +182,63 @@ class XboxControllerState:
             btn: (bitmask & gamepad_buttons) != 0
             for btn, bitmask in self._BUTTON_MAP.items()}
 
+    def _decode_axes(self) -> tuple[float, ...]:
+        """Normalise thumbsticks and triggers, in the order
+        (l_thumb_x, l_thumb_y, r_thumb_x, r_thumb_y, l_trigger, r_trigger)"""
+        # Thumbsticks
+        # Deadzones are applied by XboxController, see pyxboxcontroller.deadzones
+        # round to 4 decimal places
+        # rounding ignores the error with converting signed 32-bit int to float
+        # (-32768 to 32767) to (-1.0 to 1.0)
+        axes = self._axes = (
+            round(self._l_thumb_x / 32767., 4),
+            round(self._l_thumb_y / 32767., 4),
+            round(self._r_thumb_x / 32767., 4),
+            round(self._r_thumb_y / 32767., 4),
+            # Triggers
+            round(self._left_trigger / 255., 4),
+            round(self._right_trigger / 255., 4))
+        return axes
+
+    # Raw values
+    @property
+    def button_mask(self) -> int:
+        """The raw buttons bitmask of XINPUT_GAMEPAD"""
+        return self._buttons
+
+    @property
+    def raw(self) -> tuple[int, int, int, int, int, int, int]:
+        """The raw values of XINPUT_GAMEPAD, in the order
+        (buttons, left_trigger, right_trigger, l_thumb_x, l_thumb_y, r_thumb_x, r_thumb_y)"""
+        return (
+            self._buttons,
+            self._left_trigger,
+            self._right_trigger,
+            self._l_thumb_x,
+            self._l_thumb_y,
+            self._r_thumb_x,
+            self._r_thumb_y)
+
+    # Normalised axes
+    @property
+    def l_thumb_x(self) -> float:
+        return (self._axes or self._decode_axes())[0]
+    @property
+    def l_thumb_y(self) -> float:
+        return (self._axes or self._decode_axes())[1]
+    @property
+    def r_thumb_x(self) -> float:
+        return (self._axes or self._decode_axes())[2]
+    @property
+    def r_thumb_y(self) -> float:
+        return (self._axes or self._decode_axes())[3]
+    @property
+    def l_trigger(self) -> float:
+        return (self._axes or self._decode_axes())[4]
+    @property
+    def r_trigger(self) -> float:
+        return (self._axes or self._decode_axes())[5]
+
     # Thumbstick getter
     @property
     def l_thumb(self) -> tuple[float, float]:
@@ -132,56 +255,58 @@ class XboxControllerState:
         """Returns the position of triggers (L,R)"""
         return (self.l_trigger, self.r_trigger)
 
-    # Individual button getters
+    # Individual button getters, bitwise and (&) with the button's bitmask
     @property
     def a(self) -> bool:
-        return self.buttons["a"]
+        return (self._buttons & 4096) != 0
     @property
     def b(self) -> bool:
-        return self.buttons["b"]
+        return (self._buttons & 8192) != 0
     @property
     def x(self) -> bool:
-        return self.buttons["x"]
+        return (self._buttons & 16384) != 0
     @property
     def y(self) -> bool:
-        return self.buttons["y"]
+        return (self._buttons & 32768) != 0
     @property
     def lb(self) -> bool:
-        return self.buttons["lb"]
+        return (self._buttons & 256) != 0
     @property
     def rb(self) -> bool:
-        return self.buttons["rb"]
+        return (self._buttons & 512) != 0
     @property
     def start(self) -> bool:
-        return self.buttons["start"]
+        return (self._buttons & 16) != 0
     @property
     def select(self) -> bool:
-        return self.buttons["select"]
+        return (self._buttons & 32) != 0
     @property
     def dpad_up(self) -> bool:
-        return self.buttons["dpad_up"]
+        return (self._buttons & 1) != 0
     @property
     def dpad_down(self) -> bool:
-        return self.buttons["dpad_down"]
+        return (self._buttons & 2) != 0
     @property
     def dpad_right(self) -> bool:
-        return self.buttons["dpad_right"]
+        return (self._buttons & 8) != 0
     @property
     def dpad_left(self) -> bool:
-        return self.buttons["dpad_left"]
+        return (self._buttons & 4) != 0
     @property
     def l3(self) -> bool:
-        return self.buttons["l3"]
+        return (self._buttons & 64) != 0
     @property
     def r3(self) -> bool:
-        return self.buttons["r3"]
+        return (self._buttons & 128) != 0
+
+    # dict representing the current state of buttons,
+    # the default buttons dict when gotten from the class
+    buttons = _ButtonsDescriptor()
 
     @classmethod
-    @property
     @cache
-    # Default buttons dict
-    def buttons(cls) -> dict[str, bool]:
-        """dict representing the current state of buttons"""
+    def _default_buttons(cls) -> dict[str, bool]:
+        """Default buttons dict"""
         return {btn: False for btn in cls._BUTTON_MAP}
 
 
@@ -206,6 +331,114 @@ class BatteryType(IntEnum):
     UNKNOWN = 255
 
 
+class PollStatus(IntEnum):
+    """Result of XboxController.try_poll"""
+    NEW = 0  # A new packet, the state is returned
+    UNCHANGED = 1  # Same packet as the last poll, the last state is returned
+    DISCONNECTED = 2  # No controller connected, or waiting to try reconnecting
+    ERROR = 3  # The backend returned an unexpected error
+
+
+class ConnectionState(IntEnum):
+    """Connection of an XboxController, as tracked by try_poll.\n
+    LOST after a connected controller stops responding,
+    RECONNECTING once a reconnect attempt has failed, or before it has ever been connected."""
+    CONNECTED = 0
+    LOST = 1
+    RECONNECTING = 2
+
+
+class Keystroke:
+    """
+    A key down, up or repeat event queued by XInput.\n
+    button is the name of the button (see XboxControllerState._BUTTON_MAP),
+    "l_trigger"/"r_trigger", or the direction of a thumbstick, e.g. "lthumb_upleft".
+    """
+
+    __slots__ = ("virtual_key", "flags", "user_index")
+
+    @staticmethod
+    @cache
+    def _button_names() -> dict[int, str]:
+        """Names of the virtual keys which aren't thumbstick directions"""
+        keys = XInput.VirtualKeys
+        return {
+            keys.A: "a",
+            keys.B: "b",
+            keys.X: "x",
+            keys.Y: "y",
+            keys.RSHOULDER: "rb",
+            keys.LSHOULDER: "lb",
+            keys.LTRIGGER: "l_trigger",
+            keys.RTRIGGER: "r_trigger",
+            keys.DPAD_UP: "dpad_up",
+            keys.DPAD_DOWN: "dpad_down",
+            keys.DPAD_LEFT: "dpad_left",
+            keys.DPAD_RIGHT: "dpad_right",
+            keys.START: "start",
+            keys.BACK: "select",
+            keys.LTHUMB_PRESS: "l3",
+            keys.RTHUMB_PRESS: "r3",
+        }
+
+    def __init__(self, keystroke: XInput.XINPUT_KEYSTROKE) -> None:
+        self.virtual_key: int = keystroke.virtual_key
+        self.flags: int = keystroke.flags
+        self.user_index: int = keystroke.user_index
+
+    @property
+    def button(self) -> str:
+        name = self._button_names().get(self.virtual_key)
+        if name is None:
+            try:
+                name = XInput.VirtualKeys(self.virtual_key).name.lower()
+            except ValueError:
+                name = hex(self.virtual_key)
+        return name
+
+    @property
+    def down(self) -> bool:
+        return (self.flags & XInput.KeystrokeFlags.KEYDOWN) != 0
+
+    @property
+    def up(self) -> bool:
+        return (self.flags & XInput.KeystrokeFlags.KEYUP) != 0
+
+    @property
+    def repeat(self) -> bool:
+        return (self.flags & XInput.KeystrokeFlags.REPEAT) != 0
+
+    def __repr__(self) -> str:
+        return f"Keystroke({self.button}, {XInput.KeystrokeFlags(self.flags)!r})"
+
+
+class XboxCapabilities:
+    """
+    Parses an XInputCapabilities Struct into a sensible representation.\n
+    button_mask has a bit set for each supported button, see XboxControllerState._BUTTON_MAP.
+    """
+
+    def __init__(self, capabilities: XInput.XINPUT_CAPABILITIES) -> None:
+        self.sub_type: int = capabilities.sub_type
+        self.flags = XInput.CapabilityFlags(capabilities.flags)
+        self.button_mask: int = capabilities.gamepad.buttons
+        self.vibration: tuple[int, int] = (
+            capabilities.vibration.left_motor_speed, capabilities.vibration.right_motor_speed)
+
+    @property
+    def wireless(self) -> bool:
+        return XInput.CapabilityFlags.WIRELESS in self.flags
+
+    @property
+    def supports_vibration(self) -> bool:
+        return self.vibration != (0, 0)
+
+    def __repr__(self) -> str:
+        return (
+            f"Sub type: {self.sub_type}, flags: {self.flags!r}, "
+            f"buttons: {self.button_mask:#06x}, vibration: {self.supports_vibration}")
+
+
 class XboxBatteryInfo:
     """
     Parses an XInputBatteryInformation Struct into a sensible representation.\n
@@ -230,6 +463,14 @@ class XboxBatteryInfo:
             battery_level = BatteryLevel.EMPTY
         return cls(XInputSpoofBatteryInfo())
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, XboxBatteryInfo):
+            return NotImplemented
+        return (self.battery_type, self.level) == (other.battery_type, other.level)
+
+    def __hash__(self) -> int:
+        return hash((self.battery_type, self.level))
+
     def __repr__(self) -> str:
         return (
             f"Battery level: {self.level.name}\n"
@@ -263,29 +504,135 @@ class XboxController:
     The complete battery information can be gotten with:
     >>> battery_info: XboxBatteryInfo = my_controller.battery_info
 
+    For the tightest loops, poll without creating XboxControllerState objects with:
+    >>> packet_number, changed = my_controller.poll_raw()
+    >>> packet_number, changed = my_controller.poll_into(raw_state_buffer, index)
+
+    Battery information changes slowly, cache it for a number of seconds with:
+    >>> my_controller.battery_ttl = 30.
+
+    By default controllers are read through XInput. Another backend can be given
+    as an instance or by name, it is only resolved on first use:
+    >>> my_controller = XboxController(0, backend="simulated")
+
+    Deadzones and response curves are applied to every new state once assigned:
+    >>> my_controller.deadzones = Deadzones()
+
+    States with the same payload as a recent packet are reused once an intern cache is assigned:
+    >>> my_controller.intern_cache = StateInternCache()
+
+    Axes are smoothed as new states arrive once filters are assigned:
+    >>> my_controller.filters = FilterPipeline([OneEuroFilter()])
+
+    Polling latency and missed packets are measured once instrumentation is assigned:
+    >>> my_controller.instrumentation = PollInstrumentation()
+
+    Get every button press and release since the last call, even if the state is polled slowly:
+    >>> for keystroke in my_controller.keystrokes():
+    ...     print(keystroke.button, keystroke.down)
+
+    Poll without exceptions while tolerating disconnects, reconnect attempts are backed off:
+    >>> status, state = my_controller.try_poll()
+    >>> my_controller.on_connection_change(lambda previous, current: print(current.name))
+
+    Set the strength (0 to 1) of the left and right rumble motors with:
+    >>> my_controller.set_rumble(1., 0.5)
+    >>> my_controller.rumble_pulse(1., 1., duration=0.25)
+
     Raises a RuntimeError when communication with controller fails.
     """
 
-    # TODO
-    # Deadzones
-    # Rumble
-
     # Specifies this is a controller for getting battery info
     device_type = XInput.DeviceTypes.GAMEPAD
 
-    def __init__(self, controller_id: int):
+    def __init__(self, controller_id: int, backend: Backend | str | None = None):
         self.id = controller_id
+        self._backend = backend
         self._state = XInput.XINPUT_STATE()
         self._battery_info = XInput.XINPUT_BATTERY_INFORMATION()
         self._last_packet_number: int = -1
         self._last_state: XboxControllerState = XboxControllerState.default_state()
+        # Raw polling, see poll_raw
+        self._state_address: int = ctypes.addressof(self._state)
+        self._raw_view = memoryview(self._state).cast("B")
+        self._last_raw_packet_number: int = -1
+        # Deadzones and response curves, see pyxboxcontroller.deadzones
+        self._deadzones = None
+        # Smoothing of the axes, see pyxboxcontroller.filters
+        self.filters = None
+        # Reuse of decoded payloads, see pyxboxcontroller.interning
+        self.intern_cache = None
+        # Polling statistics, see pyxboxcontroller.instrumentation
+        self.instrumentation = None
+
+        # Rumble, see pyxboxcontroller.rumble
+        self._vibration = XInput.XINPUT_VIBRATION()
+        self._rumble_speeds: tuple[int, int] = (0, 0)
+        self._last_rumble_write: float = float("-inf")
+        # Held while writing, set_rumble and the rumble scheduler's thread both write
+        self._rumble_lock = allocate_lock()
+        # Minimum seconds between writes of the motor speeds
+        self.rumble_min_interval: float = 0.005
+        # Scheduler running rumble effects, the shared scheduler when None
+        self.rumble_scheduler = None
+
+        # Seconds battery info is cached for, 0 to get it from the controller every time
+        self.battery_ttl: float = 0.
+        self._cached_battery_info: XboxBatteryInfo | None = None
+        self._battery_expires: float = float("-inf")
+        self._battery_callbacks: list[Callable] = []
+        self._battery_refresh_stop = None
+
+        # Connection state machine, see try_poll
+        self.connection_state = ConnectionState.RECONNECTING
+        # Seconds between reconnect attempts, doubling after each failed attempt
+        self.reconnect_min_backoff: float = 0.1
+        self.reconnect_max_backoff: float = 2.
+        # Failed reconnect attempts since last connected
+        self._reconnect_attempts: int = 0
+        self._next_reconnect: float = float("-inf")
+        self._connection_callbacks: list[Callable] = []
+
+        # Keystrokes, see keystrokes()
+        self._keystroke = XInput.XINPUT_KEYSTROKE()
+
+    @property
+    def packet_number(self) -> int:
+        """Packet number of the latest state, -1 before the first"""
+        return self._last_packet_number
+
+    @property
+    def deadzones(self):
+        """Deadzones and response curves applied to new states, see pyxboxcontroller.deadzones"""
+        return self._deadzones
+
+    @deadzones.setter
+    def deadzones(self, deadzones) -> None:
+        self._deadzones = deadzones
+        # Interned axes were decoded with the previous deadzones
+        if self.intern_cache is not None:
+            self.intern_cache.clear()
+
+    @property
+    def backend(self) -> Backend:
+        """The backend used to read the controller, resolved on first use"""
+        backend = self._backend
+        if not isinstance(backend, Backend):
+            backend = self._backend = get_backend(backend)
+        return backend
 
     @property
     def state(self) -> XboxControllerState:
         """Get the current state of the controller"""
 
-        # Get controller state from XInput
-        res = XInput.GetState(self.id, self._state)
+        # Get controller state from the backend
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            res = self.backend.get_state(self.id, self._state)
+        else:
+            start = perf_counter_ns()
+            res = self.backend.get_state(self.id, self._state)
+            instrumentation.record(start, perf_counter_ns(), res, self._state.packet_number)
 
         # Handle response from XInput
         self.handle_response_code(res, current_action="get state")
@@ -297,18 +644,245 @@ class XboxController:
         if packet_number == self._last_packet_number:
             return self._last_state
 
-        # Convert XInput state struct into sensible response
-        new_state = XboxControllerState(self._state)
+        return self._new_state(packet_number)
+
+    def _new_state(self, packet_number: int) -> XboxControllerState:
+        """Decode the XInput state struct, and recall it as the latest packet"""
+        intern_cache = self.intern_cache
+        # Filtered axes depend on earlier states, so can't be shared
+        if intern_cache is not None and self.filters is None:
+            payload = self._raw_view[4:_STATE_SIZE].tobytes()
+            decoded = intern_cache.get(payload)
+            new_state = XboxControllerState(self._state)
+            if decoded is None:
+                if self._deadzones is not None:
+                    new_state._axes = self._deadzones.apply(new_state)
+                intern_cache.put(payload, new_state)
+            else:
+                # Share the immutable decoded axes, each packet keeps its own packet number
+                # and decodes its own buttons dict, which callers may mutate
+                if decoded._axes is None:
+                    decoded._axes = decoded._decode_axes()
+                new_state._axes = decoded._axes
+            self._last_packet_number, self._last_state = packet_number, new_state
+            return new_state
 
-        # Recall latest packet
+        new_state = XboxControllerState(self._state)
+        if self._deadzones is not None:
+            new_state._axes = self._deadzones.apply(new_state)
+        if self.filters is not None:
+            new_state._axes = self.filters.apply(new_state)
         self._last_packet_number, self._last_state = packet_number, new_state
-
         return new_state
 
+    def try_poll(self) -> tuple[PollStatus, XboxControllerState | None]:
+        """Get the current state without raising when the controller is disconnected.
+        Returns the status, and the state unless DISCONNECTED or ERROR.\n
+
+        While disconnected the backend is only asked again once the reconnect backoff has elapsed,
+        starting at reconnect_min_backoff seconds and doubling up to reconnect_max_backoff.
+        >>> status, state = controller.try_poll()
+        >>> if status == PollStatus.NEW:
+        ...     ...
+        """
+        connected = self.connection_state == ConnectionState.CONNECTED
+        if not connected and monotonic() < self._next_reconnect:
+            return PollStatus.DISCONNECTED, None
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            res = self.backend.get_state(self.id, self._state)
+        else:
+            start = perf_counter_ns()
+            res = self.backend.get_state(self.id, self._state)
+            instrumentation.record(start, perf_counter_ns(), res, self._state.packet_number)
+
+        if res == XInput.Codes.SUCCESS:
+            if not connected:
+                self._reconnect_attempts = 0
+                self._set_connection_state(ConnectionState.CONNECTED)
+            packet_number: int = self._state.packet_number
+            if packet_number == self._last_packet_number:
+                return PollStatus.UNCHANGED, self._last_state
+            return PollStatus.NEW, self._new_state(packet_number)
+
+        if res != XInput.Codes.NOT_CONNECTED:
+            return PollStatus.ERROR, None
+
+        self._next_reconnect = monotonic() + min(
+            self.reconnect_min_backoff * 2 ** self._reconnect_attempts, self.reconnect_max_backoff)
+        if connected:
+            self._set_connection_state(ConnectionState.LOST)
+        else:
+            self._reconnect_attempts = min(self._reconnect_attempts + 1, 32)
+            if self.connection_state == ConnectionState.LOST:
+                self._set_connection_state(ConnectionState.RECONNECTING)
+        return PollStatus.DISCONNECTED, None
+
+    def _set_connection_state(self, connection_state: ConnectionState) -> None:
+        previous = self.connection_state
+        self.connection_state = connection_state
+        for callback in self._connection_callbacks:
+            callback(previous, connection_state)
+
+    def on_connection_change(
+            self,
+            callback: Callable[[ConnectionState, ConnectionState], None]
+            ) -> None:
+        """Call callback(previous, current) when try_poll changes the connection state"""
+        self._connection_callbacks.append(callback)
+
+    def poll_raw(self) -> tuple[int, bool]:
+        """Get the current state into the controller's XINPUT_STATE struct without decoding it.
+        Returns the packet number, and whether it changed since the last raw poll.
+        Read the raw struct with raw_view."""
+        res = self.backend.get_state(self.id, self._state)
+        if res:
+            self.handle_response_code(res, current_action="get state")
+        packet_number = self._state.packet_number
+        changed = packet_number != self._last_raw_packet_number
+        self._last_raw_packet_number = packet_number
+        return packet_number, changed
+
+    def poll_into(self, buffer, index: int = 0) -> tuple[int, bool]:
+        """Get the current state into record index of a RawStateBuffer (see pyxboxcontroller.raw).
+        Returns the packet number, and whether it changed since the last raw poll."""
+        if not 0 <= index < len(buffer):
+            raise IndexError(f"Record index {index} out of range for a buffer of {len(buffer)}")
+        packet_number, changed = self.poll_raw()
+        ctypes.memmove(buffer.address + index * _STATE_SIZE, self._state_address, _STATE_SIZE)
+        return packet_number, changed
+
+    @property
+    def raw_view(self) -> memoryview:
+        """memoryview of the bytes of the controller's XINPUT_STATE struct, updated by every poll"""
+        return self._raw_view
+
+    async def changes(
+            self,
+            min_interval: float = 0.001,
+            max_interval: float = 0.05,
+            backoff: float = 1.5
+            ) -> AsyncIterator[XboxControllerState]:
+        """Asynchronously yields the state whenever the packet number changes,
+        starting with the current state.\n
+
+        Polls on the event loop without a thread. The interval between polls starts at
+        min_interval, grows by backoff while the controller is idle up to max_interval,
+        and drops back to min_interval as soon as a new packet arrives.
+        >>> async for state in controller.changes():
+        ...     print(state)
+        """
+        import asyncio
+
+        interval = min_interval
+        last_packet_number = None
+        while True:
+            state = self.state
+            if self._last_packet_number != last_packet_number:
+                last_packet_number = self._last_packet_number
+                interval = min_interval
+                yield state
+            else:
+                interval = min(interval * backoff, max_interval)
+            await asyncio.sleep(interval)
+
+    async def wait_until(
+            self,
+            condition: Callable[[XboxControllerState], bool],
+            **changes_kwargs: float
+            ) -> XboxControllerState:
+        """Wait for a state matching condition, returns that state.
+        Accepts the same polling arguments as changes().
+        >>> await controller.wait_until(lambda state: state.start)
+        """
+        async for state in self.changes(**changes_kwargs):
+            if condition(state):
+                return state
+
+    def _get_rumble_scheduler(self):
+        if self.rumble_scheduler is None:
+            from pyxboxcontroller.rumble import get_scheduler
+            self.rumble_scheduler = get_scheduler()
+        return self.rumble_scheduler
+
+    def _write_rumble(self, speeds: tuple[int, int], now: float) -> float | None:
+        """Write motor speeds to the controller, unless they're unchanged.
+        Returns the time to retry at if a write was too recent."""
+        with self._rumble_lock:
+            if speeds == self._rumble_speeds:
+                return None
+            ready_at = self._last_rumble_write + self.rumble_min_interval
+            if now < ready_at:
+                return ready_at
+
+            vibration = self._vibration
+            vibration.left_motor_speed, vibration.right_motor_speed = speeds
+            res = self.backend.set_vibration(self.id, vibration)
+            # Like XInput with a controller without motors, the speeds are ignored
+            if res != XInput.Codes.NOT_SUPPORTED:
+                self.handle_response_code(res, current_action="set rumble")
+            self._rumble_speeds, self._last_rumble_write = speeds, now
+            return None
+
+    def set_rumble(self, left: float, right: float) -> None:
+        """Set the strength of the left and right motors, between 0 and 1.
+        Stops any rumble effect playing on this controller.
+        Does nothing if the backend or controller doesn't support rumble."""
+        from pyxboxcontroller.rumble import motor_speeds
+
+        if self.rumble_scheduler is not None:
+            self.rumble_scheduler.stop(self)
+        speeds = motor_speeds(left, right)
+        retry_at = self._write_rumble(speeds, monotonic())
+        if retry_at is not None:
+            self._get_rumble_scheduler().defer(self, speeds, retry_at)
+
+    def play_rumble(self, effect) -> None:
+        """Play a RumbleEffect, replacing any effect already playing on this controller"""
+        self._get_rumble_scheduler().play(self, effect)
+
+    def rumble_pulse(self, left: float, right: float, duration: float) -> None:
+        """Rumble with the given strengths for duration seconds"""
+        from pyxboxcontroller.rumble import pulse
+        self.play_rumble(pulse(left, right, duration))
+
+    def keystrokes(self) -> list[Keystroke]:
+        """Every keystroke queued since the last call, oldest first.
+        Presses are queued by XInput however slowly the state is polled."""
+        get_keystroke = self.backend.get_keystroke
+        keystroke = self._keystroke
+        keystrokes = []
+        while True:
+            res = get_keystroke(self.id, keystroke)
+            if res == XInput.Codes.SUCCESS:
+                keystrokes.append(Keystroke(keystroke))
+            elif res == XInput.Codes.EMPTY:
+                return keystrokes
+            else:
+                self.handle_response_code(res, current_action="get keystroke")
+
+    @property
+    def capabilities(self) -> XboxCapabilities:
+        """Get the features supported by the controller"""
+        capabilities = XInput.XINPUT_CAPABILITIES()
+        res = self.backend.get_capabilities(self.id, XInput.XINPUT_FLAG_GAMEPAD, capabilities)
+        self.handle_response_code(res, current_action="get capabilities")
+        return XboxCapabilities(capabilities)
+
     @property
     def battery_info(self) -> XboxBatteryInfo:
-        """Get the battery information of the controller"""
-        response = XInput.GetBatteryInformation(
+        """Get the battery information of the controller.
+        Cached for battery_ttl seconds, or kept up to date by start_battery_refresh()"""
+        if self._battery_refresh_stop is not None:
+            return self._cached_battery_info
+        if monotonic() < self._battery_expires:
+            return self._cached_battery_info
+        return self.refresh_battery_info()
+
+    def refresh_battery_info(self) -> XboxBatteryInfo:
+        """Get the battery information from the controller, bypassing the cache"""
+        response = self.backend.get_battery_information(
             self.id,
             self.device_type,
             self._battery_info)
@@ -319,8 +893,64 @@ class XboxController:
         # Convert the XInput struct into a sensible response
         battery_info = XboxBatteryInfo(self._battery_info)
 
+        self._update_battery_info(battery_info)
         return battery_info
 
+    def _update_battery_info(self, battery_info: XboxBatteryInfo) -> None:
+        """Cache battery_info, notifying callbacks if it changed"""
+        previous = self._cached_battery_info
+        self._cached_battery_info = battery_info
+        self._battery_expires = monotonic() + self.battery_ttl
+        if battery_info != previous:
+            for callback in self._battery_callbacks:
+                callback(previous, battery_info)
+
+    def on_battery_change(
+            self,
+            callback: Callable[["XboxBatteryInfo | None", XboxBatteryInfo], None]
+            ) -> None:
+        """Call callback(previous, current) when the battery type or level changes,
+        previous is None for the first reading"""
+        self._battery_callbacks.append(callback)
+
+    def start_battery_refresh(self, interval: float = 30.) -> None:
+        """Refresh the battery information every interval seconds on a background thread.
+        battery_info then returns the latest reading without calling the backend.
+        A disconnected controller is reported with BatteryType.DISCONNECTED,
+        any other error stops the refresh, so battery_info raises it from the backend."""
+        import threading
+
+        self.stop_battery_refresh()
+        stop = threading.Event()
+
+        def refresh() -> None:
+            try:
+                self.refresh_battery_info()
+            except ConnectionError:
+                self._update_battery_info(XboxBatteryInfo.default_state())
+
+        # First reading before returning, so battery_info is always populated
+        refresh()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    refresh()
+                except Exception:
+                    # Fall back to reading the backend, unless already restarted or stopped
+                    if self._battery_refresh_stop is stop:
+                        self.stop_battery_refresh()
+                    return
+
+        self._battery_refresh_stop = stop
+        threading.Thread(target=run, name=f"BatteryRefresh-{self.id}", daemon=True).start()
+
+    def stop_battery_refresh(self) -> None:
+        """Stop refreshing the battery information in the background"""
+        if self._battery_refresh_stop is not None:
+            self._battery_refresh_stop.set()
+            self._battery_refresh_stop = None
+
     @property
     def battery_level(self) -> BatteryLevel:
         """Get the current charge level of the battery.
@@ -346,6 +976,10 @@ class XboxController:
                      f"last packet id: {self._last_packet_number}"))
                 raise exc
 
+            case XInput.Codes.NOT_SUPPORTED:
+                raise NotImplementedError(
+                    f"The {self.backend.name} backend can't {current_action} of device {self.id}")
+
             case _ as exc:
                 raise RuntimeError(
                     (f"Unknown error {xinput_response_code}"
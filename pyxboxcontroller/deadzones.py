@@ -0,0 +1,216 @@
+"""
+Deadzones and response curves for thumbsticks and triggers.
+
+Settings are compiled into lookup tables over the raw int16/uint8 values when configured,
+so applying them to a state is a table index rather than float math:
+>>> controller.deadzones = Deadzones(
+...     left_stick=StickConfig(deadzone=0.2, curve=exponential_curve(2.)),
+...     right_trigger=TriggerConfig(deadzone=0.1, anti_deadzone=0.05))
+
+Radial stick deadzones index a table of scale factors by the squared magnitude of the stick,
+which avoids a square root per state.
+"""
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable, Sequence
+
+ResponseCurve = Callable[[float], float]
+
+# XInput's recommended deadzones, see XINPUT_GAMEPAD_LEFT_THUMB_DEADZONE etc.
+LEFT_THUMB_DEADZONE: float = 7849 / 32767
+RIGHT_THUMB_DEADZONE: float = 8689 / 32767
+TRIGGER_THRESHOLD: float = 30 / 255
+
+# Radial tables are indexed by (x * x + y * y) >> RADIAL_SHIFT
+RADIAL_SHIFT: int = 15
+_MAX_SQUARED: int = 2 * 32768 * 32768
+
+
+def linear_curve(value: float) -> float:
+    return value
+
+
+def exponential_curve(exponent: float = 2.) -> ResponseCurve:
+    """value ** exponent, exponents above 1 give finer control near the centre"""
+    def curve(value: float) -> float:
+        return value ** exponent
+    return curve
+
+
+def piecewise_curve(points: Sequence[tuple[float, float]]) -> ResponseCurve:
+    """Linear interpolation between (input, output) points, sorted by input"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+
+    def curve(value: float) -> float:
+        i = bisect_right(xs, value)
+        if i == 0:
+            return ys[0]
+        if i == len(xs):
+            return ys[-1]
+        x0, x1, y0, y1 = xs[i - 1], xs[i], ys[i - 1], ys[i]
+        return y0 + (y1 - y0) * (value - x0) / (x1 - x0)
+    return curve
+
+
+class _AxisResponse:
+    """Maps a magnitude between 0 and 1 through deadzones and a response curve"""
+
+    def __init__(
+            self,
+            deadzone: float,
+            outer_deadzone: float,
+            anti_deadzone: float,
+            curve: ResponseCurve
+            ) -> None:
+        if not 0. <= deadzone < 1. - outer_deadzone:
+            raise ValueError(
+                f"deadzone ({deadzone}) and outer_deadzone ({outer_deadzone}) "
+                "must leave part of the range active")
+        if not 0. <= anti_deadzone < 1.:
+            raise ValueError(f"anti_deadzone must be between 0 and 1, got {anti_deadzone}")
+        self.deadzone = deadzone
+        self.outer_deadzone = outer_deadzone
+        self.anti_deadzone = anti_deadzone
+        self.curve = curve
+
+    def __call__(self, magnitude: float) -> float:
+        if magnitude <= self.deadzone:
+            return 0.
+        active = (magnitude - self.deadzone) / (1. - self.deadzone - self.outer_deadzone)
+        response = self.curve(min(active, 1.))
+        return self.anti_deadzone + (1. - self.anti_deadzone) * response
+
+
+class StickConfig:
+    """
+    Deadzone settings of a thumbstick, as fractions of full deflection.\n
+    deadzone: magnitude below which the stick reads as centred
+    outer_deadzone: distance from the edge beyond which the stick reads as fully deflected
+    anti_deadzone: smallest magnitude output once outside the deadzone
+    curve: maps the remaining range (0 to 1) to the output (0 to 1)
+    radial: apply to the stick's magnitude rather than each axis separately
+    """
+
+    def __init__(
+            self,
+            deadzone: float = LEFT_THUMB_DEADZONE,
+            outer_deadzone: float = 0.,
+            anti_deadzone: float = 0.,
+            curve: ResponseCurve = linear_curve,
+            radial: bool = True
+            ) -> None:
+        self.response = _AxisResponse(deadzone, outer_deadzone, anti_deadzone, curve)
+        self.radial = radial
+        self._table: array | None = None
+
+    def table(self) -> array:
+        """Radial: scale factor for raw x and y, indexed by the squared magnitude >> RADIAL_SHIFT.
+        Axial: normalised value, indexed by raw + 32768.
+        Built on first use."""
+        if self._table is None:
+            self._table = self._build_table()
+        return self._table
+
+    def _build_table(self) -> array:
+        response = self.response
+        if self.radial:
+            table = array("d", [0.]) * ((_MAX_SQUARED >> RADIAL_SHIFT) + 1)
+            for index in range(1, len(table)):
+                # Centre of the bucket of squared magnitudes
+                magnitude = ((index << RADIAL_SHIFT) + (1 << (RADIAL_SHIFT - 1))) ** 0.5
+                table[index] = response(min(magnitude / 32767., 1.)) / magnitude
+            return table
+
+        table = array("d", [0.]) * 65536
+        for raw in range(-32768, 32768):
+            value = response(min(abs(raw) / 32767., 1.))
+            table[raw + 32768] = round(value if raw >= 0 else -value, 4)
+        return table
+
+
+class TriggerConfig:
+    """
+    Deadzone settings of a trigger, as fractions of a full pull.\n
+    See StickConfig for the meaning of each setting.
+    """
+
+    def __init__(
+            self,
+            deadzone: float = TRIGGER_THRESHOLD,
+            outer_deadzone: float = 0.,
+            anti_deadzone: float = 0.,
+            curve: ResponseCurve = linear_curve
+            ) -> None:
+        self.response = _AxisResponse(deadzone, outer_deadzone, anti_deadzone, curve)
+        self._table: array | None = None
+
+    def table(self) -> array:
+        """Normalised value, indexed by the raw value. Built on first use."""
+        if self._table is None:
+            self._table = array("d", (round(self.response(raw / 255.), 4) for raw in range(256)))
+        return self._table
+
+
+class Deadzones:
+    """
+    Deadzones and response curves of both thumbsticks and triggers.\n
+    Assign to an XboxController to apply them to every new state:
+    >>> controller.deadzones = Deadzones(right_stick=StickConfig(RIGHT_THUMB_DEADZONE))
+
+    Or apply to the raw values of a state, in the order
+    (l_thumb_x, l_thumb_y, r_thumb_x, r_thumb_y, l_trigger, r_trigger):
+    >>> axes = deadzones.apply(state)
+    """
+
+    def __init__(
+            self,
+            left_stick: StickConfig | None = None,
+            right_stick: StickConfig | None = None,
+            left_trigger: TriggerConfig | None = None,
+            right_trigger: TriggerConfig | None = None
+            ) -> None:
+        self.left_stick = left_stick or StickConfig(LEFT_THUMB_DEADZONE)
+        self.right_stick = right_stick or StickConfig(RIGHT_THUMB_DEADZONE)
+        self.left_trigger = left_trigger or TriggerConfig()
+        self.right_trigger = right_trigger or TriggerConfig()
+        self.compile()
+
+    def compile(self) -> None:
+        """Build the lookup tables, call after changing a config"""
+        self._left_stick = self.left_stick.table(), self.left_stick.radial
+        self._right_stick = self.right_stick.table(), self.right_stick.radial
+        self._left_trigger = self.left_trigger.table()
+        self._right_trigger = self.right_trigger.table()
+
+    @staticmethod
+    def _stick(compiled: tuple[array, bool], x: int, y: int) -> tuple[float, float]:
+        table, radial = compiled
+        if not radial:
+            return table[x + 32768], table[y + 32768]
+        factor = table[(x * x + y * y) >> RADIAL_SHIFT]
+        out_x, out_y = x * factor, y * factor
+        # Corners of the square raw range can exceed a magnitude of 1
+        return (
+            round(max(-1., min(out_x, 1.)), 4),
+            round(max(-1., min(out_y, 1.)), 4))
+
+    def apply_raw(
+            self,
+            left_trigger: int,
+            right_trigger: int,
+            l_thumb_x: int,
+            l_thumb_y: int,
+            r_thumb_x: int,
+            r_thumb_y: int
+            ) -> tuple[float, float, float, float, float, float]:
+        """Apply to raw XINPUT_GAMEPAD values"""
+        return (
+            *self._stick(self._left_stick, l_thumb_x, l_thumb_y),
+            *self._stick(self._right_stick, r_thumb_x, r_thumb_y),
+            self._left_trigger[left_trigger],
+            self._right_trigger[right_trigger])
+
+    def apply(self, state) -> tuple[float, float, float, float, float, float]:
+        """Apply to the raw values of an XboxControllerState"""
+        return self.apply_raw(*state.raw[1:])
@@ -0,0 +1,576 @@
+"""
+Linux backend reading controllers from evdev devices (/dev/input/eventN).
+
+Events are read in bulk without blocking and folded into an XInput.XINPUT_STATE,
+so XboxController works the same as it does with XInput:
+>>> controller = XboxController(0, backend="evdev")
+
+A synthetic packet number is incremented for every SYN_REPORT which changed the state,
+the events of a report are applied together. When the kernel drops events (SYN_DROPPED)
+the whole state is read back from the device.
+
+Button and trigger changes queue keystrokes, and rumble uses the device's force feedback.
+
+Any readable file descriptor or path containing raw `struct input_event` records
+(e.g. a pipe or a recording) can be used in place of a device:
+>>> backend = EvdevBackend({0: "recorded_events.bin"})
+"""
+import ctypes
+import errno
+import glob
+import os
+import struct
+import time
+from collections import deque
+from collections.abc import Callable
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend, queue_keystrokes
+
+# struct input_event {struct timeval time; __u16 type; __u16 code; __s32 value;}
+INPUT_EVENT = struct.Struct("llHHi")
+
+# Event types and codes, see linux/input-event-codes.h
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+EV_FF = 0x15
+
+FF_RUMBLE = 0x50
+
+SYN_REPORT = 0
+SYN_DROPPED = 3
+
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_Z = 0x02
+ABS_RX = 0x03
+ABS_RY = 0x04
+ABS_RZ = 0x05
+ABS_HAT0X = 0x10
+ABS_HAT0Y = 0x11
+
+# Key codes to XInput button bitmasks, matching XboxControllerState._BUTTON_MAP
+KEY_MAP: dict[int, int] = {
+    0x220: 1,  # BTN_DPAD_UP
+    0x221: 2,  # BTN_DPAD_DOWN
+    0x222: 4,  # BTN_DPAD_LEFT
+    0x223: 8,  # BTN_DPAD_RIGHT
+    0x13b: 16,  # BTN_START
+    0x13a: 32,  # BTN_SELECT
+    0x13d: 64,  # BTN_THUMBL
+    0x13e: 128,  # BTN_THUMBR
+    0x136: 256,  # BTN_TL
+    0x137: 512,  # BTN_TR
+    0x130: 4096,  # BTN_A
+    0x131: 8192,  # BTN_B
+    0x133: 16384,  # BTN_X
+    0x134: 32768,  # BTN_Y
+}
+
+# Absolute axes to XINPUT_GAMEPAD fields
+STICK_AXES: dict[int, str] = {
+    ABS_X: "l_thumb_x",
+    ABS_Y: "l_thumb_y",
+    ABS_RX: "r_thumb_x",
+    ABS_RY: "r_thumb_y",
+}
+TRIGGER_AXES: dict[int, str] = {
+    ABS_Z: "left_trigger",
+    ABS_RZ: "right_trigger",
+}
+
+# evdev reports Y axes as positive downwards, XInput as positive upwards
+INVERTED_AXES = frozenset((ABS_Y, ABS_RY))
+
+# Ranges reported by the xpad driver, used when a device can't be queried
+DEFAULT_ABS_RANGES: dict[int, tuple[int, int]] = {
+    ABS_X: (-32768, 32767),
+    ABS_Y: (-32768, 32767),
+    ABS_RX: (-32768, 32767),
+    ABS_RY: (-32768, 32767),
+    ABS_Z: (0, 255),
+    ABS_RZ: (0, 255),
+}
+
+# Number of events read per read() call
+READ_BATCH: int = 64
+
+# Keystrokes kept per device, the oldest are dropped once full
+KEYSTROKE_QUEUE: int = 256
+
+# Bytes of the key bitmap, KEY_MAX is 0x2ff
+KEY_BITMAP_SIZE = 0x300 // 8
+
+# Glob used to discover controllers
+DEVICE_GLOB = "/dev/input/by-id/*-event-joystick"
+
+
+class _FF_RUMBLE_EFFECT(ctypes.Structure):
+    _fields_ = [
+        ("strong_magnitude", ctypes.c_uint16),
+        ("weak_magnitude", ctypes.c_uint16)]
+
+
+class _FF_PERIODIC_EFFECT(ctypes.Structure):
+    # Only present to give the union of struct ff_effect its size and alignment
+    _fields_ = [
+        ("fields", ctypes.c_uint16 * 9),
+        ("custom_len", ctypes.c_uint32),
+        ("custom_data", ctypes.c_void_p)]
+
+
+class _FF_EFFECT_UNION(ctypes.Union):
+    _fields_ = [
+        ("rumble", _FF_RUMBLE_EFFECT),
+        ("periodic", _FF_PERIODIC_EFFECT)]
+
+
+class FF_EFFECT(ctypes.Structure):
+    """struct ff_effect, see linux/input.h"""
+    _fields_ = [
+        ("type", ctypes.c_uint16),
+        ("id", ctypes.c_int16),
+        ("direction", ctypes.c_uint16),
+        ("trigger_button", ctypes.c_uint16),
+        ("trigger_interval", ctypes.c_uint16),
+        ("replay_length", ctypes.c_uint16),
+        ("replay_delay", ctypes.c_uint16),
+        ("u", _FF_EFFECT_UNION)]
+
+
+def _ioc(direction: int, number: int, size: int) -> int:
+    """ioctl request of the evdev type 'E'"""
+    return (direction << 30) | (size << 16) | (ord("E") << 8) | number
+
+
+def _eviocgabs(axis: int) -> int:
+    """ioctl request for struct input_absinfo of the given axis, _IOR('E', 0x40 + axis, 24)"""
+    return _ioc(2, 0x40 + axis, 24)
+
+
+def _eviocgbit(ev_type: int, size: int) -> int:
+    """ioctl request for the bitmap of the codes an event type supports"""
+    return _ioc(2, 0x20 + ev_type, size)
+
+
+# ioctl requests for the bitmap of keys held, and uploading a force feedback effect
+EVIOCGKEY = _ioc(2, 0x18, KEY_BITMAP_SIZE)
+EVIOCSFF = _ioc(1, 0x80, ctypes.sizeof(FF_EFFECT))
+
+
+def _query_bitmap(fd: int, request: int, size: int) -> bytearray | None:
+    """Bitmap filled by an ioctl, None if the fd can't be queried (e.g. it isn't a device)"""
+    import fcntl
+
+    bitmap = bytearray(size)
+    try:
+        fcntl.ioctl(fd, request, bitmap)
+    except OSError:
+        return None
+    return bitmap
+
+
+def _bit(bitmap: bytearray, code: int) -> bool:
+    return bool(bitmap[code >> 3] >> (code & 7) & 1)
+
+
+def query_abs_ranges(fd: int) -> dict[int, tuple[int, int]]:
+    """Returns the (min, max) of each known axis reported by an evdev device.
+    Axes which can't be queried (e.g. the fd isn't a device) keep their default range."""
+    import fcntl
+
+    ranges = dict(DEFAULT_ABS_RANGES)
+    for axis in ranges:
+        absinfo = bytearray(24)
+        try:
+            fcntl.ioctl(fd, _eviocgabs(axis), absinfo)
+        except OSError:
+            continue
+        _, minimum, maximum, *_ = struct.unpack("6i", absinfo)
+        if maximum > minimum:
+            ranges[axis] = (minimum, maximum)
+    return ranges
+
+
+class EvdevDevice:
+    """
+    Folds the raw input events of a single device into an XInput.XINPUT_STATE.\n
+    Create from a path, or an already opened file descriptor (e.g. a pipe):
+    >>> device = EvdevDevice("/dev/input/event5")
+    >>> device.poll()
+    """
+
+    def __init__(
+            self,
+            device: str | int,
+            abs_ranges: dict[int, tuple[int, int]] | None = None
+            ) -> None:
+        if isinstance(device, int):
+            self.fd = device
+            os.set_blocking(self.fd, False)
+        else:
+            # Writing is needed for force feedback, reading is enough for everything else
+            try:
+                self.fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+            except PermissionError:
+                self.fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+
+        if abs_ranges is None:
+            abs_ranges = query_abs_ranges(self.fd)
+        self._scales = self._compile_scales(abs_ranges)
+
+        self.state = XInput.XINPUT_STATE()
+        # (virtual key, flags) of keystrokes not yet read
+        self.keystrokes: deque[tuple[int, int]] = deque(maxlen=KEYSTROKE_QUEUE)
+        self._pending = b""
+        # Buttons and axes of the report being read, applied on SYN_REPORT
+        self._buttons = 0
+        self._axes: dict[str, int] = {}
+        self._changed = False
+        self._dropped = False
+        # Force feedback effect, uploaded on the first rumble
+        self._effect: FF_EFFECT | None = None
+
+    @staticmethod
+    def _compile_scales(
+            abs_ranges: dict[int, tuple[int, int]]
+            ) -> dict[int, tuple[str, int, int, int]]:
+        """Precompute (field, minimum, span, target span) of every axis"""
+        scales = {}
+        for axis, (minimum, maximum) in abs_ranges.items():
+            if axis in STICK_AXES:
+                scales[axis] = (STICK_AXES[axis], minimum, maximum - minimum, 65535)
+            elif axis in TRIGGER_AXES:
+                scales[axis] = (TRIGGER_AXES[axis], minimum, maximum - minimum, 255)
+        return scales
+
+    def poll(self) -> None:
+        """Read and apply every event currently available without blocking.
+        Raises OSError if the device was removed."""
+        chunk = READ_BATCH * INPUT_EVENT.size
+        while True:
+            try:
+                data = os.read(self.fd, chunk)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            self._apply(data)
+            if len(data) < chunk:
+                return
+
+    def _apply(self, data: bytes) -> None:
+        """Decode a batch of input_event records in one pass"""
+        if self._pending:
+            data = self._pending + data
+        end = len(data) - len(data) % INPUT_EVENT.size
+        self._pending = data[end:]
+        self._fold(memoryview(data)[:end])
+
+    def _fold(self, records) -> None:
+        """Fold complete input_event records into the report being read"""
+        gamepad = self.state.gamepad
+        scales = self._scales
+        axes = self._axes
+        buttons = self._buttons
+        changed = self._changed
+        dropped = self._dropped
+
+        for _, _, ev_type, code, value in INPUT_EVENT.iter_unpack(records):
+
+            if ev_type == EV_SYN:
+                if code == SYN_REPORT:
+                    if dropped:
+                        # Events were lost, read the whole state back from the device
+                        buttons = self._resync()
+                        changed = True
+                    if changed:
+                        self._report(buttons, axes)
+                    changed = dropped = False
+                elif code == SYN_DROPPED:
+                    # Events until the next report are incomplete, as is the report being read
+                    dropped = True
+                    axes.clear()
+                    buttons = gamepad.buttons
+
+            elif dropped:
+                continue
+
+            elif ev_type == EV_KEY:
+                mask = KEY_MAP.get(code)
+                if mask is not None:
+                    buttons = buttons | mask if value else buttons & ~mask
+                    changed = True
+
+            elif ev_type == EV_ABS:
+                if code == ABS_HAT0X:
+                    buttons = (buttons & ~12) | (4 if value < 0 else 8 if value > 0 else 0)
+                    changed = True
+                elif code == ABS_HAT0Y:
+                    buttons = (buttons & ~3) | (1 if value < 0 else 2 if value > 0 else 0)
+                    changed = True
+                elif code in scales:
+                    field, minimum, span, target = scales[code]
+                    scaled = (value - minimum) * target // span if span else 0
+                    if target == 65535:
+                        scaled -= 32768
+                        if code in INVERTED_AXES:
+                            scaled = ~scaled
+                    axes[field] = scaled
+                    changed = True
+
+        self._buttons, self._changed, self._dropped = buttons, changed, dropped
+
+    def _report(self, buttons: int, axes: dict[str, int]) -> None:
+        """Apply the buttons and axes of a report as a new packet"""
+        state = self.state
+        gamepad = state.gamepad
+        previous = (gamepad.buttons, (gamepad.left_trigger, gamepad.right_trigger))
+        gamepad.buttons = buttons
+        for field, value in axes.items():
+            setattr(gamepad, field, value)
+        axes.clear()
+        state.packet_number = (state.packet_number + 1) & 0xFFFFFFFF
+        queue_keystrokes(self.keystrokes, *previous, gamepad)
+
+    def _resync(self) -> int:
+        """Read the held keys and axis values from the device into the report, returns the buttons.
+        If the device can't be queried (e.g. the fd is a pipe) every button is released."""
+        keys = _query_bitmap(self.fd, EVIOCGKEY, KEY_BITMAP_SIZE)
+        if keys is None:
+            return 0
+
+        buttons = 0
+        for code, mask in KEY_MAP.items():
+            if _bit(keys, code):
+                buttons |= mask
+        # Fold the current values of the device's axes as the events of a report
+        supported = _query_bitmap(self.fd, _eviocgbit(EV_ABS, 8), 8)
+        events = []
+        for axis in (*self._scales, ABS_HAT0X, ABS_HAT0Y):
+            if supported is None or not _bit(supported, axis):
+                continue
+            absinfo = _query_bitmap(self.fd, _eviocgabs(axis), 24)
+            if absinfo is not None:
+                value, = struct.unpack_from("i", absinfo)
+                events.append(INPUT_EVENT.pack(0, 0, EV_ABS, axis, value))
+        self._buttons, self._changed, self._dropped = buttons, False, False
+        self._fold(b"".join(events))
+        return self._buttons
+
+    def capabilities(self, capabilities: XInput.XINPUT_CAPABILITIES) -> None:
+        """Fill capabilities with the buttons, axes and motors the device reports"""
+        capabilities.type = 1  # XINPUT_DEVTYPE_GAMEPAD
+        capabilities.sub_type = 1  # XINPUT_DEVSUBTYPE_GAMEPAD
+        capabilities.flags = 0
+        gamepad = capabilities.gamepad
+        keys = _query_bitmap(self.fd, _eviocgbit(EV_KEY, KEY_BITMAP_SIZE), KEY_BITMAP_SIZE)
+        if keys is None:
+            gamepad.buttons = sum(KEY_MAP.values())
+        else:
+            gamepad.buttons = sum(mask for code, mask in KEY_MAP.items() if _bit(keys, code))
+            # The dpad is often reported as a hat rather than buttons
+            axes = _query_bitmap(self.fd, _eviocgbit(EV_ABS, 8), 8)
+            if axes is not None:
+                gamepad.buttons |= (12 if _bit(axes, ABS_HAT0X) else 0) | (
+                    3 if _bit(axes, ABS_HAT0Y) else 0)
+        gamepad.left_trigger = 255 if ABS_Z in self._scales else 0
+        gamepad.right_trigger = 255 if ABS_RZ in self._scales else 0
+        gamepad.l_thumb_x = gamepad.l_thumb_y = gamepad.r_thumb_x = gamepad.r_thumb_y = -1
+        speed = 65535 if self.supports_rumble else 0
+        capabilities.vibration.left_motor_speed = capabilities.vibration.right_motor_speed = speed
+
+    @property
+    def supports_rumble(self) -> bool:
+        """Whether the device has rumble force feedback"""
+        effects = _query_bitmap(self.fd, _eviocgbit(EV_FF, 16), 16)
+        return effects is not None and _bit(effects, FF_RUMBLE)
+
+    def rumble(self, strong: int, weak: int) -> bool:
+        """Play a rumble effect with the given motor speeds until changed, 0 stops the motors.
+        Returns False if the device doesn't support rumble, or wasn't opened for writing."""
+        import fcntl
+
+        effect = self._effect
+        try:
+            if not strong and not weak:
+                if effect is not None:
+                    os.write(self.fd, INPUT_EVENT.pack(0, 0, EV_FF, effect.id, 0))
+                return True
+            if effect is None:
+                effect = FF_EFFECT(type=FF_RUMBLE, id=-1)
+            # XInput's left motor is the low frequency (strong) motor
+            effect.u.rumble.strong_magnitude, effect.u.rumble.weak_magnitude = strong, weak
+            # A replay length of 0 plays until stopped, the id is filled by the first upload
+            fcntl.ioctl(self.fd, EVIOCSFF, effect)
+            self._effect = effect
+            os.write(self.fd, INPUT_EVENT.pack(0, 0, EV_FF, effect.id, 1))
+        except OSError:
+            return False
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class EvdevBackend(Backend):
+    """
+    Reads controllers from Linux evdev devices.\n
+    Controller ids map to devices, given explicitly or discovered from /dev/input/by-id:
+    >>> backend = EvdevBackend({0: "/dev/input/event5"})
+
+    Discovered devices keep their id while plugged in, new devices take the lowest free id.
+    While an id has no device, devices are discovered again after min_backoff seconds,
+    doubling each time nothing new is found, up to max_backoff seconds.
+    """
+
+    name = "evdev"
+
+    _STATE_SIZE = ctypes.sizeof(XInput.XINPUT_STATE)
+
+    def __init__(
+            self,
+            devices: dict[int, str | int] | None = None,
+            min_backoff: float = 0.1,
+            max_backoff: float = 2.,
+            clock: Callable[[], float] = time.monotonic
+            ) -> None:
+        # Explicitly given devices are never rediscovered
+        self._discovered = devices is None
+        self._paths: dict[int, str | int] = {} if devices is None else dict(devices)
+        self._devices: dict[int, EvdevDevice] = {}
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._next_discovery: float = float("-inf")
+        self._discovery_interval = min_backoff
+
+    def _discover(self) -> list[str | int]:
+        """Paths of the devices currently plugged in"""
+        return sorted(glob.glob(DEVICE_GLOB))
+
+    def _rediscover(self) -> None:
+        """Assign ids to newly plugged in devices and free those of removed devices,
+        at most once per backoff interval"""
+        now = self._clock()
+        if not self._discovered or now < self._next_discovery:
+            return
+        found = self._discover()
+        paths = self._paths
+        known = set(paths.values())
+        for controller_id, path in list(paths.items()):
+            if path not in found and controller_id not in self._devices:
+                del paths[controller_id]
+        new = [path for path in found if path not in known]
+        controller_id = 0
+        for path in new:
+            while controller_id in paths:
+                controller_id += 1
+            paths[controller_id] = path
+
+        # Back off while nothing new is plugged in
+        if new:
+            self._discovery_interval = self.min_backoff
+        else:
+            self._discovery_interval = min(self._discovery_interval * 2, self.max_backoff)
+        self._next_discovery = now + self._discovery_interval
+
+    def open_device(
+            self,
+            controller_id: int,
+            device: str | int,
+            abs_ranges: dict[int, tuple[int, int]] | None = None
+            ) -> EvdevDevice:
+        """Use the given path or file descriptor for controller_id"""
+        self.close_device(controller_id)
+        opened = self._devices[controller_id] = EvdevDevice(device, abs_ranges)
+        return opened
+
+    def close_device(self, controller_id: int) -> None:
+        device = self._devices.pop(controller_id, None)
+        if device is not None:
+            device.close()
+
+    def _get_device(self, controller_id: int) -> EvdevDevice | None:
+        device = self._devices.get(controller_id)
+        if device is not None:
+            return device
+
+        path = self._paths.get(controller_id)
+        if path is None:
+            self._rediscover()
+            path = self._paths.get(controller_id)
+            if path is None:
+                return None
+        try:
+            return self.open_device(controller_id, path)
+        except OSError as exc:
+            if exc.errno in (errno.ENOENT, errno.ENODEV) and self._discovered:
+                # Removed before it was opened
+                self._paths.pop(controller_id, None)
+            return None
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        device = self._get_device(controller_id)
+        if device is None:
+            return XInput.Codes.NOT_CONNECTED
+        try:
+            device.poll()
+        except OSError as exc:
+            self.close_device(controller_id)
+            if exc.errno == errno.ENODEV and self._discovered:
+                # Unplugged, free its id and look for devices again on the next call
+                self._paths.pop(controller_id, None)
+                self._next_discovery = float("-inf")
+                self._discovery_interval = self.min_backoff
+            return XInput.Codes.NOT_CONNECTED
+        ctypes.memmove(ctypes.addressof(state), ctypes.addressof(device.state), self._STATE_SIZE)
+        return XInput.Codes.SUCCESS
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        if self._get_device(controller_id) is None:
+            return XInput.Codes.NOT_CONNECTED
+        # evdev doesn't report batteries, XInput doesn't give a level with an unknown type
+        battery_info.battery_type = 255  # BatteryType.UNKNOWN
+        battery_info.battery_level = 0  # BatteryLevel.EMPTY
+        return XInput.Codes.SUCCESS
+
+    def set_vibration(self, controller_id: int, vibration: XInput.XINPUT_VIBRATION) -> int:
+        device = self._get_device(controller_id)
+        if device is None:
+            return XInput.Codes.NOT_CONNECTED
+        if not device.rumble(vibration.left_motor_speed, vibration.right_motor_speed):
+            return XInput.Codes.NOT_SUPPORTED
+        return XInput.Codes.SUCCESS
+
+    def get_keystroke(self, controller_id: int, keystroke: XInput.XINPUT_KEYSTROKE) -> int:
+        state = XInput.XINPUT_STATE()
+        # Keystrokes are queued as events are read
+        res = self.get_state(controller_id, state)
+        if res != XInput.Codes.SUCCESS:
+            return res
+        queue = self._devices[controller_id].keystrokes
+        if not queue:
+            return XInput.Codes.EMPTY
+        keystroke.virtual_key, keystroke.flags = queue.popleft()
+        keystroke.unicode = keystroke.hid_code = 0
+        keystroke.user_index = controller_id
+        return XInput.Codes.SUCCESS
+
+    def get_capabilities(
+            self,
+            controller_id: int,
+            flags: int,
+            capabilities: XInput.XINPUT_CAPABILITIES
+            ) -> int:
+        device = self._get_device(controller_id)
+        if device is None:
+            return XInput.Codes.NOT_CONNECTED
+        device.capabilities(capabilities)
+        return XInput.Codes.SUCCESS
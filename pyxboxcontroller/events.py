@@ -0,0 +1,134 @@
+"""
+Button press and release events for an XboxController.
+
+Edges are found with a single XOR of the previous and current button masks,
+so frames without a button change cost one comparison:
+>>> events = ButtonEvents(controller)
+>>> events.on_press("a", lambda state: print("a pressed"))
+>>> events.on_release("start", lambda state: print("start released"))
+>>> while True:
+...     events.update()
+"""
+from collections.abc import Callable
+
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+ButtonCallback = Callable[[XboxControllerState], None]
+
+
+def _bits(mask: int):
+    """Yield each set bit of mask"""
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+
+class ButtonEvents:
+    """
+    Dispatches callbacks on button edges.\n
+
+    Register callbacks by button name (see XboxControllerState._BUTTON_MAP):
+    >>> events.on_press("lb", callback)
+
+    Then call update() every frame, or feed states you already have with process():
+    >>> events.process(state)
+
+    pressed and released hold the masks of the edges found in the last frame.
+    """
+
+    def __init__(self, controller: XboxController | None = None) -> None:
+        self.controller = controller
+        self.last_mask: int = 0
+        self.pressed: int = 0
+        self.released: int = 0
+        # bit -> callbacks, only buttons with callbacks have an entry
+        self._press_handlers: dict[int, tuple[ButtonCallback, ...]] = {}
+        self._release_handlers: dict[int, tuple[ButtonCallback, ...]] = {}
+        # Union of bits with any handler, edges outside it are never dispatched
+        self._handled_mask: int = 0
+
+    @staticmethod
+    def _mask(button: str) -> int:
+        try:
+            return XboxControllerState._BUTTON_MAP[button]
+        except KeyError:
+            raise ValueError(
+                f"Unknown button {button!r}, expected one of "
+                f"{list(XboxControllerState._BUTTON_MAP)}") from None
+
+    def _add(
+            self,
+            table: dict[int, tuple[ButtonCallback, ...]],
+            button: str,
+            callback: ButtonCallback
+            ) -> None:
+        bit = self._mask(button)
+        table[bit] = table.get(bit, ()) + (callback,)
+        self._handled_mask |= bit
+
+    def _remove(
+            self,
+            table: dict[int, tuple[ButtonCallback, ...]],
+            button: str,
+            callback: ButtonCallback
+            ) -> None:
+        bit = self._mask(button)
+        remaining = tuple(handler for handler in table.get(bit, ()) if handler != callback)
+        if remaining:
+            table[bit] = remaining
+        else:
+            table.pop(bit, None)
+        self._handled_mask = 0
+        for handled in (*self._press_handlers, *self._release_handlers):
+            self._handled_mask |= handled
+
+    def on_press(self, button: str, callback: ButtonCallback) -> None:
+        """Call callback(state) when button is pressed"""
+        self._add(self._press_handlers, button, callback)
+
+    def on_release(self, button: str, callback: ButtonCallback) -> None:
+        """Call callback(state) when button is released"""
+        self._add(self._release_handlers, button, callback)
+
+    def remove_press(self, button: str, callback: ButtonCallback) -> None:
+        self._remove(self._press_handlers, button, callback)
+
+    def remove_release(self, button: str, callback: ButtonCallback) -> None:
+        self._remove(self._release_handlers, button, callback)
+
+    def update(self) -> XboxControllerState:
+        """Get the controller's state and dispatch any button events, returns the state"""
+        state = self.controller.state
+        self.process(state)
+        return state
+
+    def process(self, state: XboxControllerState) -> int:
+        """Dispatch the button events between the last processed state and this one.
+        Returns the mask of buttons which changed."""
+        mask = state.button_mask
+        changed = mask ^ self.last_mask
+        if not changed:
+            self.pressed = self.released = 0
+            return 0
+
+        self.last_mask = mask
+        self.pressed = pressed = changed & mask
+        self.released = released = changed & ~mask
+
+        if changed & self._handled_mask:
+            press_handlers = self._press_handlers
+            for bit in _bits(pressed):
+                for callback in press_handlers.get(bit, ()):
+                    callback(state)
+            release_handlers = self._release_handlers
+            for bit in _bits(released):
+                for callback in release_handlers.get(bit, ()):
+                    callback(state)
+
+        return changed
+
+    @staticmethod
+    def names(mask: int) -> list[str]:
+        """Names of the buttons in a mask, e.g. of pressed or released"""
+        return [btn for btn, bit in XboxControllerState._BUTTON_MAP.items() if mask & bit]
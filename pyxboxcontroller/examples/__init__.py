@@ -1,2 +1,3 @@
 from .example_print_state import example_print_state
 from .example_state_gui import example_state_gui
+from .example_monitor import example_monitor
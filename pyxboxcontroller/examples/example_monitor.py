@@ -0,0 +1,215 @@
+"""
+A monitor of a connected Xinput device, light enough to run alongside another process.
+The controller is sampled on a background thread at up to 1 kHz, while the GUI is redrawn
+at a capped frame rate, only reconfiguring the widgets whose values changed.
+Recent axis values are plotted.
+Press start button to exit!
+"""
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+from pyxboxcontroller import XboxController, XboxControllerState
+from pyxboxcontroller.poller import ControllerPoller
+
+# Axes plotted, with their line colours
+PLOTTED_AXES: dict[str, str] = {
+    "l_thumb_x": "red",
+    "l_thumb_y": "orange",
+    "r_thumb_x": "blue",
+    "r_thumb_y": "cyan",
+    "l_trigger": "green",
+    "r_trigger": "purple",
+}
+
+PLOT_WIDTH: int = 480
+PLOT_HEIGHT: int = 160
+
+
+def example_monitor(
+        controller_id: int = 0,
+        rate_hz: float = 1000.,
+        max_fps: float = 30.,
+        history_seconds: float = 5.
+        ):
+
+    # Connect to controller
+    controller = XboxController(controller_id)
+
+    # Create GUI
+    gui = MonitorState(controller, rate_hz, max_fps, history_seconds)
+    gui.run()
+
+
+class MonitorState(tk.Frame):
+    """Displays the state of the given xbox controller, sampled on a background thread.
+    Press start to close"""
+
+    def __init__(
+            self,
+            xbox_controller: XboxController,
+            rate_hz: float = 1000.,
+            max_fps: float = 30.,
+            history_seconds: float = 5.,
+            root: tk.Tk | None = None
+            ):
+        tk.Frame.__init__(self, root, padx=30, pady=15)
+
+        # Window properties
+        self.master.title("pyxboxcontroller monitor")
+        self.master.resizable(False, False)
+        self.grid()
+
+        # Sample on a background thread, independent of the redraw rate
+        self.poller = ControllerPoller(xbox_controller, rate_hz=rate_hz)
+        self.interval_ms = max(1, int(1000 / max_fps))
+
+        # Last drawn values, so only changed widgets are reconfigured
+        self.last_published = -1
+        self.last_buttons = 0
+        self.last_texts: dict[str, str] = {}
+
+        # One point of history per frame
+        self.history: dict[str, deque[float]] = {
+            axis: deque(maxlen=max(2, int(history_seconds * max_fps))) for axis in PLOTTED_AXES}
+        # Frames since an axis changed, the plot is flat and already drawn once it's all history
+        self.frames_unchanged = 0
+        self.last_axes: tuple[float, ...] = ()
+
+        # Sample rate, measured once a second
+        self.rate_frames = 0
+        self.rate_published = 0
+
+        self.create_widgets()
+
+        # Bind ESC key to close function
+        self.master.bind('<Escape>', lambda _: self.close())
+
+        self.poller.start()
+        self.after(self.interval_ms, self.redraw)
+
+    def run(self) -> None:
+        """Run the gui."""
+        self.master.mainloop()
+
+    def set_text(self, name: str, text: str) -> None:
+        """Reconfigure a label only if its text changed"""
+        if self.last_texts.get(name) != text:
+            self.last_texts[name] = text
+            self.labels[name].configure(text=text)
+
+    def redraw(self):
+        """Draw any new state, at most once per frame"""
+        poller = self.poller
+        published = poller.published
+
+        self.rate_frames += 1
+        if self.rate_frames * self.interval_ms >= 1000:
+            self.set_text("rate", f"Samples/s : {published - self.rate_published}")
+            self.rate_frames, self.rate_published = 0, published
+
+        self.set_text("status", "Connected" if poller.connected else "Disconnected")
+
+        state = None
+        if published != self.last_published:
+            self.last_published = published
+            state = poller.latest()
+            self.draw_state(state)
+
+        self.draw_plot(state)
+
+        # Check if the closing condition is met
+        if state is not None and state.start:
+            self.close()
+            return
+
+        self.after(self.interval_ms, self.redraw)
+
+    def draw_state(self, state: XboxControllerState) -> None:
+        """Update the labels of the values which changed"""
+        self.set_text("packet_number", f"Packet Number : {state.packet_number}")
+
+        # Buttons, only those which changed
+        buttons = state.button_mask
+        changed = buttons ^ self.last_buttons
+        if changed:
+            self.last_buttons = buttons
+            for button, bit in XboxControllerState._BUTTON_MAP.items():
+                if changed & bit:
+                    self.labels[button].configure(text=f"{button} : {(buttons & bit) != 0}")
+
+        self.set_text("l_thumb", f"l_thumb : ({state.l_thumb_x:+.3f}, {state.l_thumb_y:+.3f})")
+        self.set_text("r_thumb", f"r_thumb : ({state.r_thumb_x:+.3f}, {state.r_thumb_y:+.3f})")
+        self.set_text("l_trigger", f"l_trigger : {state.l_trigger:.3f}")
+        self.set_text("r_trigger", f"r_trigger : {state.r_trigger:.3f}")
+
+    def draw_plot(self, state: XboxControllerState | None) -> None:
+        """Scroll the axis history, skipped while the whole history is flat"""
+        if state is not None:
+            axes = tuple(getattr(state, axis) for axis in PLOTTED_AXES)
+            if axes != self.last_axes:
+                self.last_axes = axes
+                self.frames_unchanged = 0
+        if not self.last_axes:
+            return
+
+        self.frames_unchanged += 1
+        if self.frames_unchanged > self.history["l_thumb_x"].maxlen:
+            return
+
+        for axis, value in zip(PLOTTED_AXES, self.last_axes):
+            history = self.history[axis]
+            history.append(value)
+            step = PLOT_WIDTH / (history.maxlen - 1)
+            points = []
+            for i, past_value in enumerate(history):
+                points += (i * step, (1. - past_value) * PLOT_HEIGHT / 2)
+            if len(points) >= 4:
+                self.plot.coords(self.lines[axis], *points)
+
+    def create_widgets(self):
+        """Draws the GUI"""
+        row, column = 1, 1
+
+        # GUI Info
+        tk.Label(self,
+                text="Press the start button or the Esc key to exit!",
+                font='Helvetica 16 bold'
+                ).grid(column=column, row=row, columnspan=2)
+        row += 1
+
+        self.labels: dict[str, ttk.Label] = {}
+        names = ["status", "rate", "packet_number", "l_trigger", "r_trigger", "l_thumb", "r_thumb"]
+        for name in names:
+            self.labels[name] = ttk.Label(self, text=name)
+            self.labels[name].grid(column=column, row=row)
+            row += 1
+
+        # Labels for buttons
+        for button, pressed in XboxControllerState.buttons.items():
+            self.labels[button] = ttk.Label(self, text=f"{button} : {pressed}")
+            self.labels[button].grid(column=column, row=row)
+            row += 1
+
+        # Axis history, thumbsticks from -1 (bottom) to 1 (top)
+        self.plot = tk.Canvas(self, width=PLOT_WIDTH, height=PLOT_HEIGHT, background="white")
+        self.plot.grid(column=column + 1, row=2, rowspan=row - 2, padx=(15, 0))
+        self.plot.create_line(0, PLOT_HEIGHT / 2, PLOT_WIDTH, PLOT_HEIGHT / 2, fill="grey")
+        self.lines = {
+            axis: self.plot.create_line(0, 0, 0, 0, fill=colour)
+            for axis, colour in PLOTTED_AXES.items()}
+
+        # Exit Button
+        ttk.Button(self, text="Exit", command=self.close).grid(row=row, column=column)
+
+    def close(self):
+        """Stop sampling and close the GUI."""
+        self.poller.stop()
+        self.quit()
+
+
+if __name__ == "__main__":
+
+    # Run the GUI if this script is called directly,
+    # a disconnected controller is shown by the status label rather than raised
+    example_monitor()
@@ -37,6 +37,7 @@ class DisplayState(tk.Frame):
 
         self.controller = xbox_controller
         self.last_state = XboxControllerState.default_state()
+        self.last_packet_number = -1
 
         # Check if controller is connected
         try:
@@ -60,7 +61,14 @@ class DisplayState(tk.Frame):
 
     def update_state(self):
         """Updates the gui's with new state information"""
-        self.last_state: XboxControllerState = self.controller.state
+        state: XboxControllerState = self.controller.state
+
+        # Nothing to redraw without a new packet
+        if state.packet_number == self.last_packet_number:
+            self.after(self.interval_ms, self.update_state)
+            return
+        self.last_packet_number = state.packet_number
+        self.last_state = state
 
         # Packet number
         self.packet_number_label.configure(
@@ -0,0 +1,292 @@
+"""
+Smoothing filters for thumbsticks and triggers.
+
+Filters are chained into a pipeline, applied to each axis as new states arrive:
+>>> controller.filters = FilterPipeline([OneEuroFilter(min_cutoff=1., beta=5.), SlewLimiter(8.)])
+>>> state = controller.state  # Axes are filtered
+
+Or fed with samples you already have, e.g. from a ControllerPoller:
+>>> for timestamp_ns, state in poller.drain():
+...     axes = pipeline.apply(state, timestamp_ns)
+
+The same pipeline filters a recording in batch with NumPy, with results identical to streaming:
+>>> columns = pyxboxcontroller.columnar.decode_session("session.xrec")
+>>> filtered = pipeline.apply_columns(columns)
+
+Each filter keeps its state for every axis in preallocated arrays.
+Batch mode performs the same floating point operations in the same order as streaming,
+recursive filters step through time with every axis at once, the moving average over all time at once.
+"""
+import math
+from array import array
+from collections.abc import Sequence
+from time import perf_counter_ns
+
+# Axes in the order of XboxControllerState._axes
+AXES: tuple[str, ...] = ("l_thumb_x", "l_thumb_y", "r_thumb_x", "r_thumb_y", "l_trigger", "r_trigger")
+
+# Shortest interval in seconds between samples, guards against repeated timestamps
+MIN_DT: float = 1e-6
+
+_TAU = 2 * math.pi
+
+
+class Filter:
+    """
+    Base of a filter over a fixed number of axes.\n
+    step() filters values in place for streaming, batch() filters a (samples, axes) array.
+    """
+
+    def reset(self, axes: int) -> None:
+        """Allocate the state for the given number of axes, forgetting all samples"""
+        self._primed = False
+
+    def step(self, values: list[float], dt: float) -> None:
+        raise NotImplementedError
+
+    def batch(self, values, dt):
+        raise NotImplementedError
+
+
+class ExponentialMovingAverage(Filter):
+    """Moves alpha (0 to 1) of the way towards each new sample, lower is smoother"""
+
+    def __init__(self, alpha: float = 0.5) -> None:
+        if not 0. < alpha <= 1.:
+            raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+        self.alpha = alpha
+
+    def reset(self, axes: int) -> None:
+        super().reset(axes)
+        self._values = array("d", bytes(8 * axes))
+
+    def step(self, values: list[float], dt: float) -> None:
+        state = self._values
+        if not self._primed:
+            state[:] = array("d", values)
+            self._primed = True
+            return
+        alpha = self.alpha
+        for i, x in enumerate(values):
+            y = state[i]
+            values[i] = state[i] = y + alpha * (x - y)
+
+    def batch(self, values, dt):
+        out = values.copy()
+        alpha = self.alpha
+        y = out[0]
+        for k in range(1, len(out)):
+            y = out[k] = y + alpha * (values[k] - y)
+        return out
+
+
+class MovingAverage(Filter):
+    """Mean of the last window samples"""
+
+    def __init__(self, window: int = 4) -> None:
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.window = window
+
+    def reset(self, axes: int) -> None:
+        super().reset(axes)
+        self._axes = axes
+        # Ring of the last window samples of every axis
+        self._history = array("d", bytes(8 * axes * self.window))
+        self._position = 0
+        self._count = 0
+
+    def step(self, values: list[float], dt: float) -> None:
+        history, axes, window = self._history, self._axes, self.window
+        position = self._position
+        history[position * axes:(position + 1) * axes] = array("d", values)
+        self._position = (position + 1) % window
+        count = self._count = min(self._count + 1, window)
+
+        # Summed oldest first, as in batch
+        oldest = (position - count + 1) % window
+        for i in range(axes):
+            total = 0.
+            for j in range(count):
+                total += history[(oldest + j) % window * axes + i]
+            values[i] = total / count
+
+    def batch(self, values, dt):
+        import numpy as np
+
+        window = self.window
+        samples = len(values)
+        # Leading zeros add nothing to the first samples' sums, which are summed oldest first
+        padded = np.concatenate([np.zeros((window - 1, values.shape[1])), values])
+        total = np.zeros(values.shape)
+        for j in range(window):
+            total = total + padded[j:j + samples]
+        counts = np.minimum(np.arange(1, samples + 1), window).astype(np.float64)
+        return total / counts[:, None]
+
+
+class OneEuroFilter(Filter):
+    """
+    Adaptive low pass filter, smooth at rest and responsive when moving, see
+    Casiez et al. "1€ Filter: A Simple Speed-based Low-pass Filter for Noisy Input in Interactive Systems".\n
+    min_cutoff (Hz) sets the smoothing at rest, beta how quickly the cutoff rises with speed.
+    """
+
+    def __init__(self, min_cutoff: float = 1., beta: float = 0., d_cutoff: float = 1.) -> None:
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def reset(self, axes: int) -> None:
+        super().reset(axes)
+        self._values = array("d", bytes(8 * axes))
+        self._previous = array("d", bytes(8 * axes))
+        self._derivatives = array("d", bytes(8 * axes))
+
+    def step(self, values: list[float], dt: float) -> None:
+        state, previous, derivatives = self._values, self._previous, self._derivatives
+        if not self._primed:
+            state[:] = previous[:] = array("d", values)
+            self._primed = True
+            return
+
+        r = _TAU * self.d_cutoff * dt
+        derivative_alpha = r / (r + 1.)
+        min_cutoff, beta = self.min_cutoff, self.beta
+        for i, x in enumerate(values):
+            dx = (x - previous[i]) / dt
+            dx_hat = derivatives[i]
+            dx_hat = derivatives[i] = dx_hat + derivative_alpha * (dx - dx_hat)
+            r = _TAU * (min_cutoff + beta * abs(dx_hat)) * dt
+            y = state[i]
+            values[i] = state[i] = y + r / (r + 1.) * (x - y)
+            previous[i] = x
+
+    def batch(self, values, dt):
+        import numpy as np
+
+        out = values.copy()
+        min_cutoff, beta = self.min_cutoff, self.beta
+        y = out[0]
+        dx_hat = np.zeros(values.shape[1])
+        for k in range(1, len(out)):
+            x, step_dt = values[k], dt[k]
+            r = _TAU * self.d_cutoff * step_dt
+            derivative_alpha = r / (r + 1.)
+            dx_hat = dx_hat + derivative_alpha * ((x - values[k - 1]) / step_dt - dx_hat)
+            r = _TAU * (min_cutoff + beta * np.abs(dx_hat)) * step_dt
+            y = out[k] = y + r / (r + 1.) * (x - y)
+        return out
+
+
+class SlewLimiter(Filter):
+    """Limits how quickly each axis can change, to max_rate units per second"""
+
+    def __init__(self, max_rate: float = 10.) -> None:
+        if max_rate <= 0:
+            raise ValueError(f"max_rate must be positive, got {max_rate}")
+        self.max_rate = max_rate
+
+    def reset(self, axes: int) -> None:
+        super().reset(axes)
+        self._values = array("d", bytes(8 * axes))
+
+    def step(self, values: list[float], dt: float) -> None:
+        state = self._values
+        if not self._primed:
+            state[:] = array("d", values)
+            self._primed = True
+            return
+        limit = self.max_rate * dt
+        for i, x in enumerate(values):
+            y = state[i]
+            change = x - y
+            if change > limit:
+                change = limit
+            elif change < -limit:
+                change = -limit
+            values[i] = state[i] = y + change
+
+    def batch(self, values, dt):
+        import numpy as np
+
+        out = values.copy()
+        y = out[0]
+        for k in range(1, len(out)):
+            limit = self.max_rate * dt[k]
+            y = out[k] = y + np.minimum(np.maximum(values[k] - y, -limit), limit)
+        return out
+
+
+class FilterPipeline:
+    """
+    Filters applied in order to the given axes (all by default, see AXES).\n
+    Assign to XboxController.filters to filter every new state,
+    the axes are filtered after any deadzones.
+    """
+
+    def __init__(self, filters: Sequence[Filter], axes: Sequence[str] = AXES) -> None:
+        unknown = [axis for axis in axes if axis not in AXES]
+        if unknown:
+            raise ValueError(f"Unknown axes {unknown}, expected some of {list(AXES)}")
+        self.filters = list(filters)
+        self.axes = tuple(axes)
+        self._indexes = [AXES.index(axis) for axis in self.axes]
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples"""
+        for sample_filter in self.filters:
+            sample_filter.reset(len(self.axes))
+        self._last_ns: int | None = None
+
+    def process(self, values: Sequence[float], timestamp_ns: int) -> list[float]:
+        """Filter one sample of the pipeline's axes, taken at a perf_counter_ns() time"""
+        last_ns = self._last_ns
+        dt = max((timestamp_ns - last_ns) / 1e9, MIN_DT) if last_ns is not None else MIN_DT
+        self._last_ns = timestamp_ns
+        values = list(values)
+        for sample_filter in self.filters:
+            sample_filter.step(values, dt)
+        return values
+
+    def apply(self, state, timestamp_ns: int | None = None) -> tuple[float, ...]:
+        """Filter the axes of an XboxControllerState, taken now unless timestamp_ns is given.
+        Returns all of its axes, in the order of AXES."""
+        if timestamp_ns is None:
+            timestamp_ns = perf_counter_ns()
+        axes = list(state._axes or state._decode_axes())
+        indexes = self._indexes
+        filtered = self.process([axes[i] for i in indexes], timestamp_ns)
+        for i, value in zip(indexes, filtered):
+            axes[i] = value
+        return tuple(axes)
+
+    def batch(self, values, timestamps_ns):
+        """Filter a (samples, axes) array of the pipeline's axes, taken at the given times,
+        as if streamed through a freshly reset pipeline"""
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.float64)
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        if not len(values):
+            return values.copy()
+        dt = np.empty(len(values))
+        dt[0] = MIN_DT
+        dt[1:] = np.maximum(np.diff(timestamps_ns) / 1e9, MIN_DT)
+        for sample_filter in self.filters:
+            values = sample_filter.batch(values, dt)
+        return values
+
+    def apply_columns(self, columns: dict) -> dict:
+        """Filter the axis columns of a dict from pyxboxcontroller.columnar,
+        which must include timestamp_ns, e.g. from decode_session.
+        Returns a copy of columns with the pipeline's axes filtered."""
+        import numpy as np
+
+        filtered = self.batch(
+            np.stack([columns[axis] for axis in self.axes], axis=1), columns["timestamp_ns"])
+        result = dict(columns)
+        for i, axis in enumerate(self.axes):
+            result[axis] = filtered[:, i]
+        return result
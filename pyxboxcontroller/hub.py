@@ -0,0 +1,133 @@
+"""
+Polls every controller slot at once, with hotplug events.
+
+Asking XInput for the state of an empty slot is slow, so disconnected slots are only
+probed on an exponential backoff schedule while connected slots are polled every call:
+>>> hub = ControllerHub()
+>>> hub.on_connect(lambda slot, state: print(f"Controller {slot} connected"))
+>>> hub.on_disconnect(lambda slot: print(f"Controller {slot} disconnected"))
+>>> while True:
+...     for slot, state in hub.poll().items():
+...         ...
+"""
+import time
+from collections.abc import Callable, Iterable
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend, get_backend
+from pyxboxcontroller.controller import XboxControllerState
+
+ConnectCallback = Callable[[int, XboxControllerState], None]
+DisconnectCallback = Callable[[int], None]
+
+
+class ControllerHub:
+    """
+    Polls a set of controller slots (0-3 by default) in a single call.\n
+
+    poll() returns a dict of slot -> XboxControllerState for each connected slot.
+    A slot found empty is probed again after min_backoff seconds,
+    doubling each time it's still empty, up to max_backoff seconds.
+
+    Raises a RuntimeError when the backend returns an unexpected error.
+    """
+
+    def __init__(
+            self,
+            slots: Iterable[int] = range(4),
+            backend: Backend | str | None = None,
+            min_backoff: float = 0.1,
+            max_backoff: float = 2.,
+            clock: Callable[[], float] = time.monotonic
+            ) -> None:
+        self.slots: tuple[int, ...] = tuple(slots)
+        self._backend = backend
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+
+        self._raw = {slot: XInput.XINPUT_STATE() for slot in self.slots}
+        # Latest state of each connected slot
+        self.states: dict[int, XboxControllerState] = {}
+        # Backoff of each disconnected slot, all slots are probed on the first poll
+        self._next_probe: dict[int, float] = {slot: float("-inf") for slot in self.slots}
+        self._probe_interval: dict[int, float] = {slot: min_backoff for slot in self.slots}
+
+        self._connect_callbacks: list[ConnectCallback] = []
+        self._disconnect_callbacks: list[DisconnectCallback] = []
+
+    @property
+    def backend(self) -> Backend:
+        """The backend used to read the controllers, resolved on first use"""
+        backend = self._backend
+        if not isinstance(backend, Backend):
+            backend = self._backend = get_backend(backend)
+        return backend
+
+    @property
+    def connected(self) -> list[int]:
+        """Slots with a connected controller"""
+        return list(self.states)
+
+    def on_connect(self, callback: ConnectCallback) -> None:
+        """Call callback(slot, state) when a controller is plugged in"""
+        self._connect_callbacks.append(callback)
+
+    def on_disconnect(self, callback: DisconnectCallback) -> None:
+        """Call callback(slot) when a controller is unplugged"""
+        self._disconnect_callbacks.append(callback)
+
+    def poll(self) -> dict[int, XboxControllerState]:
+        """Poll connected slots, and any disconnected slots due a probe.
+        Returns the states of the connected slots."""
+        get_state = self.backend.get_state
+        raw, states = self._raw, self.states
+        now = None
+
+        # Connected slots, on the hot path
+        for slot in list(states):
+            state = raw[slot]
+            code = get_state(slot, state)
+            if code == XInput.Codes.SUCCESS:
+                if state.packet_number != states[slot].packet_number:
+                    states[slot] = XboxControllerState(state)
+            else:
+                self._check_code(slot, code)
+                now = self._clock() if now is None else now
+                self._disconnected(slot, now)
+
+        # Disconnected slots, only when their backoff has elapsed
+        next_probe = self._next_probe
+        if next_probe:
+            now = self._clock() if now is None else now
+            for slot, due in list(next_probe.items()):
+                if due > now:
+                    continue
+                state = raw[slot]
+                code = get_state(slot, state)
+                if code == XInput.Codes.SUCCESS:
+                    self._connected(slot, XboxControllerState(state))
+                else:
+                    self._check_code(slot, code)
+                    interval = self._probe_interval[slot]
+                    next_probe[slot] = now + interval
+                    self._probe_interval[slot] = min(interval * 2, self.max_backoff)
+
+        return states
+
+    def _check_code(self, slot: int, code: int) -> None:
+        if code != XInput.Codes.NOT_CONNECTED:
+            raise RuntimeError(f"Unknown error {code} attempting to get state of device {slot}")
+
+    def _connected(self, slot: int, state: XboxControllerState) -> None:
+        del self._next_probe[slot]
+        self.states[slot] = state
+        for callback in self._connect_callbacks:
+            callback(slot, state)
+
+    def _disconnected(self, slot: int, now: float) -> None:
+        del self.states[slot]
+        self._probe_interval[slot] = self.min_backoff
+        self._next_probe[slot] = now + self.min_backoff
+        for callback in self._disconnect_callbacks:
+            callback(slot)
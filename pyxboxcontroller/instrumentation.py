@@ -0,0 +1,169 @@
+"""
+Opt-in instrumentation of XboxController polling.
+
+Measures how long each call to the backend takes, the interval between polls,
+how many polls returned an unchanged packet number, and gaps in packet numbers
+which mean intermediate states were never seen:
+>>> controller.instrumentation = PollInstrumentation()
+>>> ...
+>>> stats = controller.instrumentation.snapshot()
+>>> stats.latency_percentile(99), stats.missed_packets
+
+When instrumentation isn't assigned, polling only pays for an `is not None` check.
+"""
+from collections.abc import Callable
+
+from pyxboxcontroller import XInput
+
+# Histograms have one bucket per power of 2 nanoseconds, bucket i holds [2**(i-1), 2**i)
+HISTOGRAM_BUCKETS: int = 64
+
+# hook(latency_ns, interval_ns, packet_number, missed_packets), called after every successful poll
+PollHook = Callable[[int, int, int, int], None]
+
+
+def _percentile(histogram: tuple[int, ...], percent: float) -> int:
+    """Upper bound in ns of the bucket containing the given percentile, 0 if empty"""
+    total = sum(histogram)
+    if not total:
+        return 0
+    target = total * percent / 100.
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return (1 << bucket) - 1
+    return (1 << (len(histogram) - 1)) - 1
+
+
+class PollStats:
+    """
+    Snapshot of PollInstrumentation counters.\n
+    latency_histogram and interval_histogram count polls per power of 2 nanoseconds.
+    """
+
+    __slots__ = (
+        "polls",
+        "errors",
+        "unchanged_polls",
+        "missed_packets",
+        "gaps",
+        "latency_total_ns",
+        "latency_max_ns",
+        "latency_histogram",
+        "interval_histogram",
+    )
+
+    def __init__(
+            self,
+            polls: int,
+            errors: int,
+            unchanged_polls: int,
+            missed_packets: int,
+            gaps: int,
+            latency_total_ns: int,
+            latency_max_ns: int,
+            latency_histogram: tuple[int, ...],
+            interval_histogram: tuple[int, ...]
+            ) -> None:
+        self.polls = polls
+        self.errors = errors
+        self.unchanged_polls = unchanged_polls
+        self.missed_packets = missed_packets
+        self.gaps = gaps
+        self.latency_total_ns = latency_total_ns
+        self.latency_max_ns = latency_max_ns
+        self.latency_histogram = latency_histogram
+        self.interval_histogram = interval_histogram
+
+    @property
+    def latency_mean_ns(self) -> float:
+        return self.latency_total_ns / self.polls if self.polls else 0.
+
+    def latency_percentile(self, percent: float) -> int:
+        """Approximate latency in ns which percent of polls were faster than"""
+        return _percentile(self.latency_histogram, percent)
+
+    def interval_percentile(self, percent: float) -> int:
+        """Approximate interval between polls in ns which percent of intervals were shorter than"""
+        return _percentile(self.interval_histogram, percent)
+
+    def __repr__(self) -> str:
+        return (
+            f"Polls: {self.polls} ({self.errors} errors, {self.unchanged_polls} unchanged)\n"
+            f"Missed packets: {self.missed_packets} in {self.gaps} gaps\n"
+            f"Latency mean: {self.latency_mean_ns:.0f}ns, "
+            f"p99: {self.latency_percentile(99)}ns, max: {self.latency_max_ns}ns\n"
+            f"Interval p50: {self.interval_percentile(50)}ns")
+
+
+class PollInstrumentation:
+    """
+    Collects polling statistics for an XboxController.\n
+    Assign to a controller to enable, set back to None to disable:
+    >>> controller.instrumentation = PollInstrumentation(hook=print)
+    """
+
+    def __init__(self, hook: PollHook | None = None) -> None:
+        self.hook = hook
+        self.reset()
+
+    def reset(self) -> None:
+        self.polls = 0
+        self.errors = 0
+        self.unchanged_polls = 0
+        self.missed_packets = 0
+        self.gaps = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self.latency_histogram = [0] * HISTOGRAM_BUCKETS
+        self.interval_histogram = [0] * HISTOGRAM_BUCKETS
+        self._last_poll_ns: int | None = None
+        self._last_packet_number: int | None = None
+
+    def record(self, start_ns: int, end_ns: int, response_code: int, packet_number: int) -> None:
+        """Record a single poll which started and ended at the given perf_counter_ns() times"""
+        latency = end_ns - start_ns
+        self.polls += 1
+        self.latency_total_ns += latency
+        if latency > self.latency_max_ns:
+            self.latency_max_ns = latency
+        self.latency_histogram[min(latency.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+        interval = 0
+        if self._last_poll_ns is not None:
+            interval = start_ns - self._last_poll_ns
+            self.interval_histogram[min(interval.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self._last_poll_ns = start_ns
+
+        if response_code != XInput.Codes.SUCCESS:
+            self.errors += 1
+            return
+
+        missed = 0
+        last = self._last_packet_number
+        if last is not None:
+            step = (packet_number - last) & 0xFFFFFFFF
+            if not step:
+                self.unchanged_polls += 1
+            elif step > 1:
+                missed = step - 1
+                self.missed_packets += missed
+                self.gaps += 1
+        self._last_packet_number = packet_number
+
+        if self.hook is not None:
+            self.hook(latency, interval, packet_number, missed)
+
+    def snapshot(self) -> PollStats:
+        """A copy of the current counters"""
+        return PollStats(
+            self.polls,
+            self.errors,
+            self.unchanged_polls,
+            self.missed_packets,
+            self.gaps,
+            self.latency_total_ns,
+            self.latency_max_ns,
+            tuple(self.latency_histogram),
+            tuple(self.interval_histogram))
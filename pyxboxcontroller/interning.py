@@ -0,0 +1,56 @@
+"""
+Sharing decoded states between packets with identical payloads.
+
+An idle pad, or one held still, sends the same XINPUT_GAMEPAD payload under new packet numbers.
+With an intern cache assigned, XboxController reuses the axes and buttons decoded for that payload
+rather than decoding them again:
+>>> controller.intern_cache = StateInternCache(maxsize=256)
+
+Every packet still gets its own state with its own packet_number,
+only the decoded values are shared.
+The cache is cleared when the controller's deadzones are reassigned.
+States compare and hash by their raw payload, so they can be used directly as keys of other caches.
+"""
+from collections import OrderedDict
+
+from pyxboxcontroller.controller import XboxControllerState
+
+
+class StateInternCache:
+    """
+    Least recently used cache of decoded states, keyed by the 12 raw XINPUT_GAMEPAD bytes.\n
+    Holds at most maxsize states. Call clear() after changing the settings of the controller's
+    deadzones in place, cached states keep the axes they were decoded with.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._states: OrderedDict[bytes, XboxControllerState] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, payload: bytes) -> XboxControllerState | None:
+        """The state cached for payload, marking it as most recently used"""
+        state = self._states.get(payload)
+        if state is None:
+            self.misses += 1
+            return None
+        self._states.move_to_end(payload)
+        self.hits += 1
+        return state
+
+    def put(self, payload: bytes, state: XboxControllerState) -> None:
+        """Cache state for payload, evicting the least recently used state when full"""
+        states = self._states
+        states[payload] = state
+        states.move_to_end(payload)
+        if len(states) > self.maxsize:
+            states.popitem(last=False)
+
+    def clear(self) -> None:
+        self._states.clear()
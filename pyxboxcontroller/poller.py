@@ -0,0 +1,195 @@
+"""
+Background polling of a controller at a fixed rate.
+
+Samples are written by a dedicated thread into a preallocated ring buffer of raw
+XInput.XINPUT_STATE packets stamped with time.perf_counter_ns(),
+so no input is lost between the frames of a slower consumer:
+>>> with ControllerPoller(XboxController(0), rate_hz=1000) as poller:
+...     state = poller.latest()
+...     for timestamp_ns, state in poller.drain():
+...         ...
+
+The ring buffer has a single writer and is read without locks.
+A sample is only published once it has been completely written,
+readers which fall more than a buffer behind skip the overwritten samples.
+"""
+import threading
+import time
+from array import array
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+
+class PollerReader:
+    """
+    Cursor into the ring buffer of a ControllerPoller.\n
+    Each consumer should use its own reader, drain returns every sample since its last call:
+    >>> reader = poller.reader()
+    >>> samples: list[tuple[int, XboxControllerState]] = reader.drain()
+    """
+
+    def __init__(self, poller: "ControllerPoller") -> None:
+        self._poller = poller
+        # Count of samples already read
+        self.position: int = poller.published
+        # Count of samples that were overwritten before they were read
+        self.missed: int = 0
+
+    def drain(self) -> list[tuple[int, XboxControllerState]]:
+        """Returns (timestamp_ns, state) of every sample published since the last call, oldest first"""
+        poller = self._poller
+        end = poller.published
+        start = max(self.position, end - poller.usable_capacity)
+        self.missed += start - self.position
+
+        samples = poller._read_range(start, end)
+
+        # Samples overwritten while they were being read are dropped
+        oldest = poller.published - poller.usable_capacity
+        if oldest > start:
+            dropped = min(oldest, end) - start
+            samples = samples[dropped:]
+            self.missed += dropped
+
+        self.position = end
+        return samples
+
+
+class ControllerPoller:
+    """
+    Samples a controller at a fixed rate on a background thread.\n
+
+    Start and stop the thread with start() and stop(), or use as a context manager:
+    >>> with ControllerPoller(controller, rate_hz=500, capacity=4096) as poller:
+    ...     ...
+
+    Only packets with a new packet number are written into the buffer.
+    While the controller is disconnected `connected` is False and nothing is written.
+    """
+
+    def __init__(
+            self,
+            controller: XboxController,
+            rate_hz: float = 1000.,
+            capacity: int = 1024
+            ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2, got {capacity}")
+
+        self.controller = controller
+        self.rate_hz = rate_hz
+        self.capacity = capacity
+        # The slot being written to is never read
+        self.usable_capacity = capacity - 1
+
+        # Preallocated ring buffer
+        self._packets = (XInput.XINPUT_STATE * capacity)()
+        self._timestamps = array("q", bytes(8 * capacity))
+
+        # Count of samples published, only ever written by the polling thread
+        self.published: int = 0
+        self.connected: bool = False
+        self.last_response_code: int | None = None
+
+        self._default_reader = PollerReader(self)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ControllerPoller":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start polling on a background thread"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"ControllerPoller-{self.controller.id}",
+            daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.) -> None:
+        """Stop the polling thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll_once(self) -> bool:
+        """Take a single sample, returns True if a new packet was published"""
+        packets = self._packets
+        published = self.published
+        slot = packets[published % self.capacity]
+        previous = packets[(published - 1) % self.capacity]
+
+        code = self.controller.backend.get_state(self.controller.id, slot)
+        self.last_response_code = code
+        self.connected = code == XInput.Codes.SUCCESS
+        if not self.connected:
+            return False
+        if published and slot.packet_number == previous.packet_number:
+            return False
+
+        self._timestamps[published % self.capacity] = time.perf_counter_ns()
+        # Publish only once the sample is complete
+        self.published = published + 1
+        return True
+
+    def _run(self) -> None:
+        """Polling loop, sleeps until the next tick of the fixed rate"""
+        period_ns = int(1e9 / self.rate_hz)
+        stop_event = self._stop_event
+        next_tick = time.perf_counter_ns()
+
+        while not stop_event.is_set():
+            self.poll_once()
+
+            next_tick += period_ns
+            delay = next_tick - time.perf_counter_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            else:
+                # Fell behind, don't try to catch up with a burst of polls
+                next_tick = time.perf_counter_ns()
+
+    def _read_range(self, start: int, end: int) -> list[tuple[int, XboxControllerState]]:
+        """Decode the samples with indexes in [start, end)"""
+        packets, timestamps, capacity = self._packets, self._timestamps, self.capacity
+        return [
+            (timestamps[i % capacity], XboxControllerState(packets[i % capacity]))
+            for i in range(start, end)]
+
+    def latest(self) -> XboxControllerState | None:
+        """The most recent state, None if nothing has been sampled yet"""
+        published = self.published
+        if not published:
+            return None
+        return XboxControllerState(self._packets[(published - 1) % self.capacity])
+
+    def latest_timestamp_ns(self) -> int | None:
+        """perf_counter_ns() of the most recent state, None if nothing has been sampled yet"""
+        published = self.published
+        if not published:
+            return None
+        return self._timestamps[(published - 1) % self.capacity]
+
+    def reader(self) -> PollerReader:
+        """A new cursor starting at the most recent sample"""
+        return PollerReader(self)
+
+    def drain(self) -> list[tuple[int, XboxControllerState]]:
+        """Returns (timestamp_ns, state) of every sample since the last call to drain.
+        Use reader() when there's more than one consumer."""
+        return self._default_reader.drain()
@@ -0,0 +1,99 @@
+"""
+Preallocated storage for raw XINPUT_STATE packets, for polling without creating objects.
+
+Poll a controller into a reused buffer, and read fields straight from it:
+>>> buffer = RawStateBuffer(1024)
+>>> packet_number, changed = controller.poll_into(buffer, index)
+>>> if buffer.a(index):
+...     x = buffer.l_thumb_x(index)
+
+Fields are read through typed memoryviews over the buffer, so accessors return plain ints
+rather than decoding a struct. Values are raw, see XboxControllerState for their scaling.
+"""
+import ctypes
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.controller import XboxControllerState
+
+# Size of a single XINPUT_STATE in bytes
+RECORD_SIZE: int = ctypes.sizeof(XInput.XINPUT_STATE)
+
+
+class RawStateBuffer:
+    """
+    Fixed size array of raw XINPUT_STATE packets.\n
+    `array` is the underlying ctypes array and `view` a memoryview of its bytes,
+    e.g. for writing to a file or passing to NumPy.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.array = (XInput.XINPUT_STATE * capacity)()
+        self.address: int = ctypes.addressof(self.array)
+        self.view = memoryview(self.array).cast("B")
+        # Typed views, indexed by record * (RECORD_SIZE // item size) + field offset
+        self._u32 = self.view.cast("I")
+        self._u16 = self.view.cast("H")
+        self._i16 = self.view.cast("h")
+
+    def __len__(self) -> int:
+        return self.capacity
+
+    def packet_number(self, index: int) -> int:
+        return self._u32[index * 4]
+
+    def buttons(self, index: int) -> int:
+        """Raw button bitmask, see XboxControllerState._BUTTON_MAP"""
+        return self._u16[index * 8 + 2]
+
+    def pressed(self, index: int, mask: int) -> bool:
+        """True if any of the buttons in mask are pressed"""
+        return (self._u16[index * 8 + 2] & mask) != 0
+
+    def left_trigger(self, index: int) -> int:
+        return self.view[index * 16 + 6]
+
+    def right_trigger(self, index: int) -> int:
+        return self.view[index * 16 + 7]
+
+    def l_thumb_x(self, index: int) -> int:
+        return self._i16[index * 8 + 4]
+
+    def l_thumb_y(self, index: int) -> int:
+        return self._i16[index * 8 + 5]
+
+    def r_thumb_x(self, index: int) -> int:
+        return self._i16[index * 8 + 6]
+
+    def r_thumb_y(self, index: int) -> int:
+        return self._i16[index * 8 + 7]
+
+    # Common buttons
+    def a(self, index: int) -> bool:
+        return (self._u16[index * 8 + 2] & 4096) != 0
+
+    def b(self, index: int) -> bool:
+        return (self._u16[index * 8 + 2] & 8192) != 0
+
+    def x(self, index: int) -> bool:
+        return (self._u16[index * 8 + 2] & 16384) != 0
+
+    def y(self, index: int) -> bool:
+        return (self._u16[index * 8 + 2] & 32768) != 0
+
+    def start(self, index: int) -> bool:
+        return (self._u16[index * 8 + 2] & 16) != 0
+
+    def state(self, index: int) -> XboxControllerState:
+        """Decode a record into an XboxControllerState (which does allocate)"""
+        i = index * 8
+        u16, i16, view = self._u16, self._i16, self.view
+        return XboxControllerState.from_raw(
+            self._u32[index * 4],
+            u16[i + 2],
+            view[index * 16 + 6],
+            view[index * 16 + 7],
+            i16[i + 4],
+            i16[i + 5],
+            i16[i + 6],
+            i16[i + 7])
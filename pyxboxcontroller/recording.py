@@ -0,0 +1,237 @@
+"""
+Binary recording and replay of controller sessions.
+
+Files start with a 16 byte header, followed by fixed width 24 byte records:
+a little-endian int64 time.perf_counter_ns() timestamp and the raw 16 byte XINPUT_STATE.
+
+Record a session with:
+>>> with SessionRecorder("session.xrec", controller) as recorder:
+...     while playing:
+...         recorder.poll()
+
+Replay it through an XboxController, without loading the file into memory:
+>>> replay = SessionReplay("session.xrec")
+>>> controller = XboxController(0, backend=replay)
+"""
+import bisect
+import ctypes
+import mmap
+import os
+import struct
+import time
+from collections.abc import Callable
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+MAGIC = b"PYXBREC\0"
+VERSION = 1
+
+# magic, version, record size, reserved
+HEADER = struct.Struct("<8sHHI")
+TIMESTAMP = struct.Struct("<q")
+# XINPUT_STATE as written on a (little-endian) XInput host
+PACKET = struct.Struct("<IHBBhhhh")
+RECORD = struct.Struct("<qIHBBhhhh")
+RECORD_SIZE = RECORD.size
+
+_STATE_SIZE = ctypes.sizeof(XInput.XINPUT_STATE)
+
+
+class SessionRecorder:
+    """
+    Appends raw controller states to a session file.\n
+
+    Either poll a controller, only new packets are recorded:
+    >>> recorder.poll()
+
+    Or record states obtained elsewhere:
+    >>> recorder.record(xinput_state, timestamp_ns)
+    >>> recorder.record_state(xbox_controller_state, timestamp_ns)
+    """
+
+    def __init__(self, path: str | os.PathLike, controller: XboxController | None = None) -> None:
+        self.path = path
+        self.controller = controller
+        self.count: int = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, 0))
+        self._state = XInput.XINPUT_STATE()
+        self._last_packet_number: int | None = None
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, state: XInput.XINPUT_STATE, timestamp_ns: int | None = None) -> None:
+        """Append a raw XINPUT_STATE, timestamped now unless given"""
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        self._file.write(TIMESTAMP.pack(timestamp_ns))
+        self._file.write(ctypes.string_at(ctypes.addressof(state), _STATE_SIZE))
+        self.count += 1
+
+    def record_state(self, state: XboxControllerState, timestamp_ns: int | None = None) -> None:
+        """Append an XboxControllerState, timestamped now unless given"""
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        self._file.write(TIMESTAMP.pack(timestamp_ns))
+        self._file.write(PACKET.pack(state.packet_number & 0xFFFFFFFF, *state.raw))
+        self.count += 1
+
+    def poll(self) -> bool:
+        """Record the controller's state if it has a new packet number.
+        Returns True if a state was recorded."""
+        controller = self.controller
+        state = self._state
+        res = controller.backend.get_state(controller.id, state)
+        controller.handle_response_code(res, current_action="record state")
+        if state.packet_number == self._last_packet_number:
+            return False
+        self._last_packet_number = state.packet_number
+        self.record(state)
+        return True
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _Timestamps:
+    """Sequence view of the timestamps in a memory-mapped session, for bisect"""
+
+    def __init__(self, buffer: mmap.mmap, count: int) -> None:
+        self._buffer, self._count = buffer, count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return TIMESTAMP.unpack_from(self._buffer, HEADER.size + index * RECORD_SIZE)[0]
+
+
+class SessionReplay(Backend):
+    """
+    Replays a session file as the backend of controller_id.\n
+
+    With realtime=True states are given with their original timing,
+    otherwise every call to get_state advances to the next record, as fast as possible.
+    The last state is repeated once the session has finished.
+
+    Records can be accessed at random, by index or by time since the start:
+    >>> timestamp_ns, state = replay[10]
+    >>> index = replay.index_at(5_000_000_000)
+    """
+
+    name = "replay"
+
+    def __init__(
+            self,
+            path: str | os.PathLike,
+            controller_id: int = 0,
+            realtime: bool = True,
+            clock: Callable[[], int] = time.perf_counter_ns
+            ) -> None:
+        self.path = path
+        self.controller_id = controller_id
+        self.realtime = realtime
+        self._clock = clock
+
+        with open(path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._buffer) < HEADER.size:
+            raise ValueError(f"{path} is not a session recording")
+        magic, version, record_size, _ = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a session recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported session recording version {version} in {path}")
+
+        # A partially written last record is ignored
+        self._count = (len(self._buffer) - HEADER.size) // RECORD_SIZE
+        self._timestamps = _Timestamps(self._buffer, self._count)
+        self.start_ns: int = self._timestamps[0] if self._count else 0
+
+        self.position: int = -1
+        self._started_at: int | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> tuple[int, XboxControllerState]:
+        """Returns (timestamp_ns, state) of the record at index"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("session record index out of range")
+        offset = HEADER.size + index * RECORD_SIZE
+        timestamp_ns, packet_number, *raw = RECORD.unpack_from(self._buffer, offset)
+        return timestamp_ns, XboxControllerState.from_raw(packet_number, *raw)
+
+    @property
+    def duration_ns(self) -> int:
+        if not self._count:
+            return 0
+        return self._timestamps[self._count - 1] - self.start_ns
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= self._count - 1
+
+    def index_at(self, elapsed_ns: int) -> int:
+        """Index of the latest record at elapsed_ns since the start of the session, -1 if none"""
+        return bisect.bisect_right(self._timestamps, self.start_ns + elapsed_ns) - 1
+
+    def seek(self, index: int) -> None:
+        """Continue replaying from the record at index"""
+        self.position = index - 1
+        if self.realtime:
+            elapsed = self._timestamps[index] - self.start_ns if self._count else 0
+            self._started_at = self._clock() - elapsed
+
+    def restart(self) -> None:
+        """Replay from the beginning"""
+        self.position = -1
+        self._started_at = None
+
+    def _advance(self) -> int:
+        if self.realtime:
+            now = self._clock()
+            if self._started_at is None:
+                self._started_at = now
+            self.position = max(self.position, self.index_at(now - self._started_at))
+        elif self.position < self._count - 1:
+            self.position += 1
+        return self.position
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        if controller_id != self.controller_id or not self._count:
+            return XInput.Codes.NOT_CONNECTED
+        position = max(self._advance(), 0)
+        offset = HEADER.size + position * RECORD_SIZE + TIMESTAMP.size
+        ctypes.memmove(
+            ctypes.addressof(state),
+            self._buffer[offset:offset + _STATE_SIZE],
+            _STATE_SIZE)
+        return XInput.Codes.SUCCESS
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        if controller_id != self.controller_id:
+            return XInput.Codes.NOT_CONNECTED
+        battery_info.battery_type = 1  # BatteryType.WIRED
+        battery_info.battery_level = 3  # BatteryLevel.FULL
+        return XInput.Codes.SUCCESS
+
+    def close(self) -> None:
+        self._buffer.close()
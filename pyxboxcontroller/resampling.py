@@ -0,0 +1,124 @@
+"""
+Resampling controller states to the fixed timestep of a simulation.
+
+Timestamped states go in as they arrive, exactly one state comes out per tick:
+>>> resampler = FixedStepResampler(rate_hz=120.)
+>>> while running:
+...     resampler.update(controller)  # Or add(timestamp_ns, state) from a ControllerPoller
+...     state = resampler.step()
+...     simulate(state)
+
+Ticks are rendered `delay` seconds in the past, so there is usually a sample on either side
+to interpolate the axes and triggers between. A longer delay interpolates more reliably,
+a shorter one adds less latency, with no delay the latest sample is held.
+
+Every button pressed by any sample since the previous tick is pressed in the next tick,
+so presses shorter than a tick are never dropped.
+
+The normalised axes are interpolated from those of the samples, so the deadzones and filters
+of the controller they came from are kept.
+"""
+from collections import deque
+from time import perf_counter_ns
+
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+
+class FixedStepResampler:
+    """
+    Produces one state per tick of a fixed rate from timestamped states.\n
+    delay is in seconds, one tick when None. Timestamps are perf_counter_ns() times.
+    At most history samples are kept.
+    """
+
+    def __init__(
+            self,
+            rate_hz: float = 120.,
+            delay: float | None = None,
+            history: int = 256
+            ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        self.rate_hz = rate_hz
+        self.period_ns = int(1e9 / rate_hz)
+        self.delay_ns = self.period_ns if delay is None else int(delay * 1e9)
+        # (timestamp_ns, state), oldest first
+        self._samples: deque[tuple[int, XboxControllerState]] = deque(maxlen=history)
+        self._next_tick_ns: int | None = None
+        self._last_render_ns: int | None = None
+        self._last_packet_number: int | None = None
+
+    def add(self, timestamp_ns: int, state: XboxControllerState) -> None:
+        """Add a sample, samples older than the latest are ignored"""
+        samples = self._samples
+        if samples and timestamp_ns < samples[-1][0]:
+            return
+        samples.append((timestamp_ns, state))
+
+    def update(self, controller: XboxController) -> None:
+        """Sample controller now, if it has a new packet"""
+        state = controller.state
+        if controller.packet_number != self._last_packet_number:
+            self._last_packet_number = controller.packet_number
+            self.add(perf_counter_ns(), state)
+
+    def step(self, now_ns: int | None = None) -> XboxControllerState:
+        """The state of the next tick. The first tick is at now_ns (now when None),
+        each later tick exactly one period after the last."""
+        tick_ns = self._next_tick_ns
+        if tick_ns is None:
+            tick_ns = perf_counter_ns() if now_ns is None else now_ns
+        self._next_tick_ns = tick_ns + self.period_ns
+        return self.sample(tick_ns - self.delay_ns)
+
+    def sample(self, render_ns: int) -> XboxControllerState:
+        """The state at render_ns, with every button pressed since the last sample() call"""
+        samples = self._samples
+        if not samples:
+            return XboxControllerState.default_state()
+
+        last_render_ns = self._last_render_ns
+        self._last_render_ns = render_ns
+
+        # Buttons of every sample since the last render
+        pressed = 0
+        before = after = None
+        for sample in samples:
+            timestamp_ns, state = sample
+            if timestamp_ns <= render_ns:
+                before = sample
+                if last_render_ns is None or timestamp_ns > last_render_ns:
+                    pressed |= state._buttons
+            else:
+                after = sample
+                break
+
+        # Samples older than the one rendered are no longer needed
+        if before is not None:
+            while samples[0] is not before:
+                samples.popleft()
+
+        if before is None:
+            # Rendering before the first sample
+            state = samples[0][1]
+            resampled = XboxControllerState.from_raw(state.packet_number, *state.raw)
+            resampled._axes = state._axes or state._decode_axes()
+            return resampled
+        before_ns, state = before
+        axes = state._axes or state._decode_axes()
+        if after is None or before_ns == render_ns:
+            resampled = XboxControllerState.from_raw(
+                state.packet_number, state._buttons | pressed, *state.raw[1:])
+            resampled._axes = axes
+            return resampled
+
+        after_ns, next_state = after
+        fraction = (render_ns - before_ns) / (after_ns - before_ns)
+        resampled = XboxControllerState.from_raw(
+            state.packet_number,
+            state._buttons | pressed,
+            *(round(a + (b - a) * fraction) for a, b in zip(state.raw[1:], next_state.raw[1:])))
+        # The samples' axes, so any deadzones and filters applied to them are kept
+        next_axes = next_state._axes or next_state._decode_axes()
+        resampled._axes = tuple(a + (b - a) * fraction for a, b in zip(axes, next_axes))
+        return resampled
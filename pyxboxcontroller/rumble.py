@@ -0,0 +1,174 @@
+"""
+Rumble effects for XboxController.
+
+Timed pulses and envelopes of every controller are run by a single shared scheduler thread,
+rather than a sleeping thread per effect:
+>>> controller.rumble_pulse(1., 0.5, duration=0.2)
+>>> controller.play_rumble(RumbleEffect([(0., 0., 0.), (0.5, 1., 1.), (1., 0., 0.)]))
+
+Writes to the controller are coalesced, XInputSetState is only called when the motor speeds change,
+and no more often than the controller's rumble_min_interval.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Sequence
+
+# Motor speeds as written to XINPUT_VIBRATION
+MotorSpeeds = tuple[int, int]
+
+
+def motor_speeds(left: float, right: float) -> MotorSpeeds:
+    """Convert motor strengths between 0 and 1 into XInput motor speeds"""
+    return (
+        int(max(0., min(left, 1.)) * 65535 + 0.5),
+        int(max(0., min(right, 1.)) * 65535 + 0.5))
+
+
+class RumbleEffect:
+    """
+    Motor strengths over time, linearly interpolated between keyframes.\n
+    Keyframes are (seconds since start, left, right), sorted by time.
+    The effect ends at its last keyframe, unless loop is True.
+    """
+
+    def __init__(self, keyframes: Sequence[tuple[float, float, float]], loop: bool = False) -> None:
+        if not keyframes:
+            raise ValueError("A rumble effect needs at least one keyframe")
+        self.times = [t for t, _, _ in keyframes]
+        self.values = [(left, right) for _, left, right in keyframes]
+        self.duration = self.times[-1]
+        self.loop = loop and self.duration > 0
+
+    def value_at(self, elapsed: float) -> tuple[float, float] | None:
+        """Motor strengths (left, right) at elapsed seconds, None once the effect has ended"""
+        if elapsed > self.duration:
+            if not self.loop:
+                return None
+            elapsed %= self.duration
+
+        times, values = self.times, self.values
+        i = bisect_right(times, elapsed)
+        if i == 0:
+            return values[0]
+        if i == len(times):
+            return values[-1]
+        t0, t1 = times[i - 1], times[i]
+        (l0, r0), (l1, r1) = values[i - 1], values[i]
+        fraction = (elapsed - t0) / (t1 - t0)
+        return (l0 + (l1 - l0) * fraction, r0 + (r1 - r0) * fraction)
+
+
+def pulse(left: float, right: float, duration: float) -> RumbleEffect:
+    """Constant rumble for duration seconds, then stop"""
+    return RumbleEffect([(0., left, right), (duration, left, right), (duration, 0., 0.)])
+
+
+class RumbleScheduler:
+    """
+    Runs rumble effects and deferred writes of any number of controllers.\n
+    With threaded=False nothing runs in the background, call step() to advance.
+    """
+
+    def __init__(
+            self,
+            tick: float = 0.01,
+            threaded: bool = True,
+            clock: Callable[[], float] = time.monotonic
+            ) -> None:
+        self.tick = tick
+        self.threaded = threaded
+        self._clock = clock
+        # controller -> (effect, start time)
+        self._effects: dict = {}
+        # controller -> (motor speeds, earliest write time)
+        self._pending: dict = {}
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def play(self, controller, effect: RumbleEffect) -> None:
+        """Play effect on controller, replacing any effect already playing on it"""
+        with self._condition:
+            self._effects[controller] = (effect, self._clock())
+            self._wake()
+
+    def stop(self, controller) -> None:
+        """Stop any effect playing on controller, without changing the motors"""
+        with self._condition:
+            self._effects.pop(controller, None)
+            self._pending.pop(controller, None)
+
+    def is_playing(self, controller) -> bool:
+        return controller in self._effects
+
+    def defer(self, controller, speeds: MotorSpeeds, at: float) -> None:
+        """Write speeds to controller at the given clock time, unless replaced before then"""
+        with self._condition:
+            self._pending[controller] = (speeds, at)
+            self._wake()
+
+    def _wake(self) -> None:
+        if not self.threaded:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="RumbleScheduler", daemon=True)
+            self._thread.start()
+        self._condition.notify()
+
+    def step(self, now: float | None = None) -> float | None:
+        """Advance all effects and deferred writes to now.
+        Returns the clock time of the next step needed, None when idle."""
+        with self._condition:
+            if now is None:
+                now = self._clock()
+
+            for controller, (effect, start) in list(self._effects.items()):
+                value = effect.value_at(now - start)
+                if value is None:
+                    del self._effects[controller]
+                    value = effect.values[-1]
+                self._pending[controller] = (motor_speeds(*value), now)
+
+            wake_times = []
+            for controller, (speeds, at) in list(self._pending.items()):
+                if at > now:
+                    wake_times.append(at)
+                    continue
+                try:
+                    retry_at = controller._write_rumble(speeds, now)
+                except (ConnectionError, RuntimeError):
+                    # Controller unplugged or failing, drop its effects
+                    self._effects.pop(controller, None)
+                    retry_at = None
+                if retry_at is None:
+                    del self._pending[controller]
+                else:
+                    self._pending[controller] = (speeds, retry_at)
+                    wake_times.append(retry_at)
+
+            if self._effects:
+                wake_times.append(now + self.tick)
+            return min(wake_times) if wake_times else None
+
+    def _run(self) -> None:
+        while True:
+            next_step = self.step()
+            with self._condition:
+                if next_step is None:
+                    if not self._effects and not self._pending:
+                        self._condition.wait()
+                else:
+                    delay = next_step - self._clock()
+                    if delay > 0:
+                        self._condition.wait(delay)
+
+
+_SCHEDULER: RumbleScheduler | None = None
+
+
+def get_scheduler() -> RumbleScheduler:
+    """The scheduler shared by all controllers, created on first use"""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = RumbleScheduler()
+    return _SCHEDULER
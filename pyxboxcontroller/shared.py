@@ -0,0 +1,223 @@
+"""
+Sharing controller states between processes through shared memory.
+
+A single process polls the controllers and publishes their raw states:
+>>> publisher = SharedStatePublisher("pyxboxcontroller")
+>>> while True:
+...     publisher.update(controller)
+
+Any number of processes read them, without locks, system calls or pickling:
+>>> reader = SharedStateReader("pyxboxcontroller")
+>>> state = reader.state(0)
+
+The reader is also a backend, so the published controllers are used like local ones:
+>>> controller = XboxController(0, backend=reader)
+
+Each slot is guarded by a sequence lock. The publisher makes the sequence odd while it writes,
+and even again once done. Readers copy the slot and retry if the sequence was odd or changed.
+
+Layout (native byte order):
+    header: magic (8), version (u16), slot count (u16), reserved (u32)
+    slot:   sequence (u32), response code (u32), perf_counter_ns of the update (i64), XINPUT_STATE
+"""
+import ctypes
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+MAGIC: bytes = b"PYXBSHM\0"
+VERSION: int = 1
+
+HEADER = struct.Struct("=8sHHI")
+
+# Seconds a reader retries a slot left mid write, e.g. by a publisher which died
+READ_TIMEOUT: float = 0.1
+
+
+class SharedSlot(ctypes.Structure):
+    _fields_ = [
+        ("sequence", ctypes.c_uint32),
+        ("result", ctypes.c_uint32),
+        ("timestamp_ns", ctypes.c_int64),
+        ("state", XInput.XINPUT_STATE),
+    ]
+
+
+_STATE_SIZE = ctypes.sizeof(XInput.XINPUT_STATE)
+_STATE_OFFSET = SharedSlot.state.offset
+
+# Names of segments created by publishers in this process
+_CREATED: set[str] = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """Stop the segment being destroyed when this process exits.
+    Before 3.13 the resource tracker unlinks every segment a process opened."""
+    if (sys.version_info < (3, 13) and shm._name not in _CREATED
+            and hasattr(shared_memory, "resource_tracker")):
+        shared_memory.resource_tracker.unregister(shm._name, "shared_memory")
+
+
+class SharedStatePublisher:
+    """
+    Publishes controller states into a shared memory segment, with a slot per controller id.\n
+    The segment is created with the given name, a random one when None, see `name`.
+    Only one publisher may write to a segment.
+    """
+
+    def __init__(self, name: str | None = None, slots: int = 4) -> None:
+        self._shm = shared_memory.SharedMemory(
+            name, create=True, size=HEADER.size + slots * ctypes.sizeof(SharedSlot))
+        _CREATED.add(self._shm._name)
+        HEADER.pack_into(self._shm.buf, 0, MAGIC, VERSION, slots, 0)
+        self.slots = slots
+        self._slots = (SharedSlot * slots).from_buffer(self._shm.buf, HEADER.size)
+        for slot in self._slots:
+            slot.result = XInput.Codes.NOT_CONNECTED
+        self._state = XInput.XINPUT_STATE()
+
+    @property
+    def name(self) -> str:
+        """Name readers attach to"""
+        return self._shm.name
+
+    def publish(
+            self,
+            controller_id: int,
+            state: XInput.XINPUT_STATE,
+            result: int = XInput.Codes.SUCCESS
+            ) -> None:
+        """Write a raw state and the response code it was read with"""
+        slot = self._slots[controller_id]
+        slot.sequence += 1
+        slot.result = result
+        slot.timestamp_ns = time.perf_counter_ns()
+        ctypes.memmove(ctypes.addressof(slot) + _STATE_OFFSET, ctypes.addressof(state), _STATE_SIZE)
+        slot.sequence += 1
+
+    def update(self, controller: XboxController) -> int:
+        """Poll controller and publish its state, or that it's disconnected.
+        Returns the backend's response code, this doesn't raise when disconnected."""
+        state = self._state
+        result = controller.backend.get_state(controller.id, state)
+        self.publish(controller.id, state, result)
+        return result
+
+    def close(self, unlink: bool = True) -> None:
+        """Stop publishing, and destroy the segment unless unlink is False"""
+        del self._slots
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+            _CREATED.discard(self._shm._name)
+
+    def __enter__(self) -> "SharedStatePublisher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedStateReader(Backend):
+    """
+    Reads controller states published by a SharedStatePublisher in another process.\n
+    Slots which haven't been published to report as disconnected,
+    as do slots still being written after read_timeout seconds.
+    """
+
+    name = "shared"
+
+    def __init__(self, name: str) -> None:
+        self._shm = _attach(name)
+        magic, version, slots, _ = HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise ValueError(f"{name!r} isn't a pyxboxcontroller shared memory segment")
+        _untrack(self._shm)
+        self.slots = slots
+        self._slots = (SharedSlot * slots).from_buffer(self._shm.buf, HEADER.size)
+        self._state = XInput.XINPUT_STATE()
+        self.read_timeout = READ_TIMEOUT
+        # controller id -> last decoded state
+        self._last_states: dict[int, XboxControllerState] = {}
+
+    def read_into(self, controller_id: int, state: XInput.XINPUT_STATE) -> tuple[int, int]:
+        """Copy a consistent snapshot of a slot into state.
+        Returns the response code and the perf_counter_ns time it was published at,
+        NOT_CONNECTED for ids without a slot or a slot left mid write."""
+        if not 0 <= controller_id < self.slots:
+            return XInput.Codes.NOT_CONNECTED, 0
+        slot = self._slots[controller_id]
+        address = ctypes.addressof(state)
+        source = ctypes.addressof(slot) + _STATE_OFFSET
+        spins = 0
+        deadline = None
+        while True:
+            sequence = slot.sequence
+            if not sequence & 1:
+                result, timestamp_ns = slot.result, slot.timestamp_ns
+                ctypes.memmove(address, source, _STATE_SIZE)
+                if slot.sequence == sequence:
+                    return result, timestamp_ns
+            spins += 1
+            if spins & 63 == 0:
+                # The publisher was descheduled mid write, or died
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + self.read_timeout
+                elif now > deadline:
+                    return XInput.Codes.NOT_CONNECTED, 0
+                time.sleep(0)
+
+    def state(self, controller_id: int = 0) -> XboxControllerState:
+        """Latest published state of a controller.
+        Raises a ConnectionError if it's disconnected."""
+        if not 0 <= controller_id < self.slots:
+            raise ConnectionError(
+                f"No controller slot with id: {controller_id}, "
+                f"the segment has {self.slots} slots")
+        result, _ = self.read_into(controller_id, self._state)
+        if result != XInput.Codes.SUCCESS:
+            raise ConnectionError(f"No controller connected with id: {controller_id}")
+        last = self._last_states.get(controller_id)
+        if last is not None and last.packet_number == self._state.packet_number:
+            return last
+        state = self._last_states[controller_id] = XboxControllerState(self._state)
+        return state
+
+    def last_update_ns(self, controller_id: int) -> int:
+        """perf_counter_ns time of the last update of a controller, 0 if never published"""
+        return self.read_into(controller_id, self._state)[1]
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        return self.read_into(controller_id, state)[0]
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        result = self.get_state(controller_id, self._state)
+        if result != XInput.Codes.SUCCESS:
+            return result
+        # Battery information isn't published
+        battery_info.battery_type = 255  # BatteryType.UNKNOWN
+        battery_info.battery_level = 3  # BatteryLevel.FULL
+        return XInput.Codes.SUCCESS
+
+    def close(self) -> None:
+        del self._slots
+        self._shm.close()
@@ -0,0 +1,303 @@
+"""
+Streaming controller states to other machines over UDP.
+
+The sender publishes states with a compact binary format. Full keyframes are sent periodically,
+in between only the fields which differ from the last keyframe the receiver acknowledged are sent,
+so a lost packet never leaves the receiver with a wrong state:
+>>> streamer = StateStreamer(("192.168.0.2", DEFAULT_PORT))
+>>> while True:
+...     streamer.update(controller)
+
+The receiver is a backend, so a remote controller is used like a local one:
+>>> receiver = StateReceiver(("0.0.0.0", DEFAULT_PORT))
+>>> remote_controller = XboxController(0, backend=receiver)
+
+Each streamer picks a random session id. Older states of a session are ignored,
+a new session (e.g. a restarted sender) replaces the state whatever its packet numbers.
+
+Wire format (little-endian):
+    header:   type, controller id, keyframe sequence (u16), packet number (u32), session (u32)
+    keyframe: header of type 1, XINPUT_GAMEPAD
+    delta:    header of type 2, mask of changed XINPUT_GAMEPAD fields (u8), the changed fields
+    ack:      type (3), controller id, keyframe sequence (u16), sent back by the receiver
+"""
+import random
+import socket
+import struct
+import time
+from collections.abc import Callable
+
+from pyxboxcontroller import XInput
+from pyxboxcontroller.backends import Backend
+from pyxboxcontroller.controller import XboxController, XboxControllerState
+
+DEFAULT_PORT: int = 47800
+
+KEYFRAME = 1
+DELTA = 2
+ACK = 3
+
+HEADER = struct.Struct("<BBHII")
+ACK_MESSAGE = struct.Struct("<BBH")
+MASK = struct.Struct("<B")
+# XINPUT_GAMEPAD fields, in the order of XboxControllerState.raw
+_FIELD_FORMATS = "HBBhhhh"
+GAMEPAD = struct.Struct("<" + _FIELD_FORMATS)
+
+# Number of recent keyframes remembered by each side
+KEYFRAME_HISTORY: int = 8
+
+_MAX_MESSAGE = HEADER.size + MASK.size + GAMEPAD.size
+
+RawGamepad = tuple[int, int, int, int, int, int, int]
+
+
+# Struct of the fields set in each mask, built on first use
+_DELTA_STRUCTS: dict[int, struct.Struct] = {}
+
+
+def _delta_struct(mask: int) -> struct.Struct:
+    """Struct of the fields set in mask"""
+    packer = _DELTA_STRUCTS.get(mask)
+    if packer is None:
+        packer = _DELTA_STRUCTS[mask] = struct.Struct(
+            "<" + "".join(fmt for i, fmt in enumerate(_FIELD_FORMATS) if mask >> i & 1))
+    return packer
+
+
+def _is_newer(packet_number: int, current: int) -> bool:
+    """Compare packet numbers, allowing for wrap around"""
+    return 0 < ((packet_number - current) & 0xFFFFFFFF) < 0x80000000
+
+
+class _Stream:
+    """Sender side state of a single controller"""
+
+    def __init__(self) -> None:
+        self.sequence: int = 0
+        self.sent: dict[int, RawGamepad] = {}
+        self.acked: tuple[int, RawGamepad] | None = None
+        self.last_keyframe: float = float("-inf")
+        self.last_packet_number: int | None = None
+
+
+class StateStreamer:
+    """
+    Publishes controller states to a StateReceiver over UDP.\n
+    A keyframe is sent every keyframe_interval seconds, and until the receiver acknowledges one.
+    session identifies this streamer to receivers, random by default.
+    """
+
+    def __init__(
+            self,
+            address: tuple[str, int],
+            keyframe_interval: float = 1.,
+            sock: socket.socket | None = None,
+            clock: Callable[[], float] = time.monotonic,
+            session: int | None = None
+            ) -> None:
+        self.address = address
+        self.session = random.getrandbits(32) if session is None else session
+        self.keyframe_interval = keyframe_interval
+        self._clock = clock
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        self.socket = sock
+        self._streams: dict[int, _Stream] = {}
+        self.bytes_sent: int = 0
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def _receive_acks(self) -> None:
+        while True:
+            try:
+                data = self.socket.recv(ACK_MESSAGE.size)
+            except (BlockingIOError, ConnectionError):
+                # ConnectionError: Windows reports unreachable receivers on the next recv
+                return
+            if len(data) != ACK_MESSAGE.size:
+                continue
+            message_type, controller_id, sequence = ACK_MESSAGE.unpack(data)
+            stream = self._streams.get(controller_id)
+            if message_type != ACK or stream is None or sequence not in stream.sent:
+                continue
+            acked = stream.acked
+            # Ignore acks of keyframes older than the one already acknowledged
+            if acked is None or 0 < ((sequence - acked[0]) & 0xFFFF) < 0x8000:
+                stream.acked = (sequence, stream.sent[sequence])
+
+    def publish(self, controller_id: int, state: XboxControllerState) -> int:
+        """Send state, as a keyframe or a delta. Returns the number of bytes sent."""
+        self._receive_acks()
+        stream = self._streams.get(controller_id)
+        if stream is None:
+            stream = self._streams[controller_id] = _Stream()
+
+        raw = state.raw
+        packet_number = state.packet_number & 0xFFFFFFFF
+        stream.last_packet_number = packet_number
+        now = self._clock()
+
+        if stream.acked is None or now - stream.last_keyframe >= self.keyframe_interval:
+            stream.sequence = sequence = (stream.sequence + 1) & 0xFFFF
+            stream.sent[sequence] = raw
+            if len(stream.sent) > KEYFRAME_HISTORY:
+                del stream.sent[next(iter(stream.sent))]
+            stream.last_keyframe = now
+            message = (
+                HEADER.pack(KEYFRAME, controller_id, sequence, packet_number, self.session)
+                + GAMEPAD.pack(*raw))
+        else:
+            sequence, keyframe = stream.acked
+            mask = 0
+            changed = []
+            for i, (value, base) in enumerate(zip(raw, keyframe)):
+                if value != base:
+                    mask |= 1 << i
+                    changed.append(value)
+            message = (
+                HEADER.pack(DELTA, controller_id, sequence, packet_number, self.session)
+                + MASK.pack(mask)
+                + _delta_struct(mask).pack(*changed))
+
+        try:
+            sent = self.socket.sendto(message, self.address)
+        except BlockingIOError:
+            return 0
+        self.bytes_sent += sent
+        return sent
+
+    def update(self, controller: XboxController) -> int:
+        """Publish the controller's state if it has a new packet, or a keyframe is due.
+        Returns the number of bytes sent."""
+        state = controller.state
+        stream = self._streams.get(controller.id)
+        if (stream is not None
+                and state.packet_number & 0xFFFFFFFF == stream.last_packet_number
+                and self._clock() - stream.last_keyframe < self.keyframe_interval):
+            return 0
+        return self.publish(controller.id, state)
+
+
+class _RemoteController:
+    """Receiver side state of a single controller"""
+
+    def __init__(self) -> None:
+        self.session: int | None = None
+        self.keyframes: dict[int, RawGamepad] = {}
+        self.packet_number: int = 0
+        self.raw: RawGamepad | None = None
+        self.last_received: float = float("-inf")
+
+
+class StateReceiver(Backend):
+    """
+    Backend reading controllers published by a StateStreamer.\n
+    A controller reports as disconnected until its first keyframe arrives,
+    and again once nothing has been received from it for timeout seconds.
+    """
+
+    name = "udp"
+
+    def __init__(
+            self,
+            address: tuple[str, int] = ("0.0.0.0", DEFAULT_PORT),
+            timeout: float = 2.,
+            sock: socket.socket | None = None,
+            clock: Callable[[], float] = time.monotonic
+            ) -> None:
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(address)
+        sock.setblocking(False)
+        self.socket = sock
+        self.timeout = timeout
+        self._clock = clock
+        self._remotes: dict[int, _RemoteController] = {}
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Address the receiver is bound to"""
+        return self.socket.getsockname()
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def receive(self) -> int:
+        """Apply every message waiting on the socket, returns the number applied"""
+        applied = 0
+        sock = self.socket
+        while True:
+            try:
+                data, sender = sock.recvfrom(_MAX_MESSAGE)
+            except (BlockingIOError, ConnectionError):
+                return applied
+            if len(data) < HEADER.size:
+                continue
+            message_type, controller_id, sequence, packet_number, session = HEADER.unpack_from(data)
+            remote = self._remotes.get(controller_id)
+
+            if message_type == KEYFRAME and len(data) == HEADER.size + GAMEPAD.size:
+                if remote is None or remote.session != session:
+                    # A new sender, its packet numbers are unrelated to the last one's
+                    remote = self._remotes[controller_id] = _RemoteController()
+                    remote.session = session
+                raw = GAMEPAD.unpack_from(data, HEADER.size)
+                # Duplicates don't replace the keyframe deltas are already based on
+                remote.keyframes.setdefault(sequence, raw)
+                if len(remote.keyframes) > KEYFRAME_HISTORY:
+                    del remote.keyframes[next(iter(remote.keyframes))]
+                try:
+                    sock.sendto(ACK_MESSAGE.pack(ACK, controller_id, sequence), sender)
+                except (BlockingIOError, ConnectionError):
+                    pass
+
+            elif (message_type == DELTA and remote is not None and remote.session == session
+                    and sequence in remote.keyframes):
+                if len(data) < HEADER.size + MASK.size:
+                    continue
+                mask, = MASK.unpack_from(data, HEADER.size)
+                if mask >> len(_FIELD_FORMATS) or (
+                        len(data) != HEADER.size + MASK.size + _delta_struct(mask).size):
+                    continue
+                values = iter(_delta_struct(mask).unpack_from(data, HEADER.size + MASK.size))
+                raw = tuple(
+                    next(values) if mask >> i & 1 else base
+                    for i, base in enumerate(remote.keyframes[sequence]))
+
+            else:
+                continue
+
+            remote.last_received = self._clock()
+            if remote.raw is None or _is_newer(packet_number, remote.packet_number):
+                remote.packet_number, remote.raw = packet_number, raw
+            applied += 1
+
+    def get_state(self, controller_id: int, state: XInput.XINPUT_STATE) -> int:
+        self.receive()
+        remote = self._remotes.get(controller_id)
+        if remote is None or remote.raw is None:
+            return XInput.Codes.NOT_CONNECTED
+        if self._clock() - remote.last_received > self.timeout:
+            return XInput.Codes.NOT_CONNECTED
+
+        state.packet_number = remote.packet_number
+        gamepad = state.gamepad
+        (gamepad.buttons, gamepad.left_trigger, gamepad.right_trigger,
+         gamepad.l_thumb_x, gamepad.l_thumb_y, gamepad.r_thumb_x, gamepad.r_thumb_y) = remote.raw
+        return XInput.Codes.SUCCESS
+
+    def get_battery_information(
+            self,
+            controller_id: int,
+            device_type: XInput.DeviceTypes,
+            battery_info: XInput.XINPUT_BATTERY_INFORMATION
+            ) -> int:
+        if controller_id not in self._remotes:
+            return XInput.Codes.NOT_CONNECTED
+        # Battery information isn't streamed
+        battery_info.battery_type = 255  # BatteryType.UNKNOWN
+        battery_info.battery_level = 3  # BatteryLevel.FULL
+        return XInput.Codes.SUCCESS
@@ -11,6 +11,7 @@ setup(name="pyxboxcontroller",
     author_email = "danielforbes.123412@gmail.com",
     url = "https://github.com/SimpleHydrogen/pyxboxcontroller",
     packages = find_packages(),
+    extras_require = {"numpy": ["numpy"]},
     keywords = ["xbox controller",
                 "XInput",
                 "xbox",
@@ -0,0 +1,25 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+from collections import Counter
+
+from pyxboxcontroller import SimulatedBackend
+
+
+class CountingBackend(SimulatedBackend):
+    """SimulatedBackend which counts get_state and get_battery_information calls per slot"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.state_calls: Counter = Counter()
+        self.battery_calls: Counter = Counter()
+
+    def get_state(self, controller_id, state):
+        self.state_calls[controller_id] += 1
+        return super().get_state(controller_id, state)
+
+    def get_battery_information(self, controller_id, device_type, battery_info):
+        self.battery_calls[controller_id] += 1
+        return super().get_battery_information(controller_id, device_type, battery_info)
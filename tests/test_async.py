@@ -0,0 +1,57 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_changes() -> None:
+    """changes() yields once per new packet number"""
+    import asyncio
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    async def press_buttons() -> None:
+        for buttons in (4096, 8192, 16):
+            await asyncio.sleep(0.01)
+            backend.set_state(0, buttons=buttons)
+
+    async def collect() -> list[int]:
+        packet_numbers = []
+        async for state in controller.changes(max_interval=0.002):
+            packet_numbers.append(state.packet_number)
+            if state.start:
+                return packet_numbers
+
+    async def main() -> list[int]:
+        _, packet_numbers = await asyncio.gather(press_buttons(), collect())
+        return packet_numbers
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+
+
+def test_wait_until() -> None:
+    """wait_until() returns the first state matching the condition"""
+    import asyncio
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    async def main():
+        waiter = asyncio.create_task(controller.wait_until(lambda state: state.start))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        backend.set_state(0, buttons=16)
+        return await asyncio.wait_for(waiter, 1.)
+
+    state = asyncio.run(main())
+    assert state.start and state.packet_number == 1
+
+
+if __name__ == "__main__":
+    test_changes()
+    test_wait_until()
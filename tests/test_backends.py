@@ -0,0 +1,159 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import subprocess
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def _best_import_ms(module: str, runs: int = 5) -> float:
+    """Best time in ms of importing module in fresh interpreters, once the stdlib
+    dependencies of pyxboxcontroller are loaded"""
+    code = (
+        "import ctypes, enum, functools, os, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print((time.perf_counter() - start) * 1000)\n")
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # First run writes the bytecode cache, take the best of the following runs
+    timings = [
+        float(subprocess.check_output([sys.executable, "-c", code], cwd=root, env=env))
+        for _ in range(runs + 1)]
+    return min(timings[1:])
+
+
+def test_import_is_cheap() -> None:
+    """Importing the package doesn't load examples, tkinter or the keystroke enums
+    and is cheaper than importing json"""
+    code = (
+        "import sys, pyxboxcontroller\n"
+        "from pyxboxcontroller import XInput\n"
+        "assert 'pyxboxcontroller.examples' not in sys.modules\n"
+        "assert 'tkinter' not in sys.modules\n"
+        "assert XInput._keystroke_enums.cache_info().currsize == 0\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.check_call([sys.executable, "-c", code], cwd=root)
+
+    # Relative to a stdlib module of similar size, absolute timings are left to benchmarks/
+    package_ms, json_ms = _best_import_ms("pyxboxcontroller"), _best_import_ms("json")
+    print(package_ms, json_ms)
+    assert package_ms < json_ms
+
+
+def test_examples_loaded_on_demand() -> None:
+    """Examples are still reachable as an attribute of the package"""
+    import pyxboxcontroller
+
+    assert callable(pyxboxcontroller.examples.example_print_state)
+
+
+def test_registry() -> None:
+    """Backends are looked up by name and shared"""
+    from pyxboxcontroller import backends
+    from pyxboxcontroller.backends import (
+        Backend, SimulatedBackend, available_backends, get_backend, register_backend)
+
+    assert isinstance(get_backend("simulated"), SimulatedBackend)
+    assert get_backend("simulated") is get_backend("simulated")
+    assert {"xinput", "simulated"} <= set(available_backends())
+
+    class CustomBackend(Backend):
+        pass
+
+    register_backend("custom", CustomBackend)
+    try:
+        assert isinstance(get_backend("custom"), CustomBackend)
+    finally:
+        # Keep the global registry as the other tests expect it
+        backends._BACKEND_FACTORIES.pop("custom")
+        backends._BACKENDS.pop("custom", None)
+    assert "custom" not in available_backends()
+
+    try:
+        get_backend("does_not_exist")
+    except LookupError:
+        pass
+    else:
+        raise AssertionError("Expected LookupError for an unknown backend")
+
+
+def test_simulated_backend() -> None:
+    """XboxController reads states and battery info from the simulated backend"""
+    from pyxboxcontroller import XboxController, XboxControllerState
+    from pyxboxcontroller.backends import SimulatedBackend
+    from pyxboxcontroller.controller import BatteryLevel, BatteryType
+
+    backend = SimulatedBackend()
+    controller = XboxController(0, backend=backend)
+
+    backend.connect(0, battery_type=BatteryType.ALKALINE, battery_level=BatteryLevel.LOW)
+    backend.set_state(
+        0,
+        buttons=XboxControllerState._BUTTON_MAP["a"] | XboxControllerState._BUTTON_MAP["lb"],
+        l_thumb_x=32767,
+        right_trigger=255)
+
+    state = controller.state
+    assert state.packet_number == 1
+    assert state.a and state.lb and not state.b
+    assert state.l_thumb_x == 1.
+    assert state.r_trigger == 1.
+
+    # Unchanged packet number returns the same state
+    assert controller.state is state
+
+    assert controller.battery_info.battery_type == BatteryType.ALKALINE
+    assert controller.battery_level == BatteryLevel.LOW
+
+    backend.disconnect(0)
+    try:
+        controller.state
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("Expected ConnectionError for a disconnected controller")
+
+
+def test_backend_resolved_lazily() -> None:
+    """Naming a backend doesn't resolve it until the controller is used"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller.backends import SimulatedBackend
+
+    controller = XboxController(3, backend="simulated")
+    assert controller._backend == "simulated"
+
+    assert isinstance(controller.backend, SimulatedBackend)
+    assert controller.backend is controller._backend
+
+
+def test_optional_functions_unsupported() -> None:
+    """Backends without rumble, keystrokes or capabilities report them as unsupported"""
+    from pyxboxcontroller import Backend, XboxController, XInput
+
+    class StateOnlyBackend(Backend):
+        name = "state_only"
+
+        def get_state(self, controller_id, state):
+            return XInput.Codes.SUCCESS
+
+    controller = XboxController(0, backend=StateOnlyBackend())
+    # Ignored, like XInput with a controller without motors
+    controller.set_rumble(1., 0.)
+    for read in (controller.keystrokes, lambda: controller.capabilities):
+        try:
+            read()
+        except NotImplementedError as exc:
+            assert "state_only" in str(exc)
+        else:
+            raise AssertionError("Expected a NotImplementedError")
+
+
+if __name__ == "__main__":
+    test_import_is_cheap()
+    test_examples_loaded_on_demand()
+    test_registry()
+    test_simulated_backend()
+    test_backend_resolved_lazily()
+    test_optional_functions_unsupported()
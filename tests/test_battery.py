@@ -0,0 +1,125 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def _controller():
+    from pyxboxcontroller import XboxController
+    from counting_backend import CountingBackend
+
+    backend = CountingBackend()
+    backend.connect(0, battery_type=2, battery_level=3)
+    return XboxController(0, backend=backend), backend
+
+
+def test_battery_ttl() -> None:
+    """Battery info is only read from the backend once the TTL expires"""
+    from pyxboxcontroller.controller import BatteryLevel
+
+    controller, backend = _controller()
+
+    controller.battery_info
+    controller.battery_info
+    assert backend.battery_calls[0] == 2
+
+    controller.battery_ttl = 60.
+    controller.refresh_battery_info()
+    for _ in range(10):
+        assert controller.battery_level == BatteryLevel.FULL
+    assert backend.battery_calls[0] == 3
+
+    controller.battery_ttl = 0.
+    backend.set_battery(0, 2, 1)
+    controller._battery_expires = 0.
+    assert controller.battery_level == BatteryLevel.LOW
+
+
+def test_battery_change_notifications() -> None:
+    """Callbacks are called when the battery level or type changes"""
+    from pyxboxcontroller.controller import BatteryLevel, BatteryType
+
+    controller, backend = _controller()
+    changes = []
+    controller.on_battery_change(lambda previous, current: changes.append((previous, current)))
+
+    controller.battery_info
+    controller.battery_info
+    backend.set_battery(0, 2, 0)
+    controller.battery_info
+
+    assert len(changes) == 2
+    assert changes[0][0] is None
+    assert changes[1][0].level == BatteryLevel.FULL
+    assert changes[1][1].level == BatteryLevel.EMPTY
+    assert changes[1][1].battery_type == BatteryType.ALKALINE
+
+
+def test_background_refresh() -> None:
+    """A background thread keeps battery info up to date and reports disconnects"""
+    from pyxboxcontroller.controller import BatteryType
+
+    controller, backend = _controller()
+    changes = []
+    controller.on_battery_change(lambda previous, current: changes.append(current.battery_type))
+
+    controller.start_battery_refresh(interval=0.01)
+    try:
+        calls = backend.battery_calls[0]
+        for _ in range(10):
+            controller.battery_info
+        assert backend.battery_calls[0] - calls < 10
+
+        backend.disconnect(0)
+        for _ in range(100):
+            if controller.battery_info.battery_type == BatteryType.DISCONNECTED:
+                break
+            time.sleep(0.01)
+    finally:
+        controller.stop_battery_refresh()
+
+    assert changes == [BatteryType.ALKALINE, BatteryType.DISCONNECTED]
+
+
+def test_background_refresh_error() -> None:
+    """An unexpected backend error stops the refresh, and is raised by later reads"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    class FailingBackend(SimulatedBackend):
+        failing = False
+
+        def get_battery_information(self, controller_id, device_type, battery_info):
+            if self.failing:
+                raise OSError("Battery read failed")
+            return super().get_battery_information(controller_id, device_type, battery_info)
+
+    backend = FailingBackend()
+    backend.connect(0, battery_type=2, battery_level=3)
+    controller = XboxController(0, backend=backend)
+
+    controller.start_battery_refresh(interval=0.01)
+    try:
+        backend.failing = True
+        for _ in range(100):
+            if controller._battery_refresh_stop is None:
+                break
+            time.sleep(0.01)
+        assert controller._battery_refresh_stop is None
+
+        controller._battery_expires = 0.
+        try:
+            controller.battery_info
+        except OSError:
+            pass
+        else:
+            raise AssertionError("Expected the OSError of the backend")
+    finally:
+        controller.stop_battery_refresh()
+
+
+if __name__ == "__main__":
+    test_battery_ttl()
+    test_battery_change_notifications()
+    test_background_refresh()
+    test_background_refresh_error()
@@ -0,0 +1,33 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+
+def test_benchmarks_run() -> None:
+    """Every benchmark runs headless and has a stored baseline"""
+    import json
+    import run_benchmarks
+
+    results = run_benchmarks.run(iterations=50, repeats=1)
+    with open(run_benchmarks.BASELINE_PATH) as file:
+        baseline = json.load(file)
+
+    assert set(results) == set(baseline)
+    for result in results.values():
+        assert result["ns_per_op"] > 0
+
+
+def test_compare() -> None:
+    """Only benchmarks slower than baseline * threshold are regressions"""
+    import run_benchmarks
+
+    baseline = {"fast": {"ns_per_op": 100.}, "slow": {"ns_per_op": 100.}}
+    results = {"fast": {"ns_per_op": 140.}, "slow": {"ns_per_op": 160.}, "new": {"ns_per_op": 1.}}
+    assert run_benchmarks.compare(results, baseline, 1.5) == ["slow"]
+
+
+if __name__ == "__main__":
+    test_benchmarks_run()
+    test_compare()
@@ -0,0 +1,109 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__name__))
+
+
+def _state(buttons=0, lt=0, rt=0, lx=0, ly=0, rx=0, ry=0):
+    from pyxboxcontroller.controller import XboxControllerState
+    return XboxControllerState.from_raw(1, buttons, lt, rt, lx, ly, rx, ry)
+
+
+def test_chords() -> None:
+    """Actions are active when all of a chord's buttons are held"""
+    from pyxboxcontroller.bindings import Bindings
+
+    bindings = Bindings()
+    bindings.bind("jump", "a")
+    bindings.bind("jump", "b")
+    bindings.bind("super", "lb", "rb", "a")
+
+    assert bindings.active(_state()) == frozenset()
+    assert bindings.active(_state(4096)) == {"jump"}
+    assert bindings.active(_state(8192 | 256)) == {"jump"}
+    assert bindings.active(_state(4096 | 256)) == {"jump"}
+    assert bindings.active(_state(4096 | 256 | 512)) == {"jump", "super"}
+    assert bindings.is_active(_state(4096 | 256 | 512), "super")
+    assert not bindings.is_active(_state(4096), "super")
+    assert not bindings.is_active(_state(4096), "unbound")
+
+    try:
+        bindings.bind("oops", "z")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError for an unknown button")
+
+
+def test_axis_thresholds() -> None:
+    """Axis actions are active at or beyond their thresholds"""
+    from pyxboxcontroller.bindings import Bindings
+
+    bindings = Bindings()
+    bindings.bind_axis("accelerate", "r_trigger", 0.5)
+    bindings.bind_axis("boost", "r_trigger", 1.)
+    bindings.bind_axis("left", "l_thumb_x", -0.5)
+    bindings.bind_axis("right", "l_thumb_x", 0.5)
+
+    assert bindings.active(_state()) == frozenset()
+    assert bindings.active(_state(rt=127)) == frozenset()
+    assert bindings.active(_state(rt=128)) == {"accelerate"}
+    assert bindings.active(_state(rt=255)) == {"accelerate", "boost"}
+    assert bindings.active(_state(lx=-16383)) == frozenset()
+    assert bindings.active(_state(lx=-16384)) == {"left"}
+    assert bindings.active(_state(lx=-32768, rt=200)) == {"left", "accelerate"}
+    assert bindings.active(_state(lx=32767)) == {"right"}
+
+    try:
+        bindings.bind_axis("brake", "l_trigger", -0.5)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError for a negative trigger threshold")
+
+
+def test_rebinding() -> None:
+    """Rebinding at runtime takes effect on the next frame"""
+    from pyxboxcontroller.bindings import Bindings
+
+    bindings = Bindings()
+    bindings.bind("jump", "a")
+    bindings.bind("fire", "rb")
+    assert bindings.active(_state(4096)) == {"jump"}
+
+    bindings.rebind("jump", "y")
+    assert bindings.active(_state(4096)) == frozenset()
+    assert bindings.active(_state(32768 | 512)) == {"jump", "fire"}
+
+    bindings.unbind("fire")
+    assert bindings.active(_state(32768 | 512)) == {"jump"}
+    assert bindings.actions == ["jump"]
+
+
+def test_profiles() -> None:
+    """Bindings round trip through a profile file"""
+    from pyxboxcontroller.bindings import Bindings
+
+    bindings = Bindings()
+    bindings.bind("super", "lb", "rb", "a")
+    bindings.bind("jump", "a")
+    bindings.bind_axis("jump", "l_thumb_y", 0.9)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "profile.json")
+        bindings.save(path)
+        loaded = Bindings.load(path)
+
+    assert loaded.to_dict() == {
+        "super": [["lb", "rb", "a"]],
+        "jump": [["a"], {"axis": "l_thumb_y", "threshold": 0.9}],
+    }
+    assert loaded.active(_state(ly=32767)) == {"jump"}
+    assert loaded.active(_state(4096 | 256 | 512)) == {"jump", "super"}
+
+
+if __name__ == "__main__":
+    test_chords()
+    test_axis_thresholds()
+    test_rebinding()
+    test_profiles()
@@ -0,0 +1,123 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import random
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__name__))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+def _random_states(count: int):
+    from pyxboxcontroller.controller import XboxControllerState
+
+    rng = random.Random(0)
+    return [
+        XboxControllerState.from_raw(
+            i,
+            rng.randrange(1 << 16),
+            rng.randrange(256),
+            rng.randrange(256),
+            *(rng.randrange(-32768, 32768) for _ in range(4)))
+        for i in range(count)]
+
+
+def test_states_to_columns() -> None:
+    """Columns match the values of each XboxControllerState exactly"""
+    from pyxboxcontroller.columnar import states_to_columns, to_structured
+
+    states = _random_states(500)
+    columns = states_to_columns(states)
+
+    for i, state in enumerate(states):
+        assert columns["packet_number"][i] == state.packet_number
+        assert columns["l_thumb_x"][i] == state.l_thumb_x
+        assert columns["r_thumb_y"][i] == state.r_thumb_y
+        assert columns["l_trigger"][i] == state.l_trigger
+        assert columns["r_trigger"][i] == state.r_trigger
+        for button, pressed in state.buttons.items():
+            assert columns[button][i] == pressed
+
+    table = to_structured(columns)
+    assert len(table) == 500
+    assert table["a"].dtype == np.bool_
+
+
+def test_decode_packets_and_session() -> None:
+    """Packed XINPUT_STATE buffers and session recordings decode to the same columns"""
+    from pyxboxcontroller.columnar import decode_packets, decode_session, states_to_raw
+    from pyxboxcontroller.recording import SessionRecorder
+
+    states = _random_states(50)
+    columns = decode_packets(states_to_raw(states).tobytes())
+    assert list(columns["l_thumb_y"]) == [state.l_thumb_y for state in states]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.xrec")
+        with SessionRecorder(path) as recorder:
+            for i, state in enumerate(states):
+                recorder.record_state(state, timestamp_ns=i * 1000)
+
+        session = decode_session(path)
+        assert list(session["timestamp_ns"]) == [i * 1000 for i in range(50)]
+        assert list(session["x"]) == [state.x for state in states]
+        assert list(session["r_trigger"]) == [state.r_trigger for state in states]
+        del session
+
+        # An interrupted capture ends with a partial record, which is ignored
+        with open(path, "ab") as file:
+            file.write(b"\0" * 5)
+        assert len(decode_session(path)["timestamp_ns"]) == 50
+
+        # Only the header was written
+        with SessionRecorder(path):
+            pass
+        assert len(decode_session(path)["a"]) == 0
+
+
+def test_decode_session_validates_header() -> None:
+    """Files with the wrong magic, version or record size are rejected"""
+    from pyxboxcontroller.columnar import decode_session
+    from pyxboxcontroller.recording import HEADER, MAGIC, RECORD_SIZE, VERSION
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.xrec")
+        for header in (
+                b"short",
+                HEADER.pack(b"NOTAREC\0", VERSION, RECORD_SIZE, 0),
+                HEADER.pack(MAGIC, VERSION + 1, RECORD_SIZE, 0),
+                HEADER.pack(MAGIC, VERSION, RECORD_SIZE + 1, 0)):
+            with open(path, "wb") as file:
+                file.write(header)
+            try:
+                decode_session(path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"Expected a ValueError for header {header!r}")
+
+
+def test_missing_numpy() -> None:
+    """Every decoder raises ImportError rather than failing on the missing module"""
+    from pyxboxcontroller import columnar
+
+    columnar.np = None
+    try:
+        for decode in (columnar.decode_packets, columnar.decode_session):
+            try:
+                decode(b"")
+            except ImportError:
+                pass
+            else:
+                raise AssertionError(f"Expected an ImportError from {decode.__name__}")
+    finally:
+        columnar.np = np
+
+
+if __name__ == "__main__":
+    test_states_to_columns()
+    test_decode_packets_and_session()
+    test_decode_session_validates_header()
+    test_missing_numpy()
@@ -0,0 +1,96 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+DOWN, RIGHT, LEFT, X, A = 2, 8, 4, 16384, 4096
+
+
+def _feed(combos, inputs):
+    """Process (buttons, time) inputs, returns the matches of each"""
+    from pyxboxcontroller.controller import XboxControllerState
+    return [
+        combos.process(XboxControllerState.from_raw(i, buttons, 0, 0, 0, 0, 0, 0), now)
+        for i, (buttons, now) in enumerate(inputs)]
+
+
+def test_sequence_within_window() -> None:
+    """A sequence matches when its steps are input in order within the window"""
+    from pyxboxcontroller.combos import ComboRecogniser
+
+    combos = ComboRecogniser()
+    combos.add("hadouken", ["dpad_down", "dpad_down+dpad_right", "dpad_right+x"], window=0.3)
+    log = []
+    combos.on_match(lambda name, state: log.append((name, state.packet_number)))
+
+    # Releasing down in between is ignored
+    results = _feed(combos, [
+        (DOWN, 0.), (DOWN | RIGHT, 0.05), (RIGHT, 0.1), (RIGHT | X, 0.15), (0, 0.2)])
+    assert results == [(), (), (), ("hadouken",), ()]
+    assert log == [("hadouken", 3)]
+
+    # Too slow
+    results = _feed(combos, [(DOWN, 1.), (DOWN | RIGHT, 1.2), (RIGHT | X, 1.4), (0, 1.5)])
+    assert results == [(), (), (), ()]
+
+    # Pressing another button of a sequence breaks it, other buttons are ignored
+    results = _feed(combos, [(DOWN, 2.), (DOWN | X, 2.05), (DOWN | RIGHT, 2.1), (RIGHT | X, 2.15)])
+    assert results == [(), (), (), ()]
+
+
+def test_overlapping_sequences() -> None:
+    """Sequences sharing steps and sequences starting mid way through another both match"""
+    from pyxboxcontroller.combos import ComboRecogniser
+
+    combos = ComboRecogniser()
+    combos.add("dash", ["dpad_right", "dpad_right"], window=0.25)
+    combos.add("triple", ["dpad_right", "dpad_right", "dpad_right"], window=1.)
+    combos.add("back_forward", ["dpad_left", "dpad_right"], window=0.5)
+
+    results = _feed(combos, [
+        (LEFT, 0.), (0, 0.05), (RIGHT, 0.1), (0, 0.15), (RIGHT, 0.2), (0, 0.25), (RIGHT, 0.3)])
+    assert results == [(), (), ("back_forward",), (), ("dash",), (), ("dash", "triple")]
+
+    combos.remove("dash")
+    results = _feed(combos, [(0, 1.), (RIGHT, 1.1), (0, 1.15), (RIGHT, 1.2)])
+    assert results == [(), (), (), ()]
+
+
+def test_many_sequences() -> None:
+    """Hundreds of sequences are matched by a single automaton"""
+    import itertools
+    from pyxboxcontroller.combos import ComboRecogniser
+
+    combos = ComboRecogniser()
+    directions = ["dpad_up", "dpad_down", "dpad_left", "dpad_right"]
+    for steps in itertools.product(directions, repeat=4):
+        combos.add("-".join(steps), list(steps) + ["a"], window=10.)
+    assert len(combos._names) == 256
+
+    results = _feed(combos, [(2, 0.), (0, 0.), (1, 0.), (0, 0.), (8, 0.), (0, 0.), (8, 0.), (0, 0.), (A, 0.)])
+    assert results[-1] == ("dpad_down-dpad_up-dpad_right-dpad_right",)
+    # Only the states reached were built
+    assert len(combos._states) < 10
+
+
+def test_update() -> None:
+    """update() reads the controller"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.combos import ComboRecogniser
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    combos = ComboRecogniser(XboxController(0, backend=backend))
+    combos.add("ab", ["a", "b"])
+
+    backend.set_state(0, buttons=A)
+    assert combos.update() == ()
+    backend.set_state(0, buttons=A | 8192)
+    assert combos.update() == ("ab",)
+
+
+if __name__ == "__main__":
+    test_sequence_within_window()
+    test_overlapping_sequences()
+    test_many_sequences()
+    test_update()
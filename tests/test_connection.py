@@ -0,0 +1,92 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def _controller():
+    from pyxboxcontroller import XboxController
+    from counting_backend import CountingBackend
+
+    backend = CountingBackend()
+    return XboxController(0, backend=backend), backend
+
+
+def test_try_poll_statuses() -> None:
+    """try_poll reports new, unchanged and disconnected states without raising"""
+    from pyxboxcontroller.controller import PollStatus
+
+    controller, backend = _controller()
+    controller.reconnect_min_backoff = controller.reconnect_max_backoff = 0.
+
+    assert controller.try_poll() == (PollStatus.DISCONNECTED, None)
+
+    backend.connect(0)
+    backend.set_state(0, buttons=4096)
+    status, state = controller.try_poll()
+    assert status == PollStatus.NEW and state.a
+    assert controller.try_poll() == (PollStatus.UNCHANGED, state)
+    # The raising state property shares the latest state
+    assert controller.state is state
+
+    backend.disconnect(0)
+    assert controller.try_poll() == (PollStatus.DISCONNECTED, None)
+
+
+def test_connection_state_machine() -> None:
+    """Transitions between connected, lost and reconnecting call the callbacks"""
+    from pyxboxcontroller.controller import ConnectionState
+
+    controller, backend = _controller()
+    controller.reconnect_min_backoff = controller.reconnect_max_backoff = 0.
+    transitions = []
+    controller.on_connection_change(lambda previous, current: transitions.append((previous, current)))
+
+    assert controller.connection_state == ConnectionState.RECONNECTING
+    controller.try_poll()
+    assert transitions == []
+
+    backend.connect(0)
+    controller.try_poll()
+    controller.try_poll()
+    backend.disconnect(0)
+    controller.try_poll()
+    controller.try_poll()
+    controller.try_poll()
+    backend.connect(0)
+    controller.try_poll()
+
+    assert transitions == [
+        (ConnectionState.RECONNECTING, ConnectionState.CONNECTED),
+        (ConnectionState.CONNECTED, ConnectionState.LOST),
+        (ConnectionState.LOST, ConnectionState.RECONNECTING),
+        (ConnectionState.RECONNECTING, ConnectionState.CONNECTED),
+    ]
+
+
+def test_reconnect_backoff() -> None:
+    """While disconnected the backend is only polled once the backoff elapses"""
+    from pyxboxcontroller.controller import PollStatus
+
+    controller, backend = _controller()
+    controller.reconnect_min_backoff = 60.
+    controller.reconnect_max_backoff = 120.
+
+    for _ in range(100):
+        assert controller.try_poll()[0] == PollStatus.DISCONNECTED
+    assert backend.state_calls[0] == 1
+    assert controller._next_reconnect - time.monotonic() > 59.
+
+    # Backoff elapsed, the next attempt connects and resets the backoff
+    backend.connect(0)
+    controller._next_reconnect = float("-inf")
+    assert controller.try_poll()[0] == PollStatus.NEW
+    assert controller._reconnect_attempts == 0
+    assert backend.state_calls[0] == 2
+
+
+if __name__ == "__main__":
+    test_try_poll_statuses()
+    test_connection_state_machine()
+    test_reconnect_backoff()
@@ -17,6 +17,38 @@ def test_default_state() -> None:
     assert isinstance(XboxControllerState.buttons, dict)
 
 
+def test_state_decoding() -> None:
+    """Test XboxControllerState decodes raw values lazily and without a __dict__"""
+    from pyxboxcontroller import XInput
+    from pyxboxcontroller.controller import XboxControllerState
+
+    raw = XInput.XINPUT_STATE()
+    raw.packet_number = 7
+    raw.gamepad.buttons = 4096 | 256 | 16
+    raw.gamepad.l_thumb_x = -32768
+    raw.gamepad.r_thumb_y = 16384
+    raw.gamepad.left_trigger = 255
+
+    state = XboxControllerState(raw)
+    assert not hasattr(state, "__dict__")
+
+    # Nothing decoded until accessed
+    assert state.a and state.lb and state.start and not state.b
+    assert state._buttons_dict is None and state._axes is None
+
+    assert state.buttons == {
+        btn: btn in ("a", "lb", "start") for btn in XboxControllerState._BUTTON_MAP}
+    assert state.buttons is state.buttons
+
+    assert state.l_thumb_x == -1.
+    assert state.r_thumb == (0., 0.5)
+    assert state.triggers == (1., 0.)
+
+    assert state.button_mask == 4096 | 256 | 16
+    assert state.raw == (4096 | 256 | 16, 255, 0, -32768, 0, 0, 16384)
+    assert XboxControllerState.from_raw(7, *state.raw).buttons == state.buttons
+
+
 def test_XboxController() -> None:
     """Test XboxControllerState produced by XboxController.state"""
     from pyxboxcontroller import XboxController, XboxControllerState
@@ -69,5 +101,6 @@ def test_XboxBatteryInfo():
 
 if __name__ == "__main__":
     test_default_state()
+    test_state_decoding()
     test_XboxController()
     test_XboxBatteryInfo()
@@ -0,0 +1,79 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_radial_deadzone() -> None:
+    """Sticks inside the deadzone read as centred, the remaining range is rescaled"""
+    from pyxboxcontroller.controller import XboxControllerState
+    from pyxboxcontroller.deadzones import Deadzones, StickConfig
+
+    deadzones = Deadzones(left_stick=StickConfig(deadzone=0.25))
+
+    def left_stick(x: int, y: int) -> tuple[float, float]:
+        return deadzones.apply(XboxControllerState.from_raw(0, 0, 0, 0, x, y, 0, 0))[:2]
+
+    assert left_stick(0, 0) == (0., 0.)
+    # 0.17 on each axis is inside a radial deadzone of 0.25
+    assert left_stick(5600, 5600) == (0., 0.)
+    assert left_stick(32767, 0) == (1., 0.)
+    assert left_stick(0, -32768) == (0., -1.)
+
+    # Halfway through the active range
+    x, y = left_stick(0, int(32767 * 0.625))
+    assert x == 0. and abs(y - 0.5) < 1e-3
+
+    # Diagonals keep their direction
+    x, y = left_stick(20000, 20000)
+    assert x == y and 0. < x < 1.
+
+
+def test_axial_curve_and_triggers() -> None:
+    """Axial deadzones, response curves and anti-deadzones are applied per axis"""
+    from pyxboxcontroller.controller import XboxControllerState
+    from pyxboxcontroller.deadzones import (
+        Deadzones, StickConfig, TriggerConfig, exponential_curve, piecewise_curve)
+
+    deadzones = Deadzones(
+        right_stick=StickConfig(deadzone=0., curve=exponential_curve(2.), radial=False),
+        left_trigger=TriggerConfig(deadzone=0.2, anti_deadzone=0.1),
+        right_trigger=TriggerConfig(
+            deadzone=0.,
+            curve=piecewise_curve([(0., 0.), (0.5, 0.9), (1., 1.)])))
+
+    state = XboxControllerState.from_raw(0, 0, 51, 128, 0, 0, -16384, 32767)
+    _, _, r_x, r_y, l_trigger, r_trigger = deadzones.apply(state)
+    assert abs(r_x + 0.25) < 1e-3
+    assert r_y == 1.
+    assert l_trigger == 0.
+    assert abs(r_trigger - 0.9) < 0.01
+
+    assert deadzones.apply_raw(52, 255, 0, 0, 0, 0)[4] > 0.1
+
+
+def test_controller_deadzones() -> None:
+    """XboxController applies deadzones to new states"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.deadzones import Deadzones
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    backend.set_state(0, l_thumb_x=2000, l_thumb_y=-1500, right_trigger=20)
+    controller = XboxController(0, backend=backend)
+
+    assert controller.state.l_thumb_x != 0.
+    backend.set_state(0)
+
+    controller.deadzones = Deadzones()
+    state = controller.state
+    assert state.l_thumb == (0., 0.)
+    assert state.r_trigger == 0.
+    # Raw values are untouched
+    assert state.raw[3] == 2000
+
+
+if __name__ == "__main__":
+    test_radial_deadzone()
+    test_axial_curve_and_triggers()
+    test_controller_deadzones()
@@ -0,0 +1,241 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__name__))
+
+
+def _events(*events: tuple[int, int, int]) -> bytes:
+    """Pack (type, code, value) tuples into raw input_event records"""
+    from pyxboxcontroller.evdev import INPUT_EVENT
+    return b"".join(INPUT_EVENT.pack(0, 0, *event) for event in events)
+
+
+def test_evdev_pipe() -> None:
+    """Events written to a pipe are folded into XboxControllerState fields"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.evdev import EV_ABS, EV_KEY, EV_SYN, SYN_REPORT
+
+    read_fd, write_fd = os.pipe()
+    backend = evdev.EvdevBackend({})
+    backend.open_device(0, read_fd, abs_ranges=evdev.DEFAULT_ABS_RANGES)
+    controller = XboxController(0, backend=backend)
+
+    # No events yet
+    assert controller.state.packet_number == 0
+
+    os.write(write_fd, _events(
+        (EV_KEY, 0x130, 1),  # BTN_A
+        (EV_KEY, 0x136, 1),  # BTN_TL
+        (EV_ABS, evdev.ABS_X, 32767),
+        (EV_ABS, evdev.ABS_Y, -32768),  # Fully up
+        (EV_ABS, evdev.ABS_RZ, 255),
+        (EV_ABS, evdev.ABS_HAT0X, -1),
+        (EV_SYN, SYN_REPORT, 0)))
+
+    state = controller.state
+    assert state.packet_number == 1
+    assert state.a and state.lb and state.dpad_left
+    assert not state.b and not state.dpad_right
+    assert state.l_thumb_x == 1.
+    assert state.l_thumb_y == 1.
+    assert state.r_trigger == 1.
+    assert state.l_trigger == 0.
+
+    # A record split across writes is completed by the next read
+    data = _events((EV_KEY, 0x130, 0), (EV_ABS, evdev.ABS_HAT0X, 0), (EV_SYN, SYN_REPORT, 0))
+    os.write(write_fd, data[:10])
+    assert controller.state.packet_number == 1
+    os.write(write_fd, data[10:])
+
+    state = controller.state
+    assert state.packet_number == 2
+    assert not state.a and not state.dpad_left and state.lb
+
+    # A report without changes doesn't create a new packet
+    os.write(write_fd, _events((EV_SYN, SYN_REPORT, 0)))
+    assert controller.state.packet_number == 2
+
+    os.close(write_fd)
+    backend.close_device(0)
+
+
+def test_evdev_dropped_events() -> None:
+    """Events between SYN_DROPPED and the next report are discarded, and the state resynced"""
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.evdev import EV_KEY, EV_SYN, SYN_DROPPED, SYN_REPORT
+
+    read_fd, write_fd = os.pipe()
+    device = evdev.EvdevDevice(read_fd, abs_ranges=evdev.DEFAULT_ABS_RANGES)
+
+    os.write(write_fd, _events(
+        (EV_KEY, 0x130, 1),
+        (EV_SYN, SYN_REPORT, 0),
+        (EV_SYN, SYN_DROPPED, 0),
+        (EV_KEY, 0x131, 1),
+        (EV_SYN, SYN_REPORT, 0)))
+    device.poll()
+
+    # A pipe can't be queried, so the release of A which may have been lost is assumed
+    assert device.state.packet_number == 2
+    assert device.state.gamepad.buttons == 0
+
+    os.write(write_fd, _events((EV_KEY, 0x133, 1), (EV_SYN, SYN_REPORT, 0)))
+    device.poll()
+    assert device.state.packet_number == 3
+    assert device.state.gamepad.buttons == 16384
+
+    os.close(write_fd)
+    device.close()
+
+
+def test_evdev_reports_applied_together() -> None:
+    """Axes and buttons only change once their report is complete"""
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.evdev import EV_ABS, EV_KEY, EV_SYN, SYN_REPORT
+
+    read_fd, write_fd = os.pipe()
+    device = evdev.EvdevDevice(read_fd, abs_ranges=evdev.DEFAULT_ABS_RANGES)
+
+    os.write(write_fd, _events((EV_ABS, evdev.ABS_X, 32767), (EV_KEY, 0x130, 1)))
+    device.poll()
+    assert device.state.gamepad.l_thumb_x == 0 and device.state.gamepad.buttons == 0
+
+    os.write(write_fd, _events((EV_SYN, SYN_REPORT, 0)))
+    device.poll()
+    assert device.state.gamepad.l_thumb_x == 32767 and device.state.gamepad.buttons == 4096
+
+    os.close(write_fd)
+    device.close()
+
+
+def test_evdev_keystrokes_rumble_and_capabilities() -> None:
+    """Keystrokes are queued from events, rumble and batteries degrade without the hardware"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.controller import BatteryType
+    from pyxboxcontroller.evdev import EV_ABS, EV_KEY, EV_SYN, SYN_REPORT
+
+    read_fd, write_fd = os.pipe()
+    backend = evdev.EvdevBackend({})
+    backend.open_device(0, read_fd, abs_ranges=evdev.DEFAULT_ABS_RANGES)
+    controller = XboxController(0, backend=backend)
+
+    os.write(write_fd, _events(
+        (EV_KEY, 0x130, 1), (EV_ABS, evdev.ABS_Z, 255), (EV_SYN, SYN_REPORT, 0),
+        (EV_KEY, 0x130, 0), (EV_SYN, SYN_REPORT, 0)))
+    keystrokes = controller.keystrokes()
+    assert [(k.button, k.down) for k in keystrokes] == [
+        ("a", True), ("l_trigger", True), ("a", False)]
+    assert controller.keystrokes() == []
+
+    # A pipe has no force feedback, rumble is ignored like a controller without motors
+    controller.set_rumble(1., 1.)
+    capabilities = controller.capabilities
+    assert not capabilities.supports_vibration
+    assert capabilities.button_mask & 4096
+
+    # Batteries aren't reported
+    assert controller.battery_info.battery_type == BatteryType.UNKNOWN
+
+    os.close(write_fd)
+    backend.close_device(0)
+
+
+def test_evdev_recording() -> None:
+    """A file of recorded events can be used as a device, with custom axis ranges"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.evdev import EV_ABS, EV_SYN, SYN_REPORT
+
+    with tempfile.NamedTemporaryFile(delete=False) as recording:
+        recording.write(_events(
+            (EV_ABS, evdev.ABS_Z, 1023),
+            (EV_ABS, evdev.ABS_RX, 0),
+            (EV_SYN, SYN_REPORT, 0)))
+
+    try:
+        ranges = dict(evdev.DEFAULT_ABS_RANGES)
+        ranges[evdev.ABS_Z] = (0, 1023)
+        ranges[evdev.ABS_RX] = (-100, 100)
+
+        backend = evdev.EvdevBackend({})
+        backend.open_device(0, recording.name, abs_ranges=ranges)
+        state = XboxController(0, backend=backend).state
+
+        assert state.packet_number == 1
+        assert state.l_trigger == 1.
+        assert state.r_thumb_x == 0.
+        backend.close_device(0)
+    finally:
+        os.remove(recording.name)
+
+
+def test_evdev_not_connected() -> None:
+    """Unknown controller ids report as not connected"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller.evdev import EvdevBackend
+
+    controller = XboxController(0, backend=EvdevBackend({}))
+    try:
+        controller.state
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("Expected ConnectionError without a device")
+
+
+def test_evdev_hotplug() -> None:
+    """Devices plugged in after a failed poll are discovered, keeping the ids of other devices"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller import evdev
+    from pyxboxcontroller.evdev import EV_KEY, EV_SYN, SYN_REPORT
+
+    now = [0.]
+    plugged = []
+
+    class HotplugBackend(evdev.EvdevBackend):
+        def _discover(self):
+            return list(plugged)
+
+    backend = HotplugBackend(min_backoff=0.1, max_backoff=0.4, clock=lambda: now[0])
+    controller = XboxController(0, backend=backend)
+
+    try:
+        controller.state
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("Expected ConnectionError before the device is plugged in")
+
+    first_read, first_write = os.pipe()
+    plugged.append(first_read)
+    # Not discovered again until the backoff has elapsed
+    assert backend.get_state(0, controller._state) != 0
+    now[0] = 0.2
+    os.write(first_write, _events((EV_KEY, 0x130, 1), (EV_SYN, SYN_REPORT, 0)))
+    assert controller.state.a
+
+    # A second device takes the next id, the first keeps its id
+    second_read, second_write = os.pipe()
+    plugged.insert(0, second_read)
+    now[0] = 1.
+    os.write(second_write, _events((EV_KEY, 0x131, 1), (EV_SYN, SYN_REPORT, 0)))
+    assert XboxController(1, backend=backend).state.b
+    assert controller.state.a
+
+    for fd in (first_write, second_write):
+        os.close(fd)
+    backend.close_device(0)
+    backend.close_device(1)
+
+
+if __name__ == "__main__":
+    test_evdev_pipe()
+    test_evdev_dropped_events()
+    test_evdev_reports_applied_together()
+    test_evdev_keystrokes_rumble_and_capabilities()
+    test_evdev_recording()
+    test_evdev_not_connected()
+    test_evdev_hotplug()
@@ -0,0 +1,66 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_button_events() -> None:
+    """Callbacks are dispatched once per press and release edge"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.events import ButtonEvents
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    events = ButtonEvents(XboxController(0, backend=backend))
+
+    log = []
+    events.on_press("a", lambda state: log.append(("a down", state.packet_number)))
+    events.on_release("a", lambda state: log.append(("a up", state.packet_number)))
+    events.on_press("lb", lambda state: log.append(("lb down", state.packet_number)))
+
+    events.update()
+    assert log == []
+
+    backend.set_state(0, buttons=4096 | 256)
+    events.update()
+    assert sorted(log) == [("a down", 1), ("lb down", 1)]
+    assert ButtonEvents.names(events.pressed) == ["lb", "a"]
+
+    # No change, no events
+    log.clear()
+    events.update()
+    assert log == [] and events.pressed == events.released == 0
+
+    backend.set_state(0, buttons=256 | 8192)
+    events.update()
+    assert log == [("a up", 2)]
+    assert ButtonEvents.names(events.pressed) == ["b"]
+    assert ButtonEvents.names(events.released) == ["a"]
+
+
+def test_remove_handler() -> None:
+    """Removed callbacks aren't called, unknown buttons are rejected"""
+    from pyxboxcontroller.controller import XboxControllerState
+    from pyxboxcontroller.events import ButtonEvents
+
+    events = ButtonEvents()
+    log = []
+    callback = log.append
+    events.on_press("x", callback)
+    events.remove_press("x", callback)
+
+    events.process(XboxControllerState.from_raw(1, 16384, 0, 0, 0, 0, 0, 0))
+    assert log == []
+    assert events.pressed == 16384
+
+    try:
+        events.on_press("guide", callback)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError for an unknown button")
+
+
+if __name__ == "__main__":
+    test_button_events()
+    test_remove_handler()
@@ -0,0 +1,103 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def _samples(count: int = 300):
+    """Noisy states with uneven timestamps"""
+    from pyxboxcontroller.controller import XboxControllerState
+
+    rng = random.Random(7)
+    samples = []
+    timestamp_ns = 0
+    for i in range(count):
+        timestamp_ns += rng.choice([0, 900_000, 1_000_000, 4_000_000])
+        samples.append((timestamp_ns, XboxControllerState.from_raw(
+            i, 0,
+            rng.randrange(256), rng.randrange(256),
+            rng.randrange(-32768, 32768), int(20000 + rng.gauss(0, 500)),
+            rng.randrange(-100, 100), -32768)))
+    return samples
+
+
+def _pipelines():
+    from pyxboxcontroller.filters import (
+        ExponentialMovingAverage, FilterPipeline, MovingAverage, OneEuroFilter, SlewLimiter)
+    return [
+        FilterPipeline([ExponentialMovingAverage(0.3)]),
+        FilterPipeline([MovingAverage(5)]),
+        FilterPipeline([OneEuroFilter(min_cutoff=1., beta=0.5)]),
+        FilterPipeline([SlewLimiter(4.)]),
+        FilterPipeline(
+            [MovingAverage(3), OneEuroFilter(2., 1.), SlewLimiter(20.), ExponentialMovingAverage(0.6)],
+            axes=("l_thumb_x", "r_trigger")),
+    ]
+
+
+def test_filters_smooth() -> None:
+    """Each filter follows a constant input and reduces jitter"""
+    from pyxboxcontroller.filters import (
+        ExponentialMovingAverage, FilterPipeline, MovingAverage, OneEuroFilter, SlewLimiter)
+
+    rng = random.Random(1)
+    for sample_filter in [
+            ExponentialMovingAverage(0.2), MovingAverage(8), OneEuroFilter(1., 0.), SlewLimiter(1.)]:
+        pipeline = FilterPipeline([sample_filter], axes=("l_thumb_x",))
+        outputs = [
+            pipeline.process([0.5 + rng.uniform(-0.05, 0.05)], i * 1_000_000)[0] for i in range(200)]
+        settled = outputs[100:]
+        assert all(abs(value - 0.5) < 0.05 for value in settled), type(sample_filter).__name__
+        assert max(settled) - min(settled) < 0.05, type(sample_filter).__name__
+
+    # Slew limited to 1 unit per second moves 0.01 in 10ms
+    pipeline = FilterPipeline([SlewLimiter(1.)], axes=("r_trigger",))
+    assert pipeline.process([0.], 0) == [0.]
+    assert abs(pipeline.process([1.], 10_000_000)[0] - 0.01) < 1e-12
+
+
+def test_batch_matches_streaming() -> None:
+    """Batch filtering of columns is identical to streaming states one at a time"""
+    import pytest
+    np = pytest.importorskip("numpy")
+    from pyxboxcontroller.columnar import states_to_columns
+    from pyxboxcontroller.filters import AXES
+
+    samples = _samples()
+    for pipeline in _pipelines():
+        pipeline.reset()
+        streamed = [pipeline.apply(state, timestamp_ns) for timestamp_ns, state in samples]
+
+        columns = states_to_columns(state for _, state in samples)
+        columns["timestamp_ns"] = np.array([timestamp_ns for timestamp_ns, _ in samples])
+        batched = pipeline.apply_columns(columns)
+
+        for i, axis in enumerate(AXES):
+            assert np.array_equal(batched[axis], np.array([axes[i] for axes in streamed])), axis
+
+
+def test_controller_filters() -> None:
+    """Filters assigned to a controller are applied to each new state"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.filters import ExponentialMovingAverage, FilterPipeline
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.filters = FilterPipeline([ExponentialMovingAverage(0.5)], axes=("l_thumb_y",))
+
+    backend.set_state(0, l_thumb_y=0, l_thumb_x=32767)
+    assert controller.state.l_thumb_y == 0.
+    backend.set_state(0, l_thumb_y=32767, l_thumb_x=32767)
+    state = controller.state
+    assert state.l_thumb_y == 0.5
+    assert state.l_thumb_x == 1.
+    # Unchanged packets aren't filtered again
+    assert controller.state is state
+
+
+if __name__ == "__main__":
+    test_filters_smooth()
+    test_batch_matches_streaming()
+    test_controller_filters()
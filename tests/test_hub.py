@@ -0,0 +1,66 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_hub_hotplug() -> None:
+    """Connect and disconnect events are reported, states of connected slots are returned"""
+    from pyxboxcontroller.hub import ControllerHub
+    from counting_backend import CountingBackend
+
+    backend = CountingBackend()
+    backend.connect(0)
+    backend.connect(2)
+    now = [0.]
+    hub = ControllerHub(backend=backend, clock=lambda: now[0])
+
+    log = []
+    hub.on_connect(lambda slot, state: log.append(("connect", slot)))
+    hub.on_disconnect(lambda slot: log.append(("disconnect", slot)))
+
+    assert sorted(hub.poll()) == [0, 2]
+    assert sorted(log) == [("connect", 0), ("connect", 2)]
+
+    backend.set_state(2, buttons=4096)
+    assert hub.poll()[2].a
+
+    log.clear()
+    backend.disconnect(0)
+    assert list(hub.poll()) == [2]
+    assert log == [("disconnect", 0)]
+
+    # Reconnects once the backoff has elapsed
+    log.clear()
+    backend.connect(0)
+    hub.poll()
+    assert log == []
+    now[0] = 0.1
+    hub.poll()
+    assert log == [("connect", 0)]
+    assert hub.connected == [2, 0]
+
+
+def test_hub_backoff() -> None:
+    """Empty slots are probed with exponential backoff, connected slots every poll"""
+    from pyxboxcontroller.hub import ControllerHub
+    from counting_backend import CountingBackend
+
+    backend = CountingBackend()
+    backend.connect(0)
+    now = [0.]
+    hub = ControllerHub(backend=backend, min_backoff=0.1, max_backoff=0.4, clock=lambda: now[0])
+
+    # 0 to 1 seconds in 10ms steps
+    for step in range(101):
+        now[0] = step / 100
+        hub.poll()
+
+    assert backend.state_calls[0] == 101
+    # Probes at 0, 0.1, 0.3, 0.7 then every 0.4 seconds
+    assert backend.state_calls[1] == backend.state_calls[3] == 4
+
+
+if __name__ == "__main__":
+    test_hub_hotplug()
+    test_hub_backoff()
@@ -0,0 +1,69 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_poll_statistics() -> None:
+    """Unchanged polls, packet gaps and errors are counted"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.instrumentation import PollInstrumentation
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    samples = []
+    controller.instrumentation = PollInstrumentation(
+        hook=lambda latency, interval, packet_number, missed: samples.append((packet_number, missed)))
+
+    controller.state
+    controller.state  # Unchanged
+    backend.set_state(0)
+    backend.set_state(0)
+    backend.set_state(0)
+    controller.state  # Missed 2 packets
+    backend.set_state(0)
+    controller.state
+
+    backend.disconnect(0)
+    try:
+        controller.state
+    except ConnectionError:
+        pass
+
+    stats = controller.instrumentation.snapshot()
+    assert stats.polls == 5
+    assert stats.errors == 1
+    assert stats.unchanged_polls == 1
+    assert stats.missed_packets == 2 and stats.gaps == 1
+    assert sum(stats.latency_histogram) == 5
+    assert sum(stats.interval_histogram) == 4
+    assert 0 < stats.latency_mean_ns <= stats.latency_max_ns
+    assert stats.latency_percentile(100) >= stats.latency_percentile(50) > 0
+    assert samples == [(0, 0), (0, 0), (3, 2), (4, 0)]
+    print(stats)
+
+    # Disabled again
+    controller.instrumentation = None
+    backend.connect(0)
+    controller.state
+
+
+def test_histogram_percentiles() -> None:
+    """Latencies fall in power of 2 buckets"""
+    from pyxboxcontroller.instrumentation import PollInstrumentation
+
+    instrumentation = PollInstrumentation()
+    for latency in (100, 100, 100, 5000):
+        instrumentation.record(0, latency, 0, 1)
+    stats = instrumentation.snapshot()
+    assert stats.latency_percentile(50) == 127
+    assert stats.latency_percentile(100) == 8191
+    instrumentation.reset()
+    assert instrumentation.snapshot().polls == 0
+
+
+if __name__ == "__main__":
+    test_poll_statistics()
+    test_histogram_percentiles()
@@ -0,0 +1,139 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_state_equality() -> None:
+    """States compare and hash by their raw payload, not their packet number"""
+    from pyxboxcontroller.controller import XboxControllerState
+
+    a = XboxControllerState.from_raw(1, 4096, 0, 255, 100, -100, 0, 0)
+    b = XboxControllerState.from_raw(2, 4096, 0, 255, 100, -100, 0, 0)
+    c = XboxControllerState.from_raw(3, 4096, 0, 255, 100, -101, 0, 0)
+
+    assert a == b and hash(a) == hash(b)
+    assert a != c
+    assert len({a, b, c}) == 2
+    assert a != "not a state"
+
+
+def test_intern_cache_lru() -> None:
+    """The least recently used state is evicted once the cache is full"""
+    from pyxboxcontroller.controller import XboxControllerState
+    from pyxboxcontroller.interning import StateInternCache
+
+    cache = StateInternCache(maxsize=2)
+    states = [XboxControllerState.from_raw(i, i, 0, 0, 0, 0, 0, 0) for i in range(3)]
+    cache.put(b"0", states[0])
+    cache.put(b"1", states[1])
+    assert cache.get(b"0") is states[0]
+    cache.put(b"2", states[2])
+
+    assert cache.get(b"1") is None
+    assert cache.get(b"0") is states[0] and cache.get(b"2") is states[2]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_controller_interning() -> None:
+    """Packets with a repeated payload reuse the interned decoded values"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.interning import StateInternCache
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.intern_cache = StateInternCache()
+
+    backend.set_state(0, buttons=4096, l_thumb_x=500)
+    first = controller.state
+    backend.set_state(0, buttons=0)
+    released = controller.state
+    backend.set_state(0, buttons=4096)
+    again = controller.state
+
+    # A new state for every packet, sharing the decoded values
+    assert again is not first and again == first and released != first
+    assert again._axes is first._axes and again.a
+    assert again.packet_number == controller.packet_number == 3
+    assert first.packet_number == 1
+    assert len(controller.intern_cache) == 2
+    assert controller.intern_cache.hits == 1
+
+    # Reassigning the deadzones forgets axes decoded with the old ones
+    from pyxboxcontroller.deadzones import Deadzones
+    controller.deadzones = Deadzones()
+    assert len(controller.intern_cache) == 0
+
+    # Filtered states aren't interned
+    from pyxboxcontroller.filters import ExponentialMovingAverage, FilterPipeline
+    controller.filters = FilterPipeline([ExponentialMovingAverage(0.5)])
+    backend.set_state(0, buttons=0)
+    assert controller.state._axes is not released._axes
+
+
+def test_interned_buttons_not_shared() -> None:
+    """Mutating the buttons of one interned state doesn't change the others"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.interning import StateInternCache
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.intern_cache = StateInternCache()
+
+    backend.set_state(0, buttons=4096)
+    first = controller.state
+    first.buttons["a"] = False
+    backend.set_state(0, buttons=0)
+    backend.set_state(0, buttons=4096)
+    again = controller.state
+    again.buttons["b"] = True
+
+    assert controller.intern_cache.hits == 1
+    assert again.buttons["a"] and again.buttons["b"]
+    assert not first.buttons["a"] and not first.buttons["b"]
+    backend.set_state(0, buttons=0)
+    backend.set_state(0, buttons=4096)
+    latest = controller.state
+    assert controller.intern_cache.hits == 2
+    assert latest.buttons["a"] and not latest.buttons["b"]
+
+
+def test_interning_streams_packet_numbers() -> None:
+    """Interned states carry the latest packet number, so streamed repeats aren't dropped"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.interning import StateInternCache
+    from pyxboxcontroller.streaming import StateStreamer, StateReceiver
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    local = XboxController(0, backend=backend)
+    local.intern_cache = StateInternCache()
+
+    receiver = StateReceiver(("127.0.0.1", 0))
+    streamer = StateStreamer(receiver.address)
+    remote = XboxController(0, backend=receiver)
+    try:
+        for buttons in (4096, 0, 4096):
+            backend.set_state(0, buttons=buttons)
+            streamer.update(local)
+        assert local.state.packet_number == 3
+        for _ in range(100):
+            if remote.state.packet_number == 3:
+                break
+            time.sleep(0.01)
+        assert remote.state.packet_number == 3 and remote.state.a
+    finally:
+        streamer.close()
+        receiver.close()
+
+
+if __name__ == "__main__":
+    test_state_equality()
+    test_intern_cache_lru()
+    test_controller_interning()
+    test_interned_buttons_not_shared()
+    test_interning_streams_packet_numbers()
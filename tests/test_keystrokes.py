@@ -0,0 +1,91 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_struct_sizes() -> None:
+    """Keystroke and capabilities structs match the XInput layouts"""
+    import ctypes
+    from pyxboxcontroller import XInput
+
+    assert ctypes.sizeof(XInput.XINPUT_KEYSTROKE) == 8
+    assert ctypes.sizeof(XInput.XINPUT_CAPABILITIES) == 20
+
+
+def test_keystrokes_between_polls() -> None:
+    """A press and release between reads are both drained, oldest first"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    assert controller.keystrokes() == []
+    backend.set_state(0, buttons=4096 | 256)
+    backend.set_state(0, buttons=256)
+
+    keystrokes = controller.keystrokes()
+    assert [(k.button, k.down, k.up) for k in keystrokes] == [
+        ("lb", True, False), ("a", True, False), ("a", False, True)]
+    assert all(k.user_index == 0 for k in keystrokes)
+    # The queue is empty once drained
+    assert controller.keystrokes() == []
+
+
+def test_trigger_and_repeat_keystrokes() -> None:
+    """Triggers queue keystrokes past the threshold, queued repeats and directions are drained"""
+    from pyxboxcontroller import XboxController, SimulatedBackend, XInput
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    backend.set_state(0, left_trigger=XInput.TRIGGER_THRESHOLD)
+    assert controller.keystrokes() == []
+    backend.set_state(0, left_trigger=255)
+    backend.set_state(0, left_trigger=0)
+    backend.queue_keystroke(
+        0, XInput.VirtualKeys.LTHUMB_UPLEFT,
+        XInput.KeystrokeFlags.KEYDOWN | XInput.KeystrokeFlags.REPEAT)
+
+    keystrokes = controller.keystrokes()
+    assert [(k.button, k.down, k.repeat) for k in keystrokes] == [
+        ("l_trigger", True, False), ("l_trigger", False, False), ("lthumb_upleft", True, True)]
+
+
+def test_disconnected_keystrokes() -> None:
+    """Reading keystrokes or capabilities of a disconnected controller raises ConnectionError"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    controller = XboxController(0, backend=SimulatedBackend())
+    for read in (controller.keystrokes, lambda: controller.capabilities):
+        try:
+            read()
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("Expected a ConnectionError")
+
+
+def test_capabilities() -> None:
+    """The simulated controller is a wired gamepad with every button and both motors"""
+    from pyxboxcontroller import XboxController, XboxControllerState, SimulatedBackend
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    capabilities = XboxController(0, backend=backend).capabilities
+
+    assert capabilities.sub_type == 1
+    assert not capabilities.wireless
+    assert capabilities.supports_vibration
+    for bit in XboxControllerState._BUTTON_MAP.values():
+        assert capabilities.button_mask & bit
+
+
+if __name__ == "__main__":
+    test_struct_sizes()
+    test_keystrokes_between_polls()
+    test_trigger_and_repeat_keystrokes()
+    test_disconnected_keystrokes()
+    test_capabilities()
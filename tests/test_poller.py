@@ -0,0 +1,76 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_ring_buffer() -> None:
+    """Only new packets are published, readers drain everything since their last read"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.poller import ControllerPoller
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    poller = ControllerPoller(XboxController(0, backend=backend), capacity=4)
+    reader = poller.reader()
+
+    assert poller.latest() is None
+    assert poller.poll_once()
+    assert not poller.poll_once()  # Unchanged packet number
+
+    backend.set_state(0, buttons=4096)
+    assert poller.poll_once()
+    assert poller.latest().a
+
+    samples = reader.drain()
+    assert [state.packet_number for _, state in samples] == [0, 1]
+    assert samples[0][0] <= samples[1][0]
+    assert reader.drain() == []
+
+    # Falling behind by more than the buffer skips the oldest samples
+    for _ in range(5):
+        backend.set_state(0)
+        poller.poll_once()
+    samples = reader.drain()
+    assert [state.packet_number for _, state in samples] == [4, 5, 6]
+    assert reader.missed == 2
+
+    # The default reader started before anything was published
+    assert len(poller.drain()) == 3
+
+
+def test_disconnected() -> None:
+    """Nothing is published while the controller is disconnected"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.poller import ControllerPoller
+
+    poller = ControllerPoller(XboxController(1, backend=SimulatedBackend()))
+    assert not poller.poll_once()
+    assert not poller.connected
+    assert poller.published == 0
+
+
+def test_polling_thread() -> None:
+    """The background thread samples changes made while the consumer isn't reading"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.poller import ControllerPoller
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+
+    with ControllerPoller(XboxController(0, backend=backend), rate_hz=2000) as poller:
+        assert poller.running
+        for _ in range(3):
+            time.sleep(0.02)
+            backend.set_state(0)
+        time.sleep(0.02)
+
+    assert not poller.running
+    assert [state.packet_number for _, state in poller.drain()] == [0, 1, 2, 3]
+
+
+if __name__ == "__main__":
+    test_ring_buffer()
+    test_disconnected()
+    test_polling_thread()
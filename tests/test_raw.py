@@ -0,0 +1,61 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_poll_raw() -> None:
+    """poll_raw reports packet changes and exposes the raw struct"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+
+    assert controller.poll_raw() == (0, True)
+    assert controller.poll_raw() == (0, False)
+    backend.set_state(0, buttons=4096)
+    assert controller.poll_raw() == (1, True)
+    assert bytes(controller.raw_view[4:6]) == (4096).to_bytes(2, sys.byteorder)
+
+    # Doesn't interfere with the state property
+    assert controller.state.a and controller.state.packet_number == 1
+
+
+def test_poll_into_buffer() -> None:
+    """Packets are copied into a preallocated buffer and read with typed accessors"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.raw import RawStateBuffer
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    buffer = RawStateBuffer(4)
+
+    for i in range(4):
+        backend.set_state(
+            0, buttons=4096 if i % 2 else 16, left_trigger=i, right_trigger=255 - i,
+            l_thumb_x=-i, l_thumb_y=i * 1000, r_thumb_x=-32768, r_thumb_y=32767)
+        assert controller.poll_into(buffer, i) == (i + 1, True)
+
+    assert [buffer.packet_number(i) for i in range(4)] == [1, 2, 3, 4]
+    assert [buffer.a(i) for i in range(4)] == [False, True, False, True]
+    assert buffer.start(0) and buffer.pressed(2, 16 | 4096)
+    assert buffer.left_trigger(3) == 3 and buffer.right_trigger(3) == 252
+    assert buffer.l_thumb_x(2) == -2 and buffer.l_thumb_y(2) == 2000
+    assert buffer.r_thumb_x(1) == -32768 and buffer.r_thumb_y(1) == 32767
+    assert buffer.state(3).raw == (4096, 3, 252, -3, 3000, -32768, 32767)
+
+    # Indexes outside the buffer are rejected rather than written past its end
+    for index in (-1, 4):
+        try:
+            controller.poll_into(buffer, index)
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f"Expected an IndexError for index {index}")
+
+
+if __name__ == "__main__":
+    test_poll_raw()
+    test_poll_into_buffer()
@@ -0,0 +1,101 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__name__))
+
+
+def _record_session(path: str) -> None:
+    """Record 5 packets 10ms apart, pressing a on packet 2"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.recording import SessionRecorder
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    with SessionRecorder(path) as recorder:
+        controller = XboxController(0, backend=backend)
+        for i in range(5):
+            backend.set_state(0, buttons=4096 if i == 2 else 0, l_thumb_x=i * 1000)
+            recorder.record_state(controller.state, timestamp_ns=1_000 + i * 10_000_000)
+
+
+def test_random_access() -> None:
+    """Records are read by index and time from the memory-mapped file"""
+    from pyxboxcontroller.recording import SessionReplay
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.xrec")
+        _record_session(path)
+        assert os.path.getsize(path) == 16 + 5 * 24
+
+        replay = SessionReplay(path)
+        assert len(replay) == 5
+        assert replay.duration_ns == 40_000_000
+
+        timestamp_ns, state = replay[2]
+        assert timestamp_ns == 20_001_000
+        assert state.packet_number == 3 and state.a
+        assert replay[-1][1].raw[3] == 4000
+
+        assert replay.index_at(0) == 0
+        assert replay.index_at(25_000_000) == 2
+        assert replay.index_at(10 ** 12) == 4
+        replay.close()
+
+
+def test_replay_backend() -> None:
+    """Replays through XboxController as fast as possible, or with the original timing"""
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller.recording import SessionReplay
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.xrec")
+        _record_session(path)
+
+        replay = SessionReplay(path, realtime=False)
+        controller = XboxController(0, backend=replay)
+        packet_numbers = [controller.state.packet_number for _ in range(6)]
+        assert packet_numbers == [1, 2, 3, 4, 5, 5]
+        assert replay.finished
+        replay.close()
+
+        now = [0]
+        replay = SessionReplay(path, clock=lambda: now[0])
+        controller = XboxController(0, backend=replay)
+        assert controller.state.packet_number == 1
+        now[0] = 15_000_000
+        assert controller.state.packet_number == 2
+        now[0] = 29_000_000
+        assert controller.state.packet_number == 3 and controller.state.a
+
+        replay.seek(4)
+        assert controller.state.packet_number == 5
+        replay.close()
+
+
+def test_record_controller() -> None:
+    """poll() records only new packets, which replay byte for byte"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.recording import SessionRecorder, SessionReplay
+
+    backend = SimulatedBackend()
+    backend.connect(1)
+    backend.set_state(1, buttons=16, r_thumb_y=-32768, right_trigger=128)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.xrec")
+        with SessionRecorder(path, XboxController(1, backend=backend)) as recorder:
+            assert recorder.poll()
+            assert not recorder.poll()
+
+        replay = SessionReplay(path, controller_id=1)
+        state = XboxController(1, backend=replay).state
+        assert state.raw == (16, 0, 128, 0, 0, 0, -32768)
+        assert state.packet_number == 1
+        replay.close()
+
+
+if __name__ == "__main__":
+    test_random_access()
+    test_replay_backend()
+    test_record_controller()
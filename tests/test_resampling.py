@@ -0,0 +1,103 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+MS = 1_000_000
+
+
+def _state(packet_number, buttons=0, lx=0, rt=0):
+    from pyxboxcontroller.controller import XboxControllerState
+    return XboxControllerState.from_raw(packet_number, buttons, 0, rt, lx, 0, 0, 0)
+
+
+def test_interpolation() -> None:
+    """Axes are interpolated between the samples either side of the delayed tick"""
+    from pyxboxcontroller.resampling import FixedStepResampler
+
+    resampler = FixedStepResampler(rate_hz=100., delay=0.01)
+    resampler.add(0, _state(1, lx=0, rt=0))
+    resampler.add(8 * MS, _state(2, lx=8000, rt=200))
+    resampler.add(16 * MS, _state(3, lx=-8000, rt=100))
+
+    # Ticks at 10, 20 and 30ms render 0, 10 and 20ms
+    states = [resampler.step(10 * MS), resampler.step(), resampler.step()]
+    assert [state.raw[3] for state in states] == [0, 4000, -8000]
+    assert [state.raw[2] for state in states] == [0, 175, 100]
+    assert [state.packet_number for state in states] == [1, 2, 3]
+
+
+def test_short_press_kept() -> None:
+    """A press shorter than a tick appears in the next tick"""
+    from pyxboxcontroller.resampling import FixedStepResampler
+
+    resampler = FixedStepResampler(rate_hz=60., delay=0.)
+    resampler.add(0, _state(1))
+    assert resampler.step(0).button_mask == 0
+
+    # Pressed and released between ticks
+    resampler.add(2 * MS, _state(2, buttons=4096))
+    resampler.add(5 * MS, _state(3, buttons=0))
+    assert resampler.step().a
+    assert not resampler.step().a
+
+
+def test_held_without_new_samples() -> None:
+    """With no sample after the tick the latest sample is held, one state per tick"""
+    from pyxboxcontroller.resampling import FixedStepResampler
+
+    resampler = FixedStepResampler(rate_hz=120.)
+    assert resampler.step(0).packet_number == -1
+
+    resampler.add(0, _state(1, buttons=8192, lx=123))
+    for _ in range(5):
+        state = resampler.step()
+        assert state.b and state.raw[3] == 123
+    assert len(resampler._samples) == 1
+
+
+def test_update() -> None:
+    """update() samples the controller's new packets"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.resampling import FixedStepResampler
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    resampler = FixedStepResampler(delay=0.)
+
+    backend.set_state(0, buttons=4096)
+    resampler.update(controller)
+    resampler.update(controller)
+    assert len(resampler._samples) == 1
+    assert resampler.step().a
+
+
+def test_deadzones_kept() -> None:
+    """Resampled axes are interpolated from the controller's deadzoned axes"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.deadzones import Deadzones
+    from pyxboxcontroller.resampling import FixedStepResampler
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.deadzones = Deadzones()
+
+    # Inside the default left stick deadzone
+    backend.set_state(0, l_thumb_x=5000)
+    resampler = FixedStepResampler(rate_hz=100., delay=0.01)
+    resampler.add(0, controller.state)
+    backend.set_state(0, l_thumb_x=7000)
+    resampler.add(10 * MS, controller.state)
+
+    for state in (resampler.step(0), resampler.step(), resampler.step()):
+        assert state.l_thumb_x == 0.
+
+
+if __name__ == "__main__":
+    test_interpolation()
+    test_short_press_kept()
+    test_held_without_new_samples()
+    test_update()
+    test_deadzones_kept()
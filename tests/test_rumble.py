@@ -0,0 +1,129 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def _controller():
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.rumble import RumbleScheduler
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.rumble_scheduler = RumbleScheduler(threaded=False)
+    return controller, backend
+
+
+def test_set_rumble_coalesced() -> None:
+    """Only changes in motor speed are written, and no faster than rumble_min_interval"""
+    controller, backend = _controller()
+    controller.rumble_min_interval = 0.
+
+    controller.set_rumble(1., 0.5)
+    controller.set_rumble(1., 0.5)
+    controller.set_rumble(0., 0.)
+    controller.set_rumble(0., 0.)
+    assert backend.vibrations[0] == [(65535, 32768), (0, 0)]
+
+    # Writes within the interval are deferred to the scheduler, the latest value wins
+    controller.rumble_min_interval = 60.
+    controller.set_rumble(0.25, 0.25)
+    controller.set_rumble(0.5, 0.5)
+    assert len(backend.vibrations[0]) == 2
+    scheduler = controller.rumble_scheduler
+    assert scheduler.step(time.monotonic()) is not None
+    scheduler.step(time.monotonic() + 60.)
+    assert backend.vibrations[0][-1] == (32768, 32768)
+    assert scheduler.step(time.monotonic() + 120.) is None
+
+
+def test_effects() -> None:
+    """Envelopes are interpolated by the scheduler and end at their last keyframe"""
+    from pyxboxcontroller.rumble import RumbleEffect, RumbleScheduler
+
+    controller, backend = _controller()
+    controller.rumble_min_interval = 0.
+    now = [0.]
+    scheduler = controller.rumble_scheduler = RumbleScheduler(threaded=False, clock=lambda: now[0])
+
+    controller.play_rumble(RumbleEffect([(0., 0., 0.), (1., 1., 0.), (2., 0., 0.)]))
+    for step in range(6):
+        now[0] = step * 0.5
+        scheduler.step()
+    assert backend.vibrations[0] == [(32768, 0), (65535, 0), (32768, 0), (0, 0)]
+    assert not scheduler.is_playing(controller)
+
+    controller.rumble_pulse(1., 1., duration=0.1)
+    assert scheduler.is_playing(controller)
+    scheduler.step()
+    now[0] += 0.2
+    assert scheduler.step() is None
+    assert backend.vibrations[0][-2:] == [(65535, 65535), (0, 0)]
+
+    # set_rumble stops effects
+    controller.play_rumble(RumbleEffect([(0., 1., 1.)], loop=True))
+    controller.set_rumble(0., 0.)
+    assert not scheduler.is_playing(controller)
+
+
+def test_shared_scheduler_thread() -> None:
+    """Pulses run on the shared background scheduler"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.rumble import get_scheduler
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    backend.connect(1)
+    controllers = [XboxController(i, backend=backend) for i in range(2)]
+    for controller in controllers:
+        controller.rumble_pulse(1., 0., duration=0.02)
+
+    for _ in range(100):
+        if all(backend.vibrations.get(i, [])[-1:] == [(0, 0)] for i in range(2)):
+            break
+        time.sleep(0.01)
+
+    assert backend.vibrations[0] == backend.vibrations[1] == [(65535, 0), (0, 0)]
+    assert all(controller.rumble_scheduler is get_scheduler() for controller in controllers)
+
+
+def test_concurrent_writes_serialised() -> None:
+    """Writes from several threads never overlap, and each change is written once"""
+    import threading
+    from pyxboxcontroller import XboxController, SimulatedBackend
+
+    class SlowBackend(SimulatedBackend):
+        writing = 0
+        overlapped = False
+
+        def set_vibration(self, controller_id, vibration):
+            self.writing += 1
+            self.overlapped |= self.writing > 1
+            time.sleep(0.001)
+            self.writing -= 1
+            return super().set_vibration(controller_id, vibration)
+
+    backend = SlowBackend()
+    backend.connect(0)
+    controller = XboxController(0, backend=backend)
+    controller.rumble_min_interval = 0.
+
+    threads = [
+        threading.Thread(target=controller._write_rumble, args=((65535, 0), time.monotonic()))
+        for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not backend.overlapped
+    assert backend.vibrations[0] == [(65535, 0)]
+
+
+if __name__ == "__main__":
+    test_set_rumble_coalesced()
+    test_effects()
+    test_shared_scheduler_thread()
+    test_concurrent_writes_serialised()
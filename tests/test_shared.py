@@ -0,0 +1,115 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+sys.path.append(os.path.dirname(__name__))
+
+
+def test_publish_and_read() -> None:
+    """Published states are read back as XboxControllerStates"""
+    from pyxboxcontroller import XboxController, SimulatedBackend, XInput
+    from pyxboxcontroller.shared import SharedStatePublisher, SharedStateReader
+
+    backend = SimulatedBackend()
+    backend.connect(1)
+    local = XboxController(1, backend=backend)
+
+    with SharedStatePublisher(slots=2) as publisher:
+        reader = SharedStateReader(publisher.name)
+        try:
+            remote = XboxController(1, backend=reader)
+
+            # Nothing published yet
+            try:
+                reader.state(1)
+            except ConnectionError:
+                pass
+            else:
+                raise AssertionError("Expected ConnectionError before publishing")
+            assert reader.last_update_ns(1) == 0
+
+            backend.set_state(1, buttons=4096, l_thumb_x=-32768, right_trigger=255)
+            assert publisher.update(local) == 0
+            state = reader.state(1)
+            assert state.raw == local.state.raw
+            assert state.packet_number == local.state.packet_number
+            assert reader.state(1) is state  # Unchanged packet isn't decoded again
+            assert remote.state.a and remote.state.r_trigger == 1.
+            assert reader.last_update_ns(1) > 0
+
+            backend.disconnect(1)
+            publisher.update(local)
+            try:
+                remote.state
+            except ConnectionError:
+                pass
+            else:
+                raise AssertionError("Expected ConnectionError after disconnecting")
+
+            # Out of range ids are disconnected
+            assert reader.get_state(5, local._state) != 0
+            assert reader.last_update_ns(-1) == 0
+            for controller_id in (-1, 2):
+                try:
+                    reader.state(controller_id)
+                except ConnectionError:
+                    pass
+                else:
+                    raise AssertionError(f"Expected ConnectionError for id {controller_id}")
+
+            # A publisher which died mid write leaves the slot's sequence odd
+            reader.read_timeout = 0.01
+            reader._slots[0].sequence += 1
+            assert reader.get_state(0, local._state) == XInput.Codes.NOT_CONNECTED
+        finally:
+            reader.close()
+
+
+def test_read_from_other_process() -> None:
+    """A reader in another process sees the published state"""
+    import subprocess
+    from pyxboxcontroller import XInput
+    from pyxboxcontroller.shared import SharedStatePublisher
+
+    state = XInput.XINPUT_STATE()
+    state.packet_number = 7
+    state.gamepad.buttons = 16
+    state.gamepad.l_thumb_y = 1234
+
+    with SharedStatePublisher() as publisher:
+        publisher.publish(0, state)
+        script = (
+            "from pyxboxcontroller.shared import SharedStateReader\n"
+            f"reader = SharedStateReader({publisher.name!r})\n"
+            "state = reader.state(0)\n"
+            "print(state.packet_number, state.raw)\n"
+            "reader.close()\n")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == "7 (16, 0, 0, 0, 1234, 0, 0)"
+
+        # The reader exiting doesn't destroy the segment
+        publisher.publish(0, state)
+
+
+def test_not_a_segment() -> None:
+    """Attaching to a segment which isn't from a publisher fails"""
+    from multiprocessing import shared_memory
+    from pyxboxcontroller.shared import SharedStateReader
+
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        SharedStateReader(shm.name)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError")
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    test_publish_and_read()
+    test_read_from_other_process()
+    test_not_a_segment()
@@ -0,0 +1,146 @@
+# Ensure pyxboxcontroller is discoverable on PATH
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__name__))
+
+
+def _wait_for(condition, timeout: float = 1.) -> None:
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            raise AssertionError("Timed out waiting over loopback")
+        time.sleep(0.001)
+
+
+def test_loopback_stream() -> None:
+    """States streamed over loopback are read through a remote XboxController"""
+    from pyxboxcontroller import XboxController, SimulatedBackend
+    from pyxboxcontroller.streaming import (
+        GAMEPAD, HEADER, MASK, StateReceiver, StateStreamer)
+
+    backend = SimulatedBackend()
+    backend.connect(0)
+    local = XboxController(0, backend=backend)
+
+    receiver = StateReceiver(("127.0.0.1", 0))
+    streamer = StateStreamer(receiver.address, keyframe_interval=60.)
+    remote = XboxController(0, backend=receiver)
+
+    try:
+        # Disconnected until the first keyframe
+        try:
+            remote.state
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("Expected ConnectionError before any keyframe")
+
+        backend.set_state(0, buttons=4096, l_thumb_x=1000, l_thumb_y=-2000)
+        assert streamer.update(local) == HEADER.size + GAMEPAD.size
+        _wait_for(lambda: receiver.receive() or receiver._remotes)
+        assert remote.state.raw == local.state.raw
+
+        # Wait for the ack, then only changed fields are sent
+        _wait_for(lambda: streamer._receive_acks() or streamer._streams[0].acked)
+        backend.set_state(0, l_thumb_x=5000)
+        assert streamer.update(local) == HEADER.size + MASK.size + 2
+        assert streamer.update(local) == 0  # No new packet
+        _wait_for(lambda: remote.state.packet_number == 2)
+        assert remote.state.raw == (4096, 0, 0, 5000, -2000, 0, 0)
+
+        # Deltas are against the keyframe, so a lost delta doesn't matter
+        backend.set_state(0, buttons=0, right_trigger=255)
+        backend.set_state(0)
+        streamer.update(local)
+        _wait_for(lambda: remote.state.packet_number == 4)
+        assert remote.state.raw == local.state.raw
+        assert remote.battery_info is not None
+    finally:
+        streamer.close()
+        receiver.close()
+
+
+def test_receiver_timeout() -> None:
+    """Controllers not heard from within the timeout are disconnected"""
+    from pyxboxcontroller.controller import XboxControllerState
+    from pyxboxcontroller.streaming import StateReceiver, StateStreamer
+    from pyxboxcontroller import XboxController
+
+    now = [0.]
+    receiver = StateReceiver(("127.0.0.1", 0), timeout=1., clock=lambda: now[0])
+    streamer = StateStreamer(receiver.address)
+    remote = XboxController(2, backend=receiver)
+
+    try:
+        streamer.publish(2, XboxControllerState.from_raw(9, 16, 0, 0, 0, 0, 0, 0))
+        _wait_for(lambda: receiver.receive() or receiver._remotes)
+        assert remote.state.start
+
+        now[0] = 5.
+        try:
+            remote.state
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("Expected ConnectionError after the timeout")
+    finally:
+        streamer.close()
+        receiver.close()
+
+
+def test_receiver_ordering_and_malformed_messages() -> None:
+    """Truncated deltas and stale keyframes are dropped, a restarted sender's keyframes applied"""
+    import socket
+    from pyxboxcontroller import XboxController
+    from pyxboxcontroller.streaming import (
+        DELTA, GAMEPAD, HEADER, KEYFRAME, MASK, StateReceiver)
+
+    receiver = StateReceiver(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    remote = XboxController(0, backend=receiver)
+
+    def send(message: bytes) -> None:
+        sender.sendto(message, receiver.address)
+
+    try:
+        send(HEADER.pack(KEYFRAME, 0, 1, 100, 7) + GAMEPAD.pack(4096, 0, 0, 0, 0, 0, 0))
+        _wait_for(lambda: receiver.receive())
+        # Missing fields, unknown mask bits, and trailing bytes
+        send(HEADER.pack(DELTA, 0, 1, 101, 7) + MASK.pack(0x7f))
+        send(HEADER.pack(DELTA, 0, 1, 102, 7) + MASK.pack(0x80))
+        send(HEADER.pack(DELTA, 0, 1, 103, 7) + MASK.pack(0x01) + b"\0\0\0")
+        send(HEADER.pack(DELTA, 0, 1, 104, 7))
+        # A valid delta flushes the socket
+        send(HEADER.pack(DELTA, 0, 1, 105, 7) + MASK.pack(0x01) + b"\0\x40")
+        _wait_for(lambda: remote.state.packet_number == 105)
+        assert remote.state.x and not remote.state.a
+
+        # Late and duplicated keyframes of the session don't roll the state back
+        send(HEADER.pack(KEYFRAME, 0, 2, 200, 7) + GAMEPAD.pack(4096, 0, 0, 0, 0, 0, 0))
+        _wait_for(lambda: remote.state.packet_number == 200)
+        send(HEADER.pack(KEYFRAME, 0, 1, 100, 7) + GAMEPAD.pack(0, 0, 0, 0, 0, 0, 0))
+        send(HEADER.pack(KEYFRAME, 0, 2, 200, 7) + GAMEPAD.pack(0, 0, 0, 0, 0, 0, 0))
+        # Followed by an unchanged delta, so the keyframes have been received once it's applied
+        send(HEADER.pack(DELTA, 0, 2, 201, 7) + MASK.pack(0))
+        _wait_for(lambda: remote.state.packet_number == 201)
+        assert remote.state.a
+
+        # A restarted sender has a new session, its lower packet numbers are applied
+        send(HEADER.pack(KEYFRAME, 0, 1, 1, 8) + GAMEPAD.pack(16, 0, 0, 0, 0, 0, 0))
+        _wait_for(lambda: remote.state.packet_number == 1)
+        assert remote.state.start
+        # Deltas of the old session are ignored
+        send(HEADER.pack(DELTA, 0, 1, 300, 7) + MASK.pack(0x01) + b"\0\x40")
+        send(HEADER.pack(KEYFRAME, 0, 2, 2, 8) + GAMEPAD.pack(16, 0, 0, 0, 0, 0, 0))
+        _wait_for(lambda: remote.state.packet_number == 2)
+        assert not remote.state.x
+    finally:
+        sender.close()
+        receiver.close()
+
+
+if __name__ == "__main__":
+    test_loopback_stream()
+    test_receiver_timeout()
+    test_receiver_ordering_and_malformed_messages()